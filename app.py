@@ -2,18 +2,27 @@ import streamlit as st
 import pandas as pd
 import json
 import csv
+import os
 from io import StringIO, BytesIO
 from datetime import datetime
 from preprocessing import VietnamesePreprocessor
 from phobert_module import PhoBERTModule
+import model_bundle
+from hashed_linear import HashedLinearBackend
+from lexicon_artifact import load_tables
 from rule_based import RuleBasedSentiment
 from fusion import ConditionalFusion
 from db_connector import DBConnector
+from pipeline import SentimentPipeline
+from result_cache import ResultCache
+from model_runner import DeadlineRunner
+from document import DocumentAnalyzer
 
 # Input validation functions
-def validate_input(text):
+def validate_input(text, max_length=500):
     """
     Validate input text for Vietnamese sentiment analysis.
+    max_length caps the length (None: no cap, for document mode).
     Returns (is_valid, error_message)
     """
     import re
@@ -27,8 +36,8 @@ def validate_input(text):
         return False, "❌ Văn bản quá ngắn! Vui lòng nhập ít nhất 3 ký tự."
 
     # Check maximum length
-    if len(text) > 500:
-        return False, "❌ Văn bản quá dài! Vui lòng nhập dưới 500 ký tự."
+    if max_length is not None and len(text) > max_length:
+        return False, f"❌ Văn bản quá dài! Vui lòng nhập dưới {max_length} ký tự."
 
     # Calculate meaningful characters ratio
     total_chars = len(text)
@@ -204,13 +213,46 @@ def import_from_json(uploaded_file):
 # Cache resources
 @st.cache_resource
 def load_models():
+    # VSL_PHOBERT_BACKEND=onnx serves the int8 ONNX Runtime export instead of fp32
+    # PyTorch; =linear replaces PhoBERT with the hashed-feature linear model
+    backend = os.environ.get("VSL_PHOBERT_BACKEND", "torch")
+    if backend == "linear":
+        phobert = HashedLinearBackend()
+    elif model_bundle.load_manifest() is not None:
+        # Everything comes from the local bundle: no network, no HF cache
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        phobert = PhoBERTModule.from_bundle(backend=backend)
+    else:
+        phobert = PhoBERTModule(backend=backend)
+    # PhoBERT's pipeline tokenizes the processed text itself, so the
+    # preprocessor gets no tokenizer of its own
     preprocessor = VietnamesePreprocessor()
-    phobert = PhoBERTModule()
-    rule_based = RuleBasedSentiment()
     fusion = ConditionalFusion()
-    return preprocessor, phobert, rule_based, fusion
-
-preprocessor, phobert, rule_based, fusion = load_models()
+    # Shared by every session; keys include the lexicon version, so entries
+    # computed under an older lexicon are simply never hit again
+    result_cache = ResultCache(max_entries=10000, ttl=24 * 3600)
+    # Shared PhoBERT executor for requests under a deadline (VSL_DEADLINE_MS)
+    runner = DeadlineRunner(phobert)
+    return preprocessor, phobert, fusion, result_cache, runner
+
+# The rule engine is cached per lexicon version, separately from PhoBERT, so a
+# rebuilt lexicon artifact (or edited lexicon_data.py) swaps it on the next rerun
+@st.cache_resource(max_entries=1)
+def load_rule_engine(lexicon_version, _tables):
+    return RuleBasedSentiment(artifact=_tables)
+
+preprocessor, phobert, fusion, result_cache, model_runner = load_models()
+lexicon_tables = load_tables()
+rule_based = load_rule_engine(lexicon_tables.version, lexicon_tables)
+# rule_first: PhoBERT only runs when fusion can actually use its output. With
+# VSL_DEADLINE_MS set, a PhoBERT answer slower than that is dropped and the
+# rules answer alone (marked degraded)
+deadline_ms = os.environ.get("VSL_DEADLINE_MS")
+sentiment_pipeline = SentimentPipeline(preprocessor, phobert, rule_based, fusion, cache=result_cache, rule_first=True,
+                                       deadline=float(deadline_ms) / 1000 if deadline_ms else None,
+                                       runner=model_runner)
+# Long reviews / tickets: sentence chunks through the same pipeline, batched
+document_analyzer = DocumentAnalyzer(sentiment_pipeline)
 db = DBConnector()
 
 st.title("Phân loại cảm xúc tiếng Việt")
@@ -221,6 +263,9 @@ tab1, tab2, tab3 = st.tabs(["Phân loại Cảm xúc", "Lịch sử Phân loại
 with tab1:
     st.header("Phân loại Cảm xúc")
     text_input = st.text_area("Nhập câu tiếng Việt:", height=100)
+    document_mode = st.checkbox(
+        "Văn bản dài (chế độ tài liệu)",
+        help="Chia văn bản thành từng câu, phân tích từng câu và tổng hợp thành một nhãn chung. Không giới hạn 500 ký tự.")
     
     # Confidence threshold slider
     confidence_threshold = st.slider(
@@ -235,27 +280,40 @@ with tab1:
     if st.button("Phân loại"):
         if text_input.strip():
             # Validate input first
-            is_valid, error_msg = validate_input(text_input)
+            is_valid, error_msg = validate_input(text_input, max_length=None if document_mode else 500)
             if not is_valid:
                 st.error(error_msg)
+            elif document_mode:
+                with st.spinner("Đang xử lý tài liệu..."):
+                    doc = document_analyzer.analyze(text_input)
+                    if doc.mixed:
+                        st.warning(f"⚖️ Cảm xúc: {doc.label} (Văn bản có cả ý kiến tích cực và tiêu cực)")
+                    elif doc.confidence < confidence_threshold:
+                        st.warning(f"⚠️ Cảm xúc: {doc.label} (Có thể mơ hồ - Độ tin cậy thấp)")
+                    else:
+                        st.success(f"✅ Cảm xúc: {doc.label}")
+                    st.info(f"Độ tin cậy tổng hợp: {doc.confidence:.2f} - {doc.chunk_count} câu")
+                    with st.expander("Chi tiết từng câu"):
+                        st.dataframe(pd.DataFrame(
+                            [(c.index + 1, c.text, c.label, round(c.confidence, 2), round(c.rule_score, 2))
+                             for c in doc.chunks],
+                            columns=["#", "Câu", "Nhãn", "Độ tin cậy", "Điểm luật"]), hide_index=True)
+                    try:
+                        db.insert_history(text_input, f"[{doc.chunk_count} câu]", doc.label, float(doc.confidence))
+                    except Exception as e:
+                        st.error(f"Lỗi khi lưu lịch sử: {e}")
             else:
                 with st.spinner("Đang xử lý..."):
-                    # Preprocess
-                    processed_text = preprocessor.preprocess(text_input)
-
-                    # PhoBERT
-                    l_phobert, c_phobert = phobert.analyze_sentiment(processed_text)
-
-                    # Rule-based
-                    s_rule = rule_based.analyze_sentiment(processed_text)
-                    mixed_flag = rule_based.detect_mixed_sentiment(processed_text)
-                    neutral_flag = rule_based.is_neutral_context(processed_text)
-                    hedged_flag = rule_based.is_hedged(processed_text)
-
-                    # Fusion (pass flags for hedging/neutral detection)
-                    final_label, final_conf = fusion.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed_flag, neutral_flag=neutral_flag, hedged_flag=hedged_flag)
+                    # Preprocess -> PhoBERT + rule-based -> fusion (cached per text)
+                    result = sentiment_pipeline.analyze(text_input)
+                    processed_text = result.processed_text
+                    l_phobert, c_phobert = result.phobert_label, result.phobert_confidence
+                    s_rule = result.rule.score
+                    final_label, final_conf = result.label, result.confidence
 
                     # Display results
+                    if result.degraded:
+                        st.caption("⏱️ PhoBERT quá thời hạn - kết quả chỉ dựa trên luật")
                     if final_conf < confidence_threshold:
                         st.warning(f"⚠️ Cảm xúc: {final_label} (Có thể mơ hồ - Độ tin cậy thấp)")
                         st.info("💡 Gợi ý: Kết quả này có độ tin cậy thấp. Hãy xem xét ngữ cảnh hoặc nhập thêm chi tiết.")
@@ -268,7 +326,12 @@ with tab1:
                     with st.expander("Chi tiết phân tích"):
                         col1, col2, col3 = st.columns(3)
                         with col1:
-                            st.metric("PhoBERT", f"{l_phobert}", f"{c_phobert:.2f}")
+                            if result.degraded:
+                                st.metric("PhoBERT", "—", "quá thời hạn", delta_color="off")
+                            elif result.model_skipped:
+                                st.metric("PhoBERT", "—", "bỏ qua (luật quyết định)", delta_color="off")
+                            else:
+                                st.metric("PhoBERT", f"{l_phobert}", f"{c_phobert:.2f}")
                         with col2:
                             st.metric("Rule-based", f"{rule_based.get_label(s_rule)}", f"{s_rule:.2f}")
                         with col3:
@@ -0,0 +1,56 @@
+"""Clause segmentation shared by the rule heuristics.
+
+A text is cut at its contrastive connectors (from the cue detector) and at
+"cũng" / "cung". Overlapping connectors resolve to the longest one starting
+first ("mặc dù thế" rather than "mặc dù" or "dù"). Each clause records the
+connector that opens it, so mixed detection and post-contrast scoring read
+the same segmentation instead of re-splitting the text. Clauses are spans,
+not scores: the heuristics score the whole span they need in one match, so a
+lexicon phrase running across a boundary ("nhưng cũng được") is not cut.
+"""
+import re
+from collections import namedtuple
+
+from cue_detector import CONTRAST, Cue
+
+ADDITIVE = "additive"  # "cũng": "X cũng Y"
+
+# One clause: [start, end) character offsets (surrounding whitespace excluded)
+# and the connector Cue opening it (None for the first clause).
+Clause = namedtuple("Clause", ["start", "end", "connector"])
+
+_CUNG_RE = re.compile(r"\b(?:cũng|cung)\b")
+
+
+def segment(text_lower, cues):
+    """Split text_lower into Clauses at the connectors found in cues and at "cũng".
+
+    Returns () when the text has no clause boundary, so plain texts pay for
+    nothing but the boundary search.
+    """
+    boundaries = [cue for cue in cues if cue.kind == CONTRAST]
+    boundaries.extend(Cue(ADDITIVE, m.start(), m.end()) for m in _CUNG_RE.finditer(text_lower))
+    if not boundaries:
+        return ()
+    boundaries.sort(key=lambda b: (b.start, b.start - b.end))
+
+    clauses = []
+    start = 0
+    connector = None
+    for boundary in boundaries:
+        if boundary.start < start:
+            continue  # overlaps the connector already taken
+        clauses.append(_clause(text_lower, start, boundary.start, connector))
+        start = boundary.end
+        connector = boundary
+    clauses.append(_clause(text_lower, start, len(text_lower), connector))
+    return tuple(clauses)
+
+
+def _clause(text_lower, start, end, connector):
+    span = text_lower[start:end]
+    stripped = span.strip()
+    if not stripped:
+        return Clause(end, end, connector)
+    start += len(span) - len(span.lstrip())
+    return Clause(start, start + len(stripped), connector)
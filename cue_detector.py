@@ -0,0 +1,125 @@
+"""Single-pass detector for the rule engine's phrase cues.
+
+Hedges, sarcasm indicators, question phrases and contrastive connectors are
+compiled into one token trie. Tokens are runs of word characters or single
+punctuation marks, so cues only ever match whole words ("dù" does not fire
+inside "dùng", nor "tuy" inside "tuyệt"). The "không ... quá" / "không ...
+thôi" hedges are tracked with a running "không" position instead of a
+wildcard regex.
+
+``CueDetector.find`` locates candidate cue starts with one compiled regex of
+the trie's first tokens, then walks the trie token by token from each of
+them. Every step is bounded (one regex pass over the text, at most
+``max_length`` tokens per walk), so detection is linear in the length of the
+text whatever its contents; ``scripts/benchmark_cue_detector.py`` checks this
+on adversarial inputs.
+"""
+import re
+from collections import namedtuple
+
+HEDGE = "hedge"
+SARCASM = "sarcasm"
+QUESTION = "question"
+CONTRAST = "contrast"
+
+# A cue found in the text: its class and [start, end) character offsets
+Cue = namedtuple("Cue", ["kind", "start", "end"])
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+# The token following a position on the same line
+_NEXT_RE = re.compile(r"[^\S\n]*(\w+|[^\w\s])")
+
+# "không X quá" / "không X thôi": at least one token between the two words
+_GAP_OPEN = "không"
+_GAP_CLOSE = ("quá", "thôi")
+
+
+class CueDetector:
+    # Sentinel key holding the cue kinds of a terminal node; tokens are strings
+    _KINDS = None
+
+    def __init__(self, hedges, sarcasm_indicators, question_phrases, contrastive_connectors):
+        self.root = {}
+        self.max_length = 0
+        self._start_re = None
+        for kind, phrases in ((HEDGE, hedges), (SARCASM, sarcasm_indicators),
+                              (QUESTION, list(question_phrases) + ["?"]), (CONTRAST, contrastive_connectors)):
+            for phrase in phrases:
+                self.add(phrase, kind)
+
+    def add(self, phrase, kind):
+        """Register phrase as a cue of the given kind."""
+        tokens = _TOKEN_RE.findall(phrase.lower())
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        kinds = node.get(self._KINDS, ())
+        if kind not in kinds:
+            node[self._KINDS] = kinds + (kind,)
+        self.max_length = max(self.max_length, len(tokens))
+        self._start_re = None
+
+    def _compile(self):
+        """Regex matching every token a cue can start with (whole words only), plus line breaks."""
+        firsts = set(self.root) | {_GAP_OPEN} | set(_GAP_CLOSE)
+        firsts.discard(self._KINDS)
+        words = sorted((t for t in firsts if _is_word(t)), key=len, reverse=True)
+        marks = sorted(t for t in firsts if not _is_word(t))
+        alternatives = [r"\n"]
+        if words:
+            alternatives.append(r"(?<!\w)(?:" + "|".join(map(re.escape, words)) + r")(?!\w)")
+        alternatives.extend(map(re.escape, marks))
+        return re.compile("|".join(alternatives))
+
+    def find(self, text_lower):
+        """Return every cue in text_lower as Cue tuples, ordered by start offset.
+
+        Overlapping cues of different classes or lengths are all reported.
+        Cues never span a line break.
+        """
+        if self._start_re is None:
+            self._start_re = self._compile()
+        cues = []
+        root = self.root
+        next_token = _NEXT_RE.match
+        gap_after = None  # start of the token after the line's first "không"
+        gap_start = None
+        for m in self._start_re.finditer(text_lower):
+            token = m.group()
+            start = m.start()
+            if token == "\n":
+                gap_after = gap_start = None
+                continue
+
+            node = root.get(token)
+            end = m.end()
+            steps = 1
+            while node is not None:
+                kinds = node.get(self._KINDS)
+                if kinds:
+                    for kind in kinds:
+                        cues.append(Cue(kind, start, end))
+                if steps == self.max_length:
+                    break
+                nxt = next_token(text_lower, end)
+                if nxt is None:
+                    break
+                node = node.get(nxt.group(1))
+                end = nxt.end()
+                steps += 1
+
+            if token in _GAP_CLOSE:
+                if gap_after is not None and start > gap_after:
+                    cues.append(Cue(HEDGE, gap_start, m.end()))
+            elif token == _GAP_OPEN and gap_start is None:
+                gap_start = start
+                nxt = next_token(text_lower, m.end())
+                gap_after = nxt.start(1) if nxt is not None else len(text_lower)
+        cues.sort(key=lambda c: c.start)
+        return cues
+
+
+def _is_word(token):
+    return re.fullmatch(r"\w+", token) is not None
@@ -0,0 +1,71 @@
+"""Vietnamese diacritic folding shared by the lexicon builder and the rule engine.
+
+``fold`` strips tone marks and vowel modifiers ("tuyệt vời" -> "tuyet voi",
+"đáng" -> "dang") with a single ``str.translate`` call. It maps characters one
+to one and never touches whitespace, so ``fold(text).split()`` lines up token
+for token with ``text.split()``.
+"""
+import unicodedata
+from collections import defaultdict
+
+
+def _build_fold_table():
+    table = {ord("đ"): "d", ord("Đ"): "D"}
+    for code in list(range(0x00C0, 0x0250)) + list(range(0x1E00, 0x1F00)):
+        char = chr(code)
+        base = "".join(c for c in unicodedata.normalize("NFD", char) if not unicodedata.combining(c))
+        if len(base) == 1 and base != char:
+            table[code] = base
+    return table
+
+
+FOLD_TABLE = _build_fold_table()
+
+
+def fold(text):
+    """Remove Vietnamese diacritics from text (character for character)."""
+    return text.translate(FOLD_TABLE)
+
+
+def fold_lexicon(lexicon):
+    """Group lexicon entries by folded key.
+
+    Returns (entries, overrides, collisions):
+      entries     folded key -> default score. The default is the score of the
+                  unaccented form when the lexicon has one, otherwise the most
+                  common score among the forms.
+      overrides   surface form -> score, only for forms whose score differs
+                  from their folded key's default.
+      collisions  folded key -> [(surface form, score), ...] for every key
+                  whose forms disagree, for reporting at build time.
+    """
+    forms = defaultdict(list)
+    for key, score in lexicon.items():
+        forms[fold(key)].append((key, score))
+
+    entries = {}
+    overrides = {}
+    collisions = {}
+    for folded, group in forms.items():
+        scores = dict(group)
+        if folded in scores:
+            default = scores[folded]
+        else:
+            counts = defaultdict(int)
+            for _, score in group:
+                counts[score] += 1
+            default = max(counts, key=counts.get)
+        entries[folded] = default
+        for key, score in group:
+            if score != default:
+                overrides[key] = score
+        if len(set(scores.values())) > 1:
+            collisions[folded] = group
+    return entries, overrides, collisions
+
+
+def listed_forms(lexicon):
+    """The accented surface forms a lexicon lists. An accented input token
+    only takes a folded key's score when it is one of them (or carries no
+    diacritics at all), so "yếu" never borrows the score of "yêu"."""
+    return frozenset(key for key in lexicon if fold(key) != key)
@@ -0,0 +1,119 @@
+"""Long-document mode: sentence chunking, batched scoring, aggregation.
+
+The single-text path is built for one sentence or short review (the app caps
+input at 500 characters and PhoBERT truncates at 256 tokens). For full
+reviews and support tickets, ``DocumentAnalyzer`` splits the text into
+sentences (over-long sentences are cut at clause punctuation, then at word
+boundaries), scores each window of chunks with one
+SentimentPipeline.analyze_batch call (so repeated sentences are computed
+once and cached ones not at all) and aggregates the fused chunk labels into
+a document label.
+
+Text is consumed as a stream (a str or any iterable of lines, e.g. an open
+file) and scored ``window`` chunks at a time, so memory stays bounded by the
+window size; pass keep_chunks=False to drop the per-chunk breakdown as well.
+"""
+import re
+from collections import namedtuple
+
+# One scored chunk of a document
+ChunkResult = namedtuple("ChunkResult", [
+    "index",
+    "text",
+    "label",        # fused chunk label
+    "confidence",
+    "rule_score",
+    "model_skipped",
+])
+
+# Result of DocumentAnalyzer.analyze
+DocumentResult = namedtuple("DocumentResult", [
+    "label",
+    "confidence",
+    "mixed",         # both polarities carry real weight -> NEUTRAL
+    "chunk_count",
+    "label_weights", # {label: summed confidence x chunk words}
+    "chunks",        # [ChunkResult], or None with keep_chunks=False
+])
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def _split_long(sentence, max_chars):
+    """Cut a sentence longer than max_chars at clause punctuation, then at spaces."""
+    if len(sentence) <= max_chars:
+        yield sentence
+        return
+    for clause in _CLAUSE_END.split(sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            yield clause[:cut]
+            clause = clause[cut:].lstrip()
+        if clause:
+            yield clause
+
+
+def iter_chunks(source, max_chars=400):
+    """Sentence-sized chunks of source (a str or an iterable of lines), lazily."""
+    lines = [source] if isinstance(source, str) else source
+    for line in lines:
+        for sentence in _SENTENCE_END.split(line):
+            sentence = sentence.strip()
+            if sentence:
+                yield from _split_long(sentence, max_chars)
+
+
+class DocumentAnalyzer:
+    def __init__(self, pipeline, window=64, max_chunk_chars=400, min_polar_share=0.2, mixed_share=0.35):
+        """pipeline is a SentimentPipeline, whose preprocessor, model, rule
+        engine and fusion score the chunks (its rule_first setting applies).
+
+        The document is NEUTRAL when polar chunks hold less than
+        min_polar_share of the weight, or when the weaker polarity holds at
+        least mixed_share of the polar weight (mixed)."""
+        self.pipeline = pipeline
+        self.window = window
+        self.max_chunk_chars = max_chunk_chars
+        self.min_polar_share = min_polar_share
+        self.mixed_share = mixed_share
+
+    def iter_results(self, source):
+        """ChunkResult per chunk of source, scored window chunks at a time."""
+        window = []
+        for index, chunk in enumerate(iter_chunks(source, self.max_chunk_chars)):
+            window.append((index, chunk))
+            if len(window) == self.window:
+                yield from self._score(window)
+                window = []
+        if window:
+            yield from self._score(window)
+
+    def _score(self, window):
+        results = self.pipeline.analyze_batch([text for _, text in window])
+        for (index, text), result in zip(window, results):
+            yield ChunkResult(index, text, result.label, result.confidence, result.rule.score, result.model_skipped)
+
+    def analyze(self, source, keep_chunks=True):
+        """DocumentResult for source (a str or an iterable of lines)."""
+        weights = {"POSITIVE": 0.0, "NEGATIVE": 0.0, "NEUTRAL": 0.0}
+        chunks = [] if keep_chunks else None
+        count = 0
+        for result in self.iter_results(source):
+            # Longer sentences weigh more; confidence scales each vote
+            weights[result.label] += result.confidence * len(result.text.split())
+            count += 1
+            if keep_chunks:
+                chunks.append(result)
+        return DocumentResult(*self._aggregate(weights), count, weights, chunks)
+
+    def _aggregate(self, weights):
+        total = sum(weights.values())
+        polar = weights["POSITIVE"] + weights["NEGATIVE"]
+        if total == 0 or polar < self.min_polar_share * total:
+            return "NEUTRAL", weights["NEUTRAL"] / total if total else 0.0, False
+        if min(weights["POSITIVE"], weights["NEGATIVE"]) >= self.mixed_share * polar:
+            return "NEUTRAL", 1 - abs(weights["POSITIVE"] - weights["NEGATIVE"]) / polar, True
+        label = max(("POSITIVE", "NEGATIVE"), key=weights.get)
+        return label, weights[label] / polar, False
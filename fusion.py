@@ -7,15 +7,24 @@ class ConditionalFusion:
         self.w_phobert = w_phobert
         self.w_rule = w_rule
 
-    def fuse(self, l_phobert, c_phobert, s_rule, mixed_flag=False, neutral_flag=False, hedged_flag=False):
-        """Conditional Fusion Algorithm with improved neutral handling.
+    def params(self):
+        """Fusion parameters, used to key cached pipeline results."""
+        return (self.t_high, self.t_low, self.theta_rule, self.w_phobert, self.w_rule)
 
-        Args:
-            l_phobert: label from PhoBERT
-            c_phobert: confidence from PhoBERT
-            s_rule: score from rule-based analyzer
-            mixed_flag: boolean, True if rule-based detected mixed/contrastive sentiment
-        """
+    def needs_model(self, s_rule, mixed_flag=False):
+        """False when fuse() would decide from the rule outputs alone, so the
+        PhoBERT call can be skipped (fuse then accepts None for its outputs)."""
+        return self._rule_decision(s_rule, mixed_flag) is None
+
+    def fuse_without_model(self, s_rule, mixed_flag=False, neutral_flag=False, hedged_flag=False):
+        """Fusion when PhoBERT gave no answer (e.g. missed its deadline): the
+        model counts as a zero-confidence NEUTRAL, so rule vetoes still apply
+        and everything else falls back to a low-confidence NEUTRAL."""
+        return self.fuse("NEUTRAL", 0.0, s_rule, mixed_flag=mixed_flag, neutral_flag=neutral_flag,
+                         hedged_flag=hedged_flag)
+
+    def _rule_decision(self, s_rule, mixed_flag):
+        """(label, confidence) fixed by the rule outputs alone, or None."""
         # If rule-based explicitly flagged mixed sentiment, prefer NEUTRAL
         if mixed_flag:
             return "NEUTRAL", 0.90
@@ -28,6 +37,20 @@ class ConditionalFusion:
         if abs(s_rule) >= self.theta_rule:
             label = "POSITIVE" if s_rule > 0 else "NEGATIVE"
             return label, abs(s_rule) / 5.0  # Normalize confidence
+        return None
+
+    def fuse(self, l_phobert, c_phobert, s_rule, mixed_flag=False, neutral_flag=False, hedged_flag=False):
+        """Conditional Fusion Algorithm with improved neutral handling.
+
+        Args:
+            l_phobert: label from PhoBERT
+            c_phobert: confidence from PhoBERT
+            s_rule: score from rule-based analyzer
+            mixed_flag: boolean, True if rule-based detected mixed/contrastive sentiment
+        """
+        decision = self._rule_decision(s_rule, mixed_flag)
+        if decision is not None:
+            return decision
 
         # (no early neutral override here) - fall through to normal cases
 
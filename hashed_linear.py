@@ -0,0 +1,170 @@
+"""Hashed-feature linear sentiment backend (NumPy only).
+
+For deployments that cannot afford a transformer forward pass per message.
+Texts are turned into word unigrams and bigrams, both as written and
+diacritic-folded (so unaccented input still matches), hashed into
+``n_features`` buckets with a sign bit (the hashing trick: no vocabulary to
+store), and scored by a multinomial logistic regression.
+
+``HashedLinearModel.train`` fits it offline from the repo's labeled prompt
+files (scripts/train_linear_model.py); the artifact is one small .npz file.
+``HashedLinearBackend`` serves it behind the SentimentBackend interface with
+the same POS / NEG / NEU labels as PhoBERT, so ConditionalFusion consumes it
+unchanged.
+"""
+import hashlib
+import os
+import re
+import zlib
+
+import numpy as np
+
+from diacritics import fold
+from sentiment_backend import SentimentBackend
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.environ.get("VSL_LINEAR_MODEL", os.path.join(ROOT, "linear_model.npz"))
+LABELS = ("NEG", "NEU", "POS")
+# Dataset labels (as in the prompt files) -> model labels
+DATASET_LABELS = {"NEGATIVE": "NEG", "NEUTRAL": "NEU", "POSITIVE": "POS"}
+
+# Labeled prompt files (text<TAB>label) the model is trained and evaluated on
+TRAINING_FILES = ["test_1000_random_prompts.txt", "test_100_mixed_prompts.txt",
+                  os.path.join("test", "test_1000_prompts_refined.txt")]
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def load_labeled_prompts(paths=TRAINING_FILES):
+    """[(text, label)] from tab-separated prompt files, relative to the repo root."""
+    prompts = []
+    for path in paths:
+        with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 2 and parts[1] in DATASET_LABELS:
+                    prompts.append((parts[0], parts[1]))
+    return prompts
+
+
+def is_holdout(text):
+    """Deterministic 20% evaluation split, stable across runs and machines."""
+    return zlib.crc32(text.encode("utf-8")) % 5 == 0
+
+
+def features(text, n_features):
+    """(bucket indices, values) of text's hashed features, L2-normalized."""
+    words = _WORD.findall(text.lower())
+    folded = [fold(w) for w in words]
+    grams = words + folded + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    grams += [f"~{a} {b}" for a, b in zip(folded, folded[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    hashes = np.array([zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.int64)
+    values = np.where(hashes & 0x80000000, 1.0, -1.0)
+    return hashes % n_features, values / np.sqrt(len(grams))
+
+
+def featurize(texts, n_features):
+    """Sparse (rows, cols, values) triplets for texts."""
+    rows, cols, vals = [], [], []
+    for row, text in enumerate(texts):
+        idx, values = features(text, n_features)
+        rows.append(np.full(len(idx), row))
+        cols.append(idx)
+        vals.append(values)
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+class HashedLinearModel:
+    def __init__(self, weights, bias, labels=LABELS):
+        self.weights = weights        # (n_features, n_labels)
+        self.bias = bias              # (n_labels,)
+        self.labels = tuple(labels)
+
+    @property
+    def n_features(self):
+        return self.weights.shape[0]
+
+    def _logits(self, rows, cols, vals, n_rows):
+        logits = np.empty((n_rows, len(self.labels)))
+        for k in range(len(self.labels)):
+            logits[:, k] = np.bincount(rows, weights=vals * self.weights[cols, k], minlength=n_rows)
+        return logits + self.bias
+
+    def predict_proba_matrix(self, texts):
+        """(len(texts), n_labels) probability matrix."""
+        texts = list(texts)
+        return _softmax(self._logits(*featurize(texts, self.n_features), len(texts)))
+
+    @classmethod
+    def train(cls, texts, labels, n_features=2 ** 16, epochs=300, learning_rate=0.1, l2=1e-5):
+        """Fit on texts with POS / NEG / NEU (or POSITIVE / ...) labels by full-batch Adam."""
+        texts = list(texts)
+        y = np.array([LABELS.index(DATASET_LABELS.get(label, label)) for label in labels])
+        rows, cols, vals = featurize(texts, n_features)
+        n = len(texts)
+        targets = np.eye(len(LABELS))[y]
+        model = cls(np.zeros((n_features, len(LABELS))), np.zeros(len(LABELS)))
+        params = [model.weights, model.bias]
+        moments = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+        for step in range(1, epochs + 1):
+            delta = (_softmax(model._logits(rows, cols, vals, n)) - targets) / n
+            grad_w = np.empty_like(model.weights)
+            for k in range(len(LABELS)):
+                grad_w[:, k] = np.bincount(cols, weights=vals * delta[rows, k], minlength=n_features)
+            grads = [grad_w + l2 * model.weights, delta.sum(axis=0)]
+            for p, g, (m, v) in zip(params, grads, moments):
+                m *= 0.9
+                m += 0.1 * g
+                v *= 0.999
+                v += 0.001 * g * g
+                p -= learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+        return model
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights.astype(np.float32), bias=self.bias,
+                            labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["weights"].astype(np.float64), data["bias"], [str(l) for l in data["labels"]])
+
+
+class HashedLinearBackend(SentimentBackend):
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, preload=True):
+        self.model_path = model_path
+        self._model = None
+        self._key = None
+        if preload:
+            self.load()
+
+    @property
+    def model_key(self):
+        """Artifact content hash, so a retrained model never reuses cached outputs."""
+        if self._key is None:
+            with open(self.model_path, "rb") as f:
+                self._key = f"hashed-linear@{hashlib.sha256(f.read()).hexdigest()[:16]}"
+        return self._key
+
+    def load(self):
+        if self._model is None:
+            self._model = HashedLinearModel.load(self.model_path)
+        return self._model
+
+    def predict_proba(self, text):
+        return self.predict_proba_batch([text])[0]
+
+    def predict_proba_batch(self, texts, batch_size=32):
+        """Scores all texts in one pass; batch_size is accepted for interface parity."""
+        model = self.load()
+        return [dict(zip(model.labels, row)) for row in model.predict_proba_matrix(texts).tolist()]
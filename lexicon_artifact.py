@@ -0,0 +1,470 @@
+"""Compiled, memory-mapped lexicon artifact for RuleBasedSentiment.
+
+The tables in lexicon_data are compiled into a single binary file::
+
+    magic "VSLX" | format (uint16) | reserved (uint16) | header length (uint32)
+    header (UTF-8 JSON: version, byte order, section offsets, small string tables,
+            per-form overrides, listed accented forms and domain overlays)
+    keys          UTF-8 diacritic-folded lexicon keys, sorted by their bytes
+    key_offsets   uint32[n + 1] start of each key in ``keys``
+    scores        float32[n]    default score of each folded key
+
+Worker processes ``mmap`` the file read-only, so the lexicon keys and scores
+live in one page-cache copy shared by every process. The small indicator
+tables (negations, intensifiers, hedges, ...) and the per-form score
+overrides are decoded into frozensets / tuples / dicts once per process.
+
+Only the artifact's tables are shared. ``PhraseMatcher`` reads them once to
+build its token trie, a Python dict private to each process, so every worker
+still pays for its own lookup structure on top of the mmap (see
+scripts/benchmark_rule_workers.py for per-worker RSS / PSS).
+
+The artifact's version is a digest of lexicon_data.py, so a stale artifact is
+detected without importing the source tables.
+
+Both files are watched by ``os.stat`` signature: once the artifact is rebuilt
+(``build_artifact`` replaces it atomically) or lexicon_data.py is edited, the
+next ``load_tables`` call returns the new tables while engines still holding
+the old ones keep working on their own mmap. See
+``RuleBasedSentiment.refreshed`` for swapping engines at runtime.
+"""
+import copy
+import hashlib
+import importlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Mapping
+
+from cue_detector import CueDetector
+from diacritics import fold, fold_lexicon, listed_forms
+from lexicon_matcher import PhraseMatcher
+
+MAGIC = b"VSLX"
+FORMAT_VERSION = 4
+_PREAMBLE = struct.Struct("<4sHHI")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(ROOT, "lexicon_data.py")
+DEFAULT_ARTIFACT = os.environ.get("VSL_LEXICON_ARTIFACT", os.path.join(ROOT, "lexicon.bin"))
+
+# Tables stored as membership sets vs. ordered lists in the header
+SET_TABLES = ("negations", "neutral_indicators", "positive_words", "negative_words")
+LIST_TABLES = ("contrastive_connectors", "sarcasm_indicators", "hedges", "question_phrases")
+
+_source_version = None   # (stat signature, digest) of lexicon_data.py
+_source_module = None    # digest lexicon_data was imported at
+
+
+def _signature(path):
+    """Changes whenever the file at path is edited or replaced."""
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def source_version():
+    """Digest of lexicon_data.py; identifies the lexicon the artifact was built from."""
+    global _source_version
+    signature = _signature(SOURCE_PATH)
+    if _source_version is None or _source_version[0] != signature:
+        with open(SOURCE_PATH, "rb") as f:
+            _source_version = (signature, hashlib.sha1(f.read()).hexdigest()[:12])
+    return _source_version[1]
+
+
+class LexiconTables:
+    """The lexicon and indicator tables consumed by RuleBasedSentiment."""
+
+    def __init__(self, version, lexicon, negations, intensifiers, neutral_indicators, positive_words,
+                 negative_words, contrastive_connectors, sarcasm_indicators, hedges, question_phrases,
+                 overlays=None):
+        self.version = version
+        self.lexicon = lexicon
+        self.negations = frozenset(negations)
+        self.intensifiers = dict(intensifiers)
+        self.neutral_indicators = frozenset(neutral_indicators)
+        self.positive_words = frozenset(positive_words)
+        self.negative_words = frozenset(negative_words)
+        self.contrastive_connectors = tuple(contrastive_connectors)
+        self.sarcasm_indicators = tuple(sarcasm_indicators)
+        self.hedges = tuple(hedges)
+        self.question_phrases = tuple(question_phrases)
+        # Per-domain {phrase: score} overlays on the lexicon (see with_overlay)
+        self.overlays = {name: dict(overlay) for name, overlay in (overlays or {}).items()}
+        # Digest of each overlay added at runtime; they are part of version
+        self.added_overlays = {}
+        self._matchers = {}
+        self._cue_detector = None
+
+    def with_overlay(self, name, lexicon):
+        """Return new tables with the overlay for a domain registered (or replaced).
+
+        Tables are never changed in place: they are shared by every engine in
+        the process (see load_tables) and cached results are keyed by their
+        version. The new tables share the base lexicon, matchers and cue
+        detector with these, and their version names the added overlays.
+        """
+        overlay = dict(lexicon)
+        digest = hashlib.sha1(json.dumps(overlay, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        self.matcher()  # built here once, so every derived table shares it
+        tables = copy.copy(self)
+        tables.overlays = dict(self.overlays, **{name: overlay})
+        tables.added_overlays = dict(self.added_overlays, **{name: digest.hexdigest()[:12]})
+        # "<lexicon version>+<overlay>.<digest>..." for every overlay added at runtime
+        tables.version = self.version.split("+", 1)[0] + "".join(
+            f"+{n}.{d}" for n, d in sorted(tables.added_overlays.items()))
+        tables._matchers = {k: m for k, m in self._matchers.items() if k != name}
+        return tables
+
+    def lexicon_for(self, overlay=None):
+        """The lexicon as seen by one overlay (the base lexicon for None)."""
+        if overlay is None:
+            return self.lexicon
+        return OverlayLexicon(self.lexicon, self._overlay(overlay))
+
+    def matcher(self, overlay=None):
+        """Phrase trie over the lexicon, built once and shared by every engine using these tables.
+
+        Overlay tries are built from the base trie copy-on-write, so they share
+        every node the overlay does not touch.
+        """
+        matcher = self._matchers.get(overlay)
+        if matcher is None:
+            if overlay is None:
+                matcher = PhraseMatcher(self.lexicon)
+            else:
+                matcher = self.matcher().overlay(self._overlay(overlay))
+            self._matchers[overlay] = matcher
+        return matcher
+
+    def _overlay(self, name):
+        try:
+            return self.overlays[name]
+        except KeyError:
+            raise ValueError(f"Unknown lexicon overlay {name!r}") from None
+
+    def cue_detector(self):
+        """Hedge / sarcasm / question / contrast cue detector, built once like matcher()."""
+        if self._cue_detector is None:
+            self._cue_detector = CueDetector(
+                self.hedges, self.sarcasm_indicators, self.question_phrases, self.contrastive_connectors)
+        return self._cue_detector
+
+
+def source_tables():
+    """Tables straight from lexicon_data (imports the source module, re-importing it once edited)."""
+    global _source_module
+    import lexicon_data as d
+    version = source_version()
+    if _source_module is not None and _source_module != version:
+        d = importlib.reload(d)
+    _source_module = version
+    entries, overrides, _ = fold_lexicon(d.SENTIMENT_LEXICON)
+    return LexiconTables(
+        version, FoldedLexicon(entries, overrides, listed_forms(d.SENTIMENT_LEXICON)), d.NEGATIONS, d.INTENSIFIERS, d.NEUTRAL_INDICATORS,
+        d.POSITIVE_WORDS, d.NEGATIVE_WORDS, d.CONTRASTIVE_CONNECTORS, d.SARCASM_INDICATORS, d.HEDGES,
+        d.QUESTION_PHRASES, d.DOMAIN_OVERLAYS,
+    )
+
+
+class FoldedLexicon(Mapping):
+    """Diacritic-insensitive phrase -> score mapping.
+
+    ``entries`` maps folded keys to their default score, ``overrides`` the
+    few surface forms whose score differs and ``forms`` every accented form
+    the lexicon lists. "tuyệt vời" and "tuyet voi" resolve with one lookup
+    while "chó" keeps its own score; an accented form the lexicon does not
+    list ("yếu" next to "yêu") is not in the mapping. Iteration yields the
+    folded keys.
+    """
+
+    def __init__(self, entries, overrides, forms=frozenset()):
+        self.entries = entries
+        self.overrides = overrides
+        self.forms = frozenset(forms)
+
+    def __getitem__(self, key):
+        score = self.overrides.get(key)
+        if score is not None:
+            return score
+        folded = fold(key)
+        if folded != key and key not in self.forms:
+            raise KeyError(key)
+        return self.entries[folded]
+
+    def __contains__(self, key):
+        if not isinstance(key, str):
+            return False
+        folded = fold(key)
+        return folded in self.entries and (folded == key or key in self.forms)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+
+class OverlayLexicon(Mapping):
+    """A base FoldedLexicon with one domain's {phrase: score} overlay resolved at lookup time.
+
+    Lookups consult the overlay first and fall back to the shared base, which
+    is never copied; ``entries`` / ``overrides`` merge the two on demand for
+    consumers that need the whole table (the batch scorer).
+    """
+
+    def __init__(self, base, overlay):
+        self.base = base
+        self.removed = {fold(k) for k, v in overlay.items() if v is None}
+        kept = {k: v for k, v in overlay.items() if v is not None}
+        self.overlay_entries, self.overlay_overrides, _ = fold_lexicon(kept)
+        self.overlay_forms = listed_forms(kept)
+
+    def _listed(self, key, folded):
+        return key == folded or key in self.overlay_forms or (folded not in self.removed and key in self.base.forms)
+
+    def __getitem__(self, key):
+        folded = fold(key)
+        if (folded in self.removed and folded not in self.overlay_entries) or not self._listed(key, folded):
+            raise KeyError(key)
+        # Same precedence as the overlay trie: per-form overrides (overlay,
+        # then base), then the folded key's default (overlay, then base)
+        score = self.overlay_overrides.get(key)
+        if score is None and folded not in self.removed:
+            score = self.base.overrides.get(key)
+        if score is not None:
+            return score
+        if folded in self.overlay_entries:
+            return self.overlay_entries[folded]
+        return self.base.entries[folded]
+
+    def __contains__(self, key):
+        if not isinstance(key, str):
+            return False
+        folded = fold(key)
+        if not self._listed(key, folded):
+            return False
+        return folded in self.overlay_entries or (folded not in self.removed and folded in self.base.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    @property
+    def entries(self):
+        entries = {k: v for k, v in self.base.entries.items() if k not in self.removed}
+        entries.update(self.overlay_entries)
+        return entries
+
+    @property
+    def overrides(self):
+        overrides = {k: v for k, v in self.base.overrides.items() if fold(k) not in self.removed}
+        overrides.update(self.overlay_overrides)
+        return overrides
+
+    @property
+    def forms(self):
+        return frozenset(k for k in self.base.forms if fold(k) not in self.removed) | self.overlay_forms
+
+
+class MappedLexicon(Mapping):
+    """Read-only key -> score mapping backed by the artifact's sorted key section."""
+
+    def __init__(self, buf, keys, offsets, scores):
+        self._buf = buf
+        self._keys_start = keys
+        self._offsets = offsets
+        self._scores = scores
+
+    def _key_bytes(self, i):
+        start = self._keys_start + self._offsets[i]
+        return self._buf[start:self._keys_start + self._offsets[i + 1]]
+
+    def _find(self, key):
+        target = key.encode("utf-8")
+        lo, hi = 0, len(self._scores)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._scores) and self._key_bytes(lo) == target:
+            return lo
+        return -1
+
+    def __getitem__(self, key):
+        i = self._find(key) if isinstance(key, str) else -1
+        if i < 0:
+            raise KeyError(key)
+        return self._scores[i]
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __iter__(self):
+        for i in range(len(self._scores)):
+            yield self._key_bytes(i).decode("utf-8")
+
+    def items(self):
+        for i in range(len(self._scores)):
+            yield self._key_bytes(i).decode("utf-8"), self._scores[i]
+
+
+class LexiconArtifact(LexiconTables):
+    """Tables loaded from a compiled artifact file via a read-only mmap."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._mmap
+        magic, fmt, _, header_len = _PREAMBLE.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a lexicon artifact")
+        if fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} has artifact format {fmt}, expected {FORMAT_VERSION}")
+        header = json.loads(bytes(buf[_PREAMBLE.size:_PREAMBLE.size + header_len]).decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was built for a {header['byteorder']}-endian machine")
+
+        sections = header["sections"]
+        view = memoryview(buf)
+        offsets = view[slice(*_span(sections["key_offsets"]))].cast("I")
+        scores = view[slice(*_span(sections["scores"]))].cast("f")
+        entries = MappedLexicon(buf, sections["keys"][0], offsets, scores)
+        lexicon = FoldedLexicon(entries, header["overrides"], header["forms"])
+
+        super().__init__(
+            header["version"], lexicon, header["negations"], header["intensifiers"],
+            header["neutral_indicators"], header["positive_words"], header["negative_words"],
+            header["contrastive_connectors"], header["sarcasm_indicators"], header["hedges"],
+            header["question_phrases"], header["overlays"],
+        )
+        self.path = path
+
+
+def _span(section):
+    offset, length = section
+    return offset, offset + length
+
+
+def build_artifact(path=DEFAULT_ARTIFACT, tables=None):
+    """Compile tables (default: lexicon_data) into an artifact at path, atomically."""
+    tables = tables or source_tables()
+
+    lexicon = tables.lexicon
+    if not isinstance(lexicon, FoldedLexicon):
+        lexicon = FoldedLexicon(*fold_lexicon(lexicon)[:2], listed_forms(lexicon))
+    for key, score in lexicon.overrides.items():
+        _check_float32(key, score)
+
+    entries = sorted((key.encode("utf-8"), score) for key, score in lexicon.entries.items())
+    keys = b"".join(k for k, _ in entries)
+    offsets = [0]
+    for k, _ in entries:
+        offsets.append(offsets[-1] + len(k))
+    scores = [_check_float32(k.decode("utf-8"), score) for k, score in entries]
+
+    header = {
+        "version": tables.version,
+        "byteorder": sys.byteorder,
+        # Intensifier multipliers (e.g. 1.2) are not float32-exact; keep them in the header
+        "intensifiers": tables.intensifiers,
+        "overrides": lexicon.overrides,
+        "forms": sorted(lexicon.forms),
+        "overlays": tables.overlays,
+    }
+    for name in SET_TABLES:
+        header[name] = sorted(getattr(tables, name))
+    for name in LIST_TABLES:
+        header[name] = list(getattr(tables, name))
+
+    blobs = [
+        ("keys", keys),
+        ("key_offsets", struct.pack(f"={len(offsets)}I", *offsets)),
+        ("scores", struct.pack(f"={len(scores)}f", *scores)),
+    ]
+    # Section offsets depend on the header length, which depends on the offsets;
+    # reserve room for them with a first pass, then pad the header to that size.
+    header["sections"] = {name: [0, len(blob)] for name, blob in blobs}
+    header_len = len(json.dumps(header, ensure_ascii=False).encode("utf-8")) + 64 * len(blobs)
+    cursor = _align(_PREAMBLE.size + header_len)
+    for name, blob in blobs:
+        header["sections"][name] = [cursor, len(blob)]
+        cursor = _align(cursor + len(blob))
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8").ljust(header_len)
+
+    out = bytearray(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, header_len))
+    out += header_bytes
+    for name, blob in blobs:
+        out += b"\0" * (header["sections"][name][0] - len(out))
+        out += blob
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(out)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def _check_float32(key, score):
+    packed = struct.unpack("f", struct.pack("f", score))[0]
+    if packed != score:
+        raise ValueError(f"Score {score!r} for {key!r} is not exactly representable as float32")
+    return packed
+
+
+def _align(n, to=8):
+    return (n + to - 1) // to * to
+
+
+_loaded = {}
+
+
+def load_tables(artifact=None):
+    """Return LexiconTables for RuleBasedSentiment.
+
+    artifact may be a LexiconTables instance, a path to an artifact file, or
+    None to use DEFAULT_ARTIFACT when it exists and matches lexicon_data.py,
+    falling back to the source tables otherwise. Results are cached per
+    process, keyed by the file's stat signature, so repeated engine
+    construction is nearly free and a rebuilt or edited lexicon is picked up
+    by the next call.
+    """
+    if isinstance(artifact, LexiconTables):
+        return artifact
+    if artifact is None:
+        path = DEFAULT_ARTIFACT
+        if os.path.exists(path):
+            try:
+                tables = _cached(path, lambda: LexiconArtifact(path))
+            except ValueError:
+                tables = None  # older artifact format: stale until rebuilt
+            if tables is not None and tables.version == source_version():
+                return tables
+        return _cached(SOURCE_PATH, source_tables)
+    return _cached(artifact, lambda: LexiconArtifact(artifact))
+
+
+def _cached(path, factory):
+    # Only the latest tables per file are kept; older ones live on in the
+    # engines still using them.
+    signature = _signature(path)
+    entry = _loaded.get(path)
+    if entry is None or entry[0] != signature:
+        entry = _loaded[path] = (signature, factory())
+    return entry[1]
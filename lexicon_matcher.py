@@ -0,0 +1,179 @@
+from diacritics import fold, fold_lexicon, listed_forms
+
+
+class PhraseMatcher:
+    """Token-level trie over lexicon phrases, keyed by diacritic-folded tokens.
+
+    Phrases are stored as token paths (split on single spaces, exactly as the
+    old ``' '.join(words[i:i+length])`` lookups produced them), so matching a
+    position walks the trie token by token instead of building candidate
+    n-gram strings.
+
+    Every phrase is stored once under its folded form ("tuyet voi") with a
+    default score; the few surface forms whose score differs (e.g. "chó" vs
+    "cho") are kept as per-form overrides on the terminal node. Callers pass
+    the folded tokens as ``keys`` and the original tokens as ``words``.
+
+    Unaccented input ("tuyet voi") takes the folded key's default score, but
+    an accented span only matches when it is one of the forms the lexicon
+    lists for that key: "yếu" does not match the "yeu" key of "yêu".
+    Without ``words`` the input is treated as unaccented.
+    """
+
+    # Sentinel keys on terminal nodes: the default score, the {surface form:
+    # score} overrides and the set of listed accented forms. Tokens are always
+    # strings, so these never collide.
+    _SCORE = None
+    _FORMS = 0
+    _LISTED = 1
+
+    def __init__(self, lexicon):
+        self.root = {}
+        self.max_length = 0
+        # ids of the trie nodes this matcher may mutate; None means all of them.
+        # Overlay matchers share the base trie and copy nodes before writing.
+        self._owned = None
+        entries = getattr(lexicon, "entries", None)
+        if entries is None:
+            entries, overrides, _ = fold_lexicon(lexicon)
+            forms = listed_forms(lexicon)
+        else:
+            overrides, forms = lexicon.overrides, lexicon.forms
+        self._insert(entries, overrides, forms)
+
+    def _insert(self, entries, overrides, forms):
+        for phrase, score in entries.items():
+            self._node(phrase)[self._SCORE] = score
+        for phrase, score in overrides.items():
+            self._node(fold(phrase)).setdefault(self._FORMS, {})[phrase] = score
+        for phrase in forms:
+            self._node(fold(phrase)).setdefault(self._LISTED, set()).add(phrase)
+
+    def _node(self, folded_phrase):
+        tokens = folded_phrase.split(' ')
+        node = self.root
+        owned = self._owned
+        for token in tokens:
+            child = node.get(token)
+            if child is None:
+                child = node[token] = {}
+                if owned is not None:
+                    owned.add(id(child))
+            elif owned is not None and id(child) not in owned:
+                child = node[token] = dict(child)
+                owned.add(id(child))
+            node = child
+        self.max_length = max(self.max_length, len(tokens))
+        if owned is not None:
+            if self._FORMS in node:
+                node[self._FORMS] = dict(node[self._FORMS])
+            if self._LISTED in node:
+                node[self._LISTED] = set(node[self._LISTED])
+        return node
+
+    def overlay(self, lexicon):
+        """Return a new matcher: this one with lexicon's phrases layered on top.
+
+        lexicon maps phrases to scores, like the base lexicon (any accent form,
+        folded the same way); a score of None removes the phrase in every form.
+        The trie is copied on write: only the nodes along the overlay's phrase
+        paths are duplicated, everything else is shared with this matcher, so
+        an overlay costs memory in proportion to its own size.
+        """
+        matcher = PhraseMatcher({})
+        matcher.root = dict(self.root)
+        matcher.max_length = self.max_length
+        matcher._owned = {id(matcher.root)}
+        kept = {k: v for k, v in lexicon.items() if v is not None}
+        entries, overrides, _ = fold_lexicon(kept)
+        for phrase, score in lexicon.items():
+            if score is None:
+                matcher.remove(phrase)
+        matcher._insert(entries, overrides, listed_forms(kept))
+        return matcher
+
+    def remove(self, phrase):
+        """Drop a phrase in every accent form (its longer continuations stay)."""
+        node = self.root
+        for token in fold(phrase).split(' '):
+            node = node.get(token)
+            if node is None:
+                return
+        node = self._node(fold(phrase))
+        node.pop(self._SCORE, None)
+        node.pop(self._FORMS, None)
+        node.pop(self._LISTED, None)
+
+    def add(self, phrase, score):
+        """Insert (or overwrite) a single phrase.
+
+        An accented phrase whose folded key already has a different score is
+        stored as an override for that surface form only.
+        """
+        folded = fold(phrase)
+        node = self._node(folded)
+        if phrase != folded:
+            node.setdefault(self._LISTED, set()).add(phrase)
+        if phrase == folded or self._SCORE not in node:
+            node[self._SCORE] = score
+            forms = node.get(self._FORMS)
+            if forms and phrase in forms:
+                del forms[phrase]
+        elif node[self._SCORE] != score:
+            node.setdefault(self._FORMS, {})[phrase] = score
+        else:
+            node.get(self._FORMS, {}).pop(phrase, None)
+
+    def _score(self, node, keys, words, i, j):
+        """Score of keys[i:j] as written in words, or None for an unlisted accented form."""
+        if words is None or words[i:j] == keys[i:j]:
+            return node[self._SCORE]
+        surface = ' '.join(words[i:j])
+        forms = node.get(self._FORMS)
+        if forms and surface in forms:
+            return forms[surface]
+        if surface in node.get(self._LISTED, ()):
+            return node[self._SCORE]
+        return None
+
+    def longest_match(self, keys, i, max_length, words=None):
+        """Return (length, score) of the longest phrase starting at keys[i], or None.
+
+        Only phrases of at most ``max_length`` tokens are considered.
+        """
+        best = None
+        for match in self.matches_at(keys, i, max_length, words):
+            best = match
+        return best
+
+    def matches_at(self, keys, i, max_length, words=None):
+        """Yield (length, score) for every phrase starting at keys[i], shortest first."""
+        node = self.root
+        end = min(len(keys), i + max_length)
+        j = i
+        while j < end:
+            node = node.get(keys[j])
+            if node is None:
+                return
+            j += 1
+            if self._SCORE in node:
+                score = self._score(node, keys, words, i, j)
+                if score is not None:
+                    yield j - i, score
+
+    def scan(self, keys, max_length, words=None):
+        """Greedy left-to-right longest-match scan.
+
+        Yields (start, length, score) for each match; matched tokens are
+        consumed so overlapping shorter phrases are not reported twice.
+        """
+        i = 0
+        n = len(keys)
+        while i < n:
+            match = self.longest_match(keys, i, max_length, words)
+            if match is None:
+                i += 1
+                continue
+            length, score = match
+            yield i, length, score
+            i += length
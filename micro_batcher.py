@@ -0,0 +1,135 @@
+"""Asyncio micro-batching in front of PhoBERT.
+
+Concurrent ``await batcher.analyze(text)`` calls are queued and collected for
+up to ``max_wait`` seconds or ``max_batch_size`` items, then run as one
+``analyze_batch`` forward pass in a worker thread, and each caller's future is
+resolved with its own (label, confidence). The queue is bounded: once
+``max_queue`` requests are waiting, callers block until there is room
+(``analyze_nowait`` raises asyncio.QueueFull instead), so a burst cannot grow
+memory without limit.
+
+Raising max_wait / max_batch_size trades p50 latency for throughput; stats()
+reports queue depth and batch sizes to tune them.
+"""
+import asyncio
+from collections import Counter
+
+
+class MicroBatcher:
+    def __init__(self, model, max_batch_size=32, max_wait=0.005, max_queue=1024):
+        """model needs analyze_batch(texts, batch_size) (PhoBERTModule or similar)."""
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._queue = None
+        self._worker = None
+        self.requests = 0
+        self.rejected = 0          # analyze_nowait calls refused by a full queue
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = Counter()  # batch size -> number of batches
+
+    async def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue(self.max_queue)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """Finish the queued requests, then stop the worker."""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def analyze(self, text):
+        """(label, confidence) for text; waits for queue room when it is full."""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        self._queued()
+        return await future
+
+    async def analyze_nowait(self, text):
+        """Like analyze, but raises asyncio.QueueFull instead of waiting for room."""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((text, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        self._queued()
+        return await future
+
+    def _queued(self):
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    async def _collect(self):
+        """Block for the first request, then take more until the window closes or the batch is full."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self.batches += 1
+            self.batch_sizes[len(batch)] += 1
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    None, self.model.analyze_batch, texts, self.max_batch_size)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def stats(self):
+        """Counters for monitoring: requests, rejected, batches, queue depth and batch sizes."""
+        return {
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "mean_batch_size": sum(k * v for k, v in self.batch_sizes.items()) / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(self.batch_sizes),
+        }
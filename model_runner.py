@@ -0,0 +1,65 @@
+"""Model calls under a per-request deadline, on a bounded executor.
+
+``DeadlineRunner.analyze(text, timeout)`` returns the model's (label,
+confidence), or None when it cannot answer in time, so the caller can fall
+back to rule-only results. Abandoned work does not pile up:
+
+- a call still queued when its deadline passes is cancelled and never runs;
+- a call already running finishes in the background (a forward pass cannot be
+  interrupted), and PhoBERTModule's cache keeps its output for the next request;
+- once max_pending calls are queued or running, new requests are shed
+  immediately instead of queueing behind work that is already late.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+
+class DeadlineRunner:
+    def __init__(self, model, max_workers=1, max_pending=4):
+        self.model = model
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="model")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.calls = 0
+        self.deadline_misses = 0   # calls that did not finish within their deadline
+        self.cancelled = 0         # missed calls dropped before they started
+        self.shed = 0              # requests never submitted (no time left or too much pending)
+
+    def analyze(self, text, timeout):
+        """(label, confidence) from model.analyze_sentiment, or None past timeout seconds."""
+        with self._lock:
+            if timeout <= 0 or self._pending >= self.max_pending:
+                self.shed += 1
+                return None
+            self._pending += 1
+            self.calls += 1
+        future = self._executor.submit(self.model.analyze_sentiment, text)
+        future.add_done_callback(self._finished)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            cancelled = future.cancel()
+            with self._lock:
+                self.deadline_misses += 1
+                self.cancelled += cancelled
+            return None
+
+    def _finished(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Counters for monitoring: calls, deadline_misses, cancelled, shed, pending."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "deadline_misses": self.deadline_misses,
+                "cancelled": self.cancelled,
+                "shed": self.shed,
+                "pending": self._pending,
+            }
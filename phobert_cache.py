@@ -0,0 +1,97 @@
+"""Persistent on-disk cache of PhoBERT outputs.
+
+Entries live in a SQLite file keyed by a SHA-256 of the model name, model
+revision and processed text, and hold the full label -> probability vector.
+The database runs in WAL mode, so several processes (evaluation scripts,
+app workers) can read and write the same file concurrently, and entries
+survive restarts: re-running an evaluation after a rule-only change never
+reaches the model.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.environ.get("VSL_PHOBERT_CACHE", os.path.join(ROOT, "phobert_cache.db"))
+
+
+def content_key(model_key, text):
+    """Hash identifying one (model revision, processed text) pair."""
+    return hashlib.sha256(f"{model_key}\0{text}".encode("utf-8")).hexdigest()
+
+
+class PhoBERTCache:
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, timeout=30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.create_table()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=self.timeout)
+
+    def create_table(self):
+        """Create the phobert_outputs table if not exists (and switch the file to WAL)"""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS phobert_outputs (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    probabilities TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, model_key, text):
+        """Cached {label: probability} for text, or None."""
+        return self.get_many(model_key, [text])[0]
+
+    def get_many(self, model_key, texts):
+        """Cached probability dicts (or None) for each text, in order, with one query per 500 texts."""
+        keys = [content_key(model_key, t) for t in texts]
+        found = {}
+        conn = self._connect()
+        try:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT key, probabilities FROM phobert_outputs WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk).fetchall()
+                found.update(rows)
+        finally:
+            conn.close()
+        results = [json.loads(found[k]) if k in found else None for k in keys]
+        hit_count = sum(r is not None for r in results)
+        self.hits += hit_count
+        self.misses += len(results) - hit_count
+        return results
+
+    def put(self, model_key, text, probabilities):
+        self.put_many(model_key, [(text, probabilities)])
+
+    def put_many(self, model_key, items):
+        """Store (text, {label: probability}) pairs in one transaction."""
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [(content_key(model_key, text), model_key, json.dumps(probs, sort_keys=True), created_at)
+                for text, probs in items]
+        conn = self._connect()
+        try:
+            conn.executemany("INSERT OR REPLACE INTO phobert_outputs VALUES (?, ?, ?, ?)", rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def __len__(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM phobert_outputs").fetchone()[0]
+        finally:
+            conn.close()
@@ -1,19 +1,184 @@
-from transformers import pipeline
-
-class PhoBERTModule:
-    def __init__(self, model_name="wonrax/phobert-base-vietnamese-sentiment"):
-        self.pipe = pipeline("sentiment-analysis", model=model_name, tokenizer=model_name)
-
-    def analyze_sentiment(self, text):
-        """Analyze sentiment using PhoBERT"""
-        result = self.pipe(text)[0]
-        label = result['label']
-        confidence = result['score']
-        # Map labels to POSITIVE, NEUTRAL, NEGATIVE
-        if label == 'POS':
-            sentiment = 'POSITIVE'
-        elif label == 'NEG':
-            sentiment = 'NEGATIVE'
-        else:
-            sentiment = 'NEUTRAL'
-        return sentiment, confidence
\ No newline at end of file
+import os
+
+from sentiment_backend import SentimentBackend
+
+# torch and transformers are imported on first model load, so importing this
+# module (e.g. for cached-only runs) stays cheap
+
+
+def resolve_revision(model_name, revision=None):
+    """Commit SHA that revision (default: the Hub's default branch) points to now."""
+    from transformers import AutoConfig
+    commit = getattr(AutoConfig.from_pretrained(model_name, revision=revision), "_commit_hash", None)
+    if commit is None:
+        raise ValueError(f"Could not resolve {model_name}@{revision or 'default'} to a commit; pin a revision")
+    return commit
+
+
+class PhoBERTModule(SentimentBackend):
+    BACKENDS = ("torch", "onnx")
+
+    def __init__(self, model_name="wonrax/phobert-base-vietnamese-sentiment", revision=None, cache=None, preload=True,
+                 backend="torch", onnx_dir=None, model_path=None, use_fast=True):
+        """revision pins the Hugging Face model revision; cache is an optional
+        PhoBERTCache (an unpinned revision is then resolved to the commit it
+        points to before the model is loaded, see model_key). With
+        preload=False the model is only loaded on the first
+        cache miss, so fully cached runs never load it. backend="onnx" runs an
+        int8-quantized ONNX export (see phobert_onnx) instead of fp32 PyTorch.
+        model_path loads model_name@revision from a local directory (see
+        from_bundle) instead of the Hub. use_fast selects the Rust tokenizer
+        when the checkpoint has one (falls back to the Python one otherwise)."""
+        if backend not in self.BACKENDS:
+            raise ValueError(f"backend must be one of {self.BACKENDS}, got {backend!r}")
+        self.model_name = model_name
+        self.revision = revision
+        self.cache = cache
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.model_path = model_path
+        self.use_fast = use_fast
+        self._pipe = None
+        self._onnx = None
+        if preload:
+            self.load()
+
+    @classmethod
+    def from_bundle(cls, bundle_dir=None, **kwargs):
+        """PhoBERTModule loading offline from a model bundle (see model_bundle)."""
+        import model_bundle
+        bundle_dir = bundle_dir or model_bundle.DEFAULT_BUNDLE_DIR
+        manifest = model_bundle.load_manifest(bundle_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No model bundle in {bundle_dir}; run scripts/build_model_bundle.py")
+        return cls(manifest["model_name"], manifest["revision"], model_path=model_bundle.sentiment_path(bundle_dir),
+                   **kwargs)
+
+    @property
+    def model_key(self):
+        """Model name, revision and backend, used to key cached outputs.
+
+        The persistent cache outlives the Hub's default branch, so with a cache
+        an unpinned revision is resolved to its current commit SHA on first
+        use, and the model is then loaded at that commit.
+        """
+        key = f"{self.model_name}@{self._pinned_revision() or 'default'}"
+        return key + "+onnx-int8" if self.backend == "onnx" else key
+
+    def _pinned_revision(self):
+        """self.revision, first resolved to a commit SHA if it is unpinned and
+        a cache is attached; called before any model is fetched, so the model
+        loaded and the cache keys name the same commit."""
+        if self.revision is None and self.cache is not None:
+            if self.model_path:
+                raise ValueError(f"The model bundle at {self.model_path} has no pinned revision; rebuild it "
+                                 "(scripts/build_model_bundle.py) to cache its outputs")
+            self.revision = resolve_revision(self.model_name)
+        return self.revision
+
+    def load(self):
+        """Load the selected backend now instead of on the first cache miss."""
+        return self._onnx_model() if self.backend == "onnx" else self._pipeline()
+
+    @property
+    def pipe(self):
+        return self._pipeline()
+
+    @property
+    def tokenizer(self):
+        """The backend's tokenizer: the one tokenizer instance the pipeline uses."""
+        return self._onnx_model().tokenizer if self.backend == "onnx" else self._pipeline().tokenizer
+
+    def _pipeline(self):
+        if self._pipe is None:
+            from transformers import pipeline
+            if self.model_path:
+                # A local directory: nothing is fetched from the Hub
+                self._pipe = pipeline("sentiment-analysis", model=self.model_path, tokenizer=self.model_path,
+                                      use_fast=self.use_fast)
+            else:
+                self._pipe = pipeline("sentiment-analysis", model=self.model_name, tokenizer=self.model_name,
+                                      revision=self._pinned_revision(), use_fast=self.use_fast)
+        return self._pipe
+
+    def _onnx_model(self):
+        if self._onnx is None:
+            import phobert_onnx
+            model_dir = self.onnx_dir or phobert_onnx.model_dir_for(self.model_name, self._pinned_revision())
+            if not os.path.exists(os.path.join(model_dir, phobert_onnx.MODEL_FILE)):
+                source = (self.model_path, None) if self.model_path else (self.model_name, self.revision)
+                phobert_onnx.export_quantized(*source, model_dir)
+            self._onnx = phobert_onnx.OnnxPhoBERT(model_dir, use_fast=self.use_fast)
+        return self._onnx
+
+    def predict_proba(self, text):
+        """Full {PhoBERT label: probability} vector for text, tokenized and
+        truncated exactly as in predict_proba_batch"""
+        if self.cache is not None:
+            probabilities = self.cache.get(self.model_key, text)
+            if probabilities is not None:
+                return probabilities
+        probabilities = self._forward([text], 1)[0]
+        if self.cache is not None:
+            self.cache.put(self.model_key, text, probabilities)
+        return probabilities
+
+    def predict_proba_batch(self, texts, batch_size=32):
+        """predict_proba for many texts, in input order.
+
+        Distinct cache misses are tokenized once, sorted by token length and
+        run in buckets of batch_size, each padded only to its own longest
+        sequence (under torch.inference_mode for the torch backend).
+        """
+        texts = list(texts)
+        results = [None] * len(texts)
+        pending = list(range(len(texts)))
+        if self.cache is not None:
+            results = self.cache.get_many(self.model_key, texts)
+            pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results
+
+        # Repeated texts in the batch go through the model once
+        unique = list(dict.fromkeys(texts[i] for i in pending))
+        computed = dict(zip(unique, self._forward(unique, batch_size)))
+        for i in pending:
+            results[i] = computed[texts[i]]
+        if self.cache is not None:
+            self.cache.put_many(self.model_key, computed.items())
+        return results
+
+    def encode(self, texts):
+        """Token ids for texts (truncated to the model's maximum length), for
+        predict_proba_tokens / analyze_tokens."""
+        return self.tokenizer(list(texts), truncation=True)["input_ids"]
+
+    def _forward(self, texts, batch_size):
+        return self.predict_proba_tokens(self.encode(texts), batch_size)
+
+    def predict_proba_tokens(self, input_ids, batch_size=32):
+        """{label: probability} per already-tokenized text (lists of token ids
+        from encode), in input order. Sequences are run in length-sorted
+        buckets padded to their own longest sequence; no cache is consulted,
+        since the cache is keyed by text."""
+        if self.backend == "onnx":
+            return self._onnx_model().predict_proba_tokens(input_ids, batch_size)
+        import torch
+        pipe = self._pipeline()
+        tokenizer, model = pipe.tokenizer, pipe.model
+        id2label = model.config.id2label
+        order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+        results = [None] * len(input_ids)
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                bucket = order[start:start + batch_size]
+                batch = tokenizer.pad({"input_ids": [input_ids[i] for i in bucket]}, return_tensors="pt")
+                batch = {k: v.to(model.device) for k, v in batch.items()}
+                rows = model(**batch).logits.float().softmax(-1).tolist()
+                for i, row in zip(bucket, rows):
+                    results[i] = {id2label[k]: p for k, p in enumerate(row)}
+        return results
+
+    def analyze_tokens(self, input_ids, batch_size=32):
+        """analyze_batch for already-tokenized texts, so nothing is tokenized twice."""
+        return [self._sentiment(p) for p in self.predict_proba_tokens(input_ids, batch_size)]
@@ -0,0 +1,100 @@
+"""int8 ONNX Runtime backend for PhoBERT.
+
+``export_quantized`` exports the Hugging Face model to ONNX once, applies
+dynamic int8 quantization (weights int8, activations quantized on the fly)
+and saves it with its tokenizer and config under
+``DEFAULT_ONNX_DIR/<model>@<revision>/``. ``OnnxPhoBERT`` loads that directory
+and returns {label: probability} vectors like the PyTorch pipeline, shifted
+slightly by quantization. Measure the shift for your checkpoint with
+scripts/onnx_parity_report.py: REPORT.md only covers a random-weight stand-in.
+
+Select it with ``PhoBERTModule(backend="onnx")``; the export runs on first use
+if the directory is missing. Needs onnxruntime (and torch and onnx for the
+export).
+"""
+import inspect
+import os
+
+try:
+    import numpy as np
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ONNX_DIR = os.environ.get("VSL_PHOBERT_ONNX", os.path.join(ROOT, "onnx_models"))
+MODEL_FILE = "model.int8.onnx"
+
+
+def model_dir_for(model_name, revision=None, root=DEFAULT_ONNX_DIR):
+    return os.path.join(root, f"{model_name}@{revision or 'default'}".replace("/", "--"))
+
+
+def export_quantized(model_name, revision=None, out_dir=None, opset=14):
+    """Export model_name to ONNX and quantize it to int8; returns the output directory."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    out_dir = out_dir or model_dir_for(model_name, revision)
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision).eval()
+    sample = tokenizer(["xin chào"], return_tensors="pt")
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    dynamic = {0: "batch", 1: "sequence"}
+    # torch >= 2.9 defaults to the dynamo exporter (needs onnxscript); keep the
+    # TorchScript one, which the dynamic_axes below are written for
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.inference_mode():
+        torch.onnx.export(
+            model, (sample["input_ids"], sample["attention_mask"]), fp32_path,
+            input_names=["input_ids", "attention_mask"], output_names=["logits"],
+            dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "logits": {0: "batch"}},
+            opset_version=opset, **legacy)
+    quantize_dynamic(fp32_path, os.path.join(out_dir, MODEL_FILE), weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+    return out_dir
+
+
+class OnnxPhoBERT:
+    def __init__(self, model_dir, threads=None, use_fast=True):
+        """threads sets ONNX Runtime's intra-op thread count (None: its default)."""
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("The onnx backend needs onnxruntime: pip install onnxruntime")
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.model_dir = model_dir
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, use_fast=use_fast)
+        self.id2label = AutoConfig.from_pretrained(model_dir).id2label
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, MODEL_FILE), options, providers=["CPUExecutionProvider"])
+
+    def predict_proba_batch(self, texts, batch_size=32):
+        """{label: probability} per text, in input order, run in length-sorted buckets."""
+        return self.predict_proba_tokens(self.tokenizer(list(texts), truncation=True)["input_ids"], batch_size)
+
+    def predict_proba_tokens(self, input_ids, batch_size=32):
+        """predict_proba_batch for already-tokenized texts (lists of token ids)."""
+        order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+        results = [None] * len(input_ids)
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            batch = self.tokenizer.pad({"input_ids": [input_ids[i] for i in bucket]}, return_tensors="np")
+            logits = self.session.run(["logits"], {
+                "input_ids": batch["input_ids"].astype(np.int64),
+                "attention_mask": batch["attention_mask"].astype(np.int64),
+            })[0].astype(np.float64)
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            for i, row in zip(bucket, probs.tolist()):
+                results[i] = {self.id2label[k]: p for k, p in enumerate(row)}
+        return results
@@ -0,0 +1,73 @@
+"""Process pool of PhoBERT replicas sharing one copy of the weights.
+
+The parent loads the model once, then forks the workers: each child inherits
+the weights copy-on-write instead of loading its own copy, so memory stays
+close to one model while tokenization, forward passes and post-processing
+run on N cores. gc.freeze() before the fork keeps the garbage collector from
+touching (and so copying) the parent's objects in the children.
+
+Each worker pins torch to threads_per_worker intra-op threads so N workers do
+not oversubscribe the machine. Inputs are dispatched in chunks and results
+come back in input order.
+
+Requires the "fork" start method (Linux/macOS); Windows has no fork.
+"""
+import gc
+import importlib.util
+import multiprocessing
+import os
+
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+
+# Model inherited by forked workers; set in the parent just before forking
+_model = None
+_batch_size = 32
+
+
+def _init_worker(threads_per_worker):
+    if TORCH_AVAILABLE:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+
+
+def _analyze_chunk(texts):
+    return _model.analyze_batch(texts, _batch_size)
+
+
+class PhoBERTPool:
+    def __init__(self, model, workers=None, threads_per_worker=1, chunk_size=64, batch_size=32):
+        """model is a PhoBERTModule (or anything with analyze_batch); it is loaded
+        in this process before forking. workers defaults to the CPU count."""
+        global _model, _batch_size
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("PhoBERTPool needs the 'fork' start method")
+        if hasattr(model, "load"):
+            model.load()  # load before forking so children share the weights
+        self.model = model
+        self.workers = workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size
+        _model, _batch_size = model, batch_size
+        gc.collect()
+        gc.freeze()
+        try:
+            self._pool = multiprocessing.get_context("fork").Pool(
+                self.workers, initializer=_init_worker, initargs=(threads_per_worker,))
+        finally:
+            gc.unfreeze()
+
+    def analyze_batch(self, texts):
+        """[(label, confidence), ...] for texts, in input order."""
+        texts = list(texts)
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        return [result for chunk in self._pool.imap(_analyze_chunk, chunks) for result in chunk]
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
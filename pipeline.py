@@ -0,0 +1,182 @@
+"""End-to-end sentiment pipeline: preprocessing, PhoBERT, rules and fusion.
+
+``SentimentPipeline.analyze`` runs the same steps as the Streamlit app for one
+text. With a ResultCache attached, results are cached under the canonical
+text (preprocessing minus word segmentation: noise, spacing and slang
+variants share it) plus the PhoBERT model and revision, lexicon version and
+fusion parameters, so a lexicon swap or a fusion retune never serves stale
+results.
+
+``analyze_batch`` computes each distinct canonical text once, both within
+the batch and across batches through the cache, runs the model on the
+remaining texts in one batched call and fans the results back out; stats()
+reports the dedup ratio.
+
+With ``rule_first=True`` the rule analysis runs first and PhoBERT is only
+called when ConditionalFusion.needs_model says its output can change the
+result; final labels are identical, and the skipped requests carry None for
+the PhoBERT fields.
+
+With a ``deadline`` (seconds per request, counted from the start of
+analyze) PhoBERT runs on a DeadlineRunner; when it cannot answer in time,
+fusion runs on the rule outputs alone and the result is marked degraded.
+A request coalesced behind another one for the same text waits no longer
+than its own deadline either. Degraded results are never cached.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from model_runner import DeadlineRunner
+from result_cache import FlightTimeout
+
+# Result of SentimentPipeline.analyze
+PipelineResult = namedtuple("PipelineResult", [
+    "label",               # fused label
+    "confidence",          # fused confidence
+    "processed_text",      # preprocessor output fed to both models
+    "phobert_label",
+    "phobert_confidence",
+    "rule",                # RuleAnalysis of processed_text
+    "model_skipped",       # True when fusion decided from the rules alone (rule_first)
+    "degraded",            # True when PhoBERT missed the deadline and rules answered alone
+])
+
+
+class SentimentPipeline:
+    def __init__(self, preprocessor, phobert, rule_engine, fusion, cache=None, rule_first=False, deadline=None,
+                 runner=None):
+        """deadline is the default per-request budget in seconds (None: wait for
+        PhoBERT); runner is the DeadlineRunner used under a deadline."""
+        self.preprocessor = preprocessor
+        self.phobert = phobert
+        self.rule_engine = rule_engine
+        self.fusion = fusion
+        self.cache = cache
+        self.rule_first = rule_first
+        self.deadline = deadline
+        self.runner = runner
+        self._runner_lock = threading.Lock()
+        self.model_calls = 0
+        self.model_skips = 0
+        self.degraded = 0
+        self.batch_texts = 0     # texts passed to analyze_batch
+        self.batch_unique = 0    # distinct canonical texts among them
+
+    @property
+    def skip_rate(self):
+        """Fraction of computed (uncached) requests that never reached PhoBERT."""
+        total = self.model_calls + self.model_skips
+        return self.model_skips / total if total else 0.0
+
+    def stats(self):
+        """Counters for monitoring: model calls and skips, degraded results and batch dedup."""
+        return {
+            "model_calls": self.model_calls,
+            "model_skips": self.model_skips,
+            "skip_rate": self.skip_rate,
+            "degraded": self.degraded,
+            "batch_texts": self.batch_texts,
+            "batch_unique": self.batch_unique,
+            # Texts per distinct text: 2.0 means half the batch was duplicates
+            "dedup_ratio": self.batch_texts / self.batch_unique if self.batch_unique else 1.0,
+        }
+
+    def cache_key(self, text):
+        return self._key(self.preprocessor.canonicalize(text))
+
+    def _key(self, canonical):
+        return (
+            canonical,
+            getattr(self.phobert, "model_key", None),
+            self.rule_engine.lexicon_version,
+            self.fusion.params(),
+        )
+
+    def analyze(self, text, deadline=None):
+        """Return a PipelineResult for text (cached when the pipeline has a cache).
+
+        deadline overrides the pipeline's default budget for this request.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        expires_at = None if deadline is None else time.monotonic() + deadline
+        canonical = self.preprocessor.canonicalize(text)
+        if self.cache is None:
+            return self._run(canonical, expires_at)
+        wait = None if expires_at is None else max(expires_at - time.monotonic(), 0.0)
+        try:
+            return self.cache.get_or_compute(self._key(canonical), lambda: self._run(canonical, expires_at),
+                                             cacheable=lambda result: not result.degraded, wait=wait)
+        except FlightTimeout:
+            # Coalesced behind a request that is still running: no time is left
+            # for the model, so answer from the rules alone
+            return self._run(canonical, time.monotonic())
+
+    def analyze_batch(self, texts, batch_size=32):
+        """PipelineResults for texts, in input order (no deadline).
+
+        Each distinct canonical text is computed once; cached ones are not
+        recomputed, and the model sees the rest in one analyze_batch call.
+        """
+        canonical = [self.preprocessor.canonicalize(t) for t in texts]
+        unique = list(dict.fromkeys(canonical))
+        self.batch_texts += len(canonical)
+        self.batch_unique += len(unique)
+        results = {}
+        if self.cache is not None:
+            for c in unique:
+                cached = self.cache.get(self._key(c))
+                if cached is not None:
+                    results[c] = cached
+        todo = [c for c in unique if c not in results]
+        processed = [self.preprocessor.word_segmentation(c) for c in todo]
+        rules = [self.rule_engine.analyze(p) for p in processed]
+        needed = [i for i, rule in enumerate(rules)
+                  if not self.rule_first or self.fusion.needs_model(rule.score, mixed_flag=rule.mixed)]
+        outputs = self.phobert.analyze_batch([processed[i] for i in needed], batch_size) if needed else []
+        outputs = dict(zip(needed, outputs))
+        self.model_calls += len(needed)
+        self.model_skips += len(todo) - len(needed)
+        for i, (c, processed_text, rule) in enumerate(zip(todo, processed, rules)):
+            l_phobert, c_phobert = outputs.get(i, (None, None))
+            label, confidence = self.fusion.fuse(l_phobert, c_phobert, rule.score, mixed_flag=rule.mixed,
+                                                 neutral_flag=rule.neutral, hedged_flag=rule.hedged)
+            results[c] = PipelineResult(label, confidence, processed_text, l_phobert, c_phobert, rule,
+                                        i not in outputs, False)
+            if self.cache is not None:
+                self.cache.put(self._key(c), results[c])
+        return [results[c] for c in canonical]
+
+    def _run(self, canonical, expires_at=None):
+        processed_text = self.preprocessor.word_segmentation(canonical)
+        rule = self.rule_engine.analyze(processed_text)
+        skipped = self.rule_first and not self.fusion.needs_model(rule.score, mixed_flag=rule.mixed)
+        l_phobert = c_phobert = None
+        if skipped:
+            self.model_skips += 1
+        elif expires_at is None:
+            l_phobert, c_phobert = self.phobert.analyze_sentiment(processed_text)
+            self.model_calls += 1
+        else:
+            output = self._deadline_runner().analyze(processed_text, expires_at - time.monotonic())
+            if output is not None:
+                l_phobert, c_phobert = output
+                self.model_calls += 1
+        degraded = not skipped and l_phobert is None
+        flags = dict(mixed_flag=rule.mixed, neutral_flag=rule.neutral, hedged_flag=rule.hedged)
+        if degraded:
+            self.degraded += 1
+            label, confidence = self.fusion.fuse_without_model(rule.score, **flags)
+        else:
+            label, confidence = self.fusion.fuse(l_phobert, c_phobert, rule.score, **flags)
+        return PipelineResult(label, confidence, processed_text, l_phobert, c_phobert, rule, skipped, degraded)
+
+    def _deadline_runner(self):
+        # Created on the first request with a deadline; the lock keeps
+        # concurrent first requests from each starting a runner (and so
+        # splitting its max_pending budget)
+        if self.runner is None:
+            with self._runner_lock:
+                if self.runner is None:
+                    self.runner = DeadlineRunner(self.phobert)
+        return self.runner
@@ -1,96 +1,95 @@
+import importlib.util
 import re
-try:
-    from underthesea import word_tokenize
-    UNDERTHESEA_AVAILABLE = True
-except ImportError:
-    UNDERTHESEA_AVAILABLE = False
-try:
-    from transformers import AutoTokenizer
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+
+from slang_normalizer import DEFAULT_SLANG_PATH, SlangNormalizer
+
+# underthesea takes seconds to import, so it is only imported on first use
+UNDERTHESEA_AVAILABLE = importlib.util.find_spec("underthesea") is not None
+
+# remove_noise patterns, compiled once
+_URL = re.compile(r'http\S+|www\S+|https\S+')
+_MENTION = re.compile(r'@\w+')
+_REPEATED = re.compile(r'(.)\1\1+')
+# Vietnamese letters are \w, so the old explicit diacritic list was redundant
+_SPECIAL = re.compile(r'[^\w\s]+')
 
 class VietnamesePreprocessor:
-    def __init__(self, phobert_model="vinai/phobert-base"):
-        if TRANSFORMERS_AVAILABLE:
-            self.tokenizer = AutoTokenizer.from_pretrained(phobert_model, use_fast=False)
-        else:
-            self.tokenizer = None
-        # Sentiment Slang Dictionary - customizable
-        self.slang_dict = {
-            "ko": "không",
-            "mng": "mọi người",
-            "bt": "bình thường",
-            "dc": "được",
-            "k": "không",
-            "r": "rồi",
-            "vs": "với",
-            "tk": "tớ",
-            "mn": "mọi người",
-            "ad": "admin",
-            "vip": "vip",
-            "pro": "chuyên nghiệp",
-            "ngon": "tốt",
-            "xấu": "tệ",
-            "tuyệt": "tuyệt vời",
-            "oke": "ok",
-            "ok": "được",
-            "hihi": "cười",
-            "haha": "cười",
-            "hehe": "cười",
-            # Add more as needed
-        }
+    def __init__(self, tokenizer=None, slang_path=DEFAULT_SLANG_PATH):
+        """tokenizer is the model backend's tokenizer (PhoBERTModule.tokenizer);
+        the preprocessor no longer loads a second copy of its own. slang_path
+        is the slang<TAB>replacement file (slang.tsv)."""
+        self.tokenizer = tokenizer
+        # Sentiment Slang Dictionary - customizable (a dict; edit it or assign a new one)
+        self.slang_dict = SlangNormalizer.load(slang_path)
 
     def remove_noise(self, text):
         """Remove noise: special chars, URLs, mentions, repeated chars"""
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-        # Remove mentions
-        text = re.sub(r'@\w+', '', text)
+        # Remove URLs and mentions (the substring checks skip most texts)
+        if "http" in text or "www" in text:
+            text = _URL.sub('', text)
+        if "@" in text:
+            text = _MENTION.sub('', text)
         # Remove repeated chars (e.g., ngonnn -> ngon)
-        text = re.sub(r'(.)\1{2,}', r'\1', text)
-        # Remove special chars except Vietnamese diacritics and spaces
-        text = re.sub(r'[^\w\sàáảãạâầấẩẫậăằắẳẵặèéẻẽẹêềếểễệđìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵÀÁẢÃẠÂẦẤẨẪẬĂẰẮẲẴẶÈÉẺẼẸÊỀẾỂỄỆĐÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴ]', ' ', text)
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        text = _REPEATED.sub(r'\1', text)
+        # Special chars -> space, then normalize whitespace
+        return ' '.join(_SPECIAL.sub(' ', text).split())
+
+    def remove_noise_batch(self, texts):
+        """remove_noise for a list of texts, with each pattern run once over
+        the whole batch (texts joined on newlines, which no pattern crosses)"""
+        if not texts:
+            return []
+        # In-text newlines become spaces: both only ever end up as one space
+        joined = '\n'.join(t.replace('\n', ' ') for t in texts)
+        if "http" in joined or "www" in joined:
+            joined = _URL.sub('', joined)
+        if "@" in joined:
+            joined = _MENTION.sub('', joined)
+        joined = _SPECIAL.sub(' ', _REPEATED.sub(r'\1', joined))
+        return [' '.join(line.split()) for line in joined.split('\n')]
 
     def normalize_teencode(self, text):
-        """Normalize teencode and slang"""
-        words = text.split()
-        normalized_words = []
-        for word in words:
-            lower_word = word.lower()
-            if lower_word in self.slang_dict:
-                normalized_words.append(self.slang_dict[lower_word])
-            else:
-                normalized_words.append(word)
-        return ' '.join(normalized_words)
+        """Normalize teencode and slang (phrases, case and punctuation aware)"""
+        if not isinstance(self.slang_dict, SlangNormalizer):
+            self.slang_dict = SlangNormalizer(self.slang_dict)
+        return self.slang_dict.normalize(text)
 
     def word_segmentation(self, text):
         """Word segmentation using underthesea or fallback"""
         if UNDERTHESEA_AVAILABLE:
+            from underthesea import word_tokenize
             return word_tokenize(text, format="text")
         else:
             # Fallback: simple split by spaces
             return text
 
-    def tokenize(self, text):
-        """Tokenize using PhoBERT tokenizer or fallback"""
-        if TRANSFORMERS_AVAILABLE and self.tokenizer:
-            return self.tokenizer(text, return_tensors="pt", padding=True, truncation=True)
+    def tokenize(self, text, return_tensors=None):
+        """Tokenize using the backend's PhoBERT tokenizer or fallback.
+
+        input_ids are lists of token ids, what PhoBERTModule.analyze_tokens
+        takes; return_tensors="pt" returns padded torch tensors instead, as
+        tokenize did before it used the backend's tokenizer."""
+        if self.tokenizer:
+            if return_tensors:
+                return self.tokenizer(text, return_tensors=return_tensors, padding=True, truncation=True)
+            return self.tokenizer(text, truncation=True)
         else:
             # Fallback: return text as dict
             return {"input_ids": text, "attention_mask": [1] * len(text.split())}
 
+    def canonicalize(self, text):
+        """Noise removal and teencode normalization: texts that only differ in
+        noise, spacing or slang share this form (and so their results)"""
+        text = self.remove_noise(text)
+        return self.normalize_teencode(text)
+
     def preprocess(self, text):
         """Full preprocessing pipeline"""
-        text = self.remove_noise(text)
-        text = self.normalize_teencode(text)
-        segmented = self.word_segmentation(text)
-        return segmented
+        return self.word_segmentation(self.canonicalize(text))
 
-    def preprocess_for_phobert(self, text):
-        """Preprocess and tokenize for PhoBERT"""
+    def preprocess_for_phobert(self, text, return_tensors=None):
+        """Preprocess and tokenize for PhoBERT; feed input_ids to
+        PhoBERTModule.analyze_tokens so the text is tokenized only once
+        (return_tensors as in tokenize)"""
         processed = self.preprocess(text)
-        return self.tokenize(processed)
\ No newline at end of file
+        return self.tokenize(processed, return_tensors)
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Bounded in-process result cache with LRU/TTL eviction and single-flight.
+
+``ResultCache.get_or_compute(key, compute)`` returns the cached value for key
+or runs compute() once: concurrent callers asking for a key that is already
+being computed wait for that computation instead of starting their own (for
+at most ``wait`` seconds, after which they get FlightTimeout). Failures are
+propagated to every waiting caller and never cached.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class FlightTimeout(TimeoutError):
+    """Another caller's computation of the key did not finish within wait seconds."""
+
+
+class _Flight:
+    """One in-progress computation that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+    def __init__(self, max_entries=10000, ttl=None, clock=time.monotonic):
+        """max_entries bounds the cache (least recently used evicted first);
+        ttl, in seconds, expires entries regardless of use (None: never)."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0   # callers that waited on another caller's computation
+        self.evictions = 0   # entries dropped for size or age
+
+    def get_or_compute(self, key, compute, cacheable=None, wait=None):
+        """cacheable(value) -> False hands the value to the waiting callers
+        without storing it (e.g. degraded results). wait bounds, in seconds,
+        how long this caller waits on a computation already in flight (None:
+        until it finishes); past it FlightTimeout is raised, and the
+        computation carries on for its own caller."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.evictions += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not flight.done.wait(wait):
+                raise FlightTimeout(f"waited {wait:.3f}s for another caller's computation")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            if cacheable is None or cacheable(flight.value):
+                self._store(key, flight.value)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def get(self, key):
+        """Cached value for key, or None (counted as a hit or a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        self._store(key, value)
+
+    def _store(self, key, value):
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for monitoring: hits, misses, coalesced, evictions, size, hit_rate."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,428 @@
+"""Vectorized batch scoring for RuleBasedSentiment.
+
+Tokens are interned to integer ids and packed into padded NumPy arrays: once
+against the diacritic-folded lexicon vocabulary, and once by surface form for
+the tables matched literally (negations, intensifiers, neutral words) and the
+accented lexicon forms. Phrase matching is done per phrase length with a
+mixed-radix encoding of the token window and a ``searchsorted`` lookup, and
+the greedy left-to-right scans (longest match, intensifiers, negation scope)
+are stepped for the whole batch at once. Neutral phrases and "cũng" are
+compiled into one regex each and the engine's cue detector (hedges,
+questions, sarcasm) runs once over the whole chunk, so the
+Python-level work per text is limited to lower-casing, splitting and the rare
+clause rescoring for mixed rows.
+
+Results are identical to ``RuleBasedSentiment.analyze`` for every field
+returned here.
+"""
+import copy
+import re
+from collections import namedtuple
+from itertools import chain
+
+import numpy as np
+
+from cue_detector import HEDGE, QUESTION, SARCASM
+from diacritics import fold, fold_lexicon, listed_forms
+
+# Result of BatchRuleScorer.analyze: one entry per input text, in input order.
+RuleBatch = namedtuple("RuleBatch", ["scores", "mixed", "neutral", "hedged"])
+
+PAD = 0
+OOV = 1
+MAX_PHRASE = 5   # analyze_sentiment looks at phrases of up to 5 words
+MAX_CLAUSE = 4   # mixed / neutral scans only look at up to 4 words
+
+
+class BatchRuleScorer:
+    def __init__(self, engine):
+        self.engine = engine
+        lexicon = engine.tables.lexicon
+        self.matcher = engine.tables.matcher()
+
+        # Folded vocabulary: every token of a (folded) lexicon key
+        entries = getattr(lexicon, "entries", lexicon)
+        # Accented forms the lexicon lists, with their own or their key's score;
+        # any other accented window does not match (see PhraseMatcher)
+        forms = {form: lexicon[form] for form in getattr(lexicon, "forms", ())}
+        tokens = set()
+        for phrase in entries:
+            tokens.update(phrase.split(' '))
+        self.vocab = _vocab(tokens)
+        self.base = len(self.vocab) + 2
+
+        # Surface vocabulary: tokens compared as written by the scalar path
+        surface = set(engine.negations) | set(engine.intensifiers)
+        surface.update(w for w in engine.neutral_indicators if ' ' not in w)
+        for phrase in forms:
+            surface.update(phrase.split(' '))
+        self.surface_vocab = _vocab(surface)
+        self.surface_tokens = [None, None] + sorted(surface)   # id -> token
+        self.surface_base = len(self.surface_vocab) + 2
+        _check_radix(self.base, self.surface_base)
+
+        size = self.surface_base
+        self.is_negation = np.zeros(size, dtype=bool)
+        self.is_negation[[self.surface_vocab[w] for w in engine.negations]] = True
+        self.intensifier = np.zeros(size, dtype=np.float64)
+        for w, m in engine.intensifiers.items():
+            self.intensifier[self.surface_vocab[w]] = m
+        self.is_neutral_word = np.zeros(size, dtype=bool)
+        for w in engine.neutral_indicators:
+            if w in self.surface_vocab:
+                self.is_neutral_word[self.surface_vocab[w]] = True
+
+        # Substring cues, each compiled into one alternation. _rows_matching runs
+        # them (and the cue detector) over the newline-joined chunk; no cue can
+        # match across a newline.
+        self.neutral_phrase_re = _any_of(engine.neutral_indicators)
+        self.cung_re = re.compile(r"\b(?:cũng|cung)\b")
+
+        # Sorted phrase codes and scores, one table per phrase length: folded
+        # keys with their default scores, and the listed accented forms (with
+        # the code of their folded key, for overlay)
+        self.codes, self.scores = _code_tables(entries, self.vocab, self.base)
+        self.form_codes, self.form_scores = _code_tables(forms, self.surface_vocab, self.surface_base)
+        keys = {form: _phrase_code(fold(form), self.vocab, self.base) for form in forms}
+        self.form_keys = _code_tables(keys, self.surface_vocab, self.surface_base, np.int64)[1]
+
+    def overlay(self, name):
+        """Return a scorer for one lexicon overlay, derived from this base scorer.
+
+        Only the overlay's own phrases are encoded: the base code tables are
+        re-encoded with NumPy when the overlay brings new tokens, then the
+        overlay's keys and the accented forms they affect are swapped in.
+        """
+        tables = self.engine.tables
+        overlay = tables.overlays.get(name)
+        if overlay is None:
+            raise ValueError(f"Unknown lexicon overlay {name!r}")
+        lexicon = tables.lexicon_for(name)
+        scorer = copy.copy(self)
+        scorer.matcher = tables.matcher(name)
+
+        kept = {k: v for k, v in overlay.items() if v is not None}
+        entries, _, _ = fold_lexicon(kept)
+        changed = {fold(k) for k in overlay}
+        scorer._add_tokens({tok for key in entries for tok in key.split(' ')},
+                           {tok for form in listed_forms(kept) for tok in form.split(' ')})
+
+        # Folded keys: every key the overlay touches is dropped, then its own re-added
+        dropped = _codes_by_length(changed, scorer.vocab, scorer.base)
+        scorer.codes, scorer.scores = _merged(
+            scorer.codes, scorer.scores, dropped, _code_tables(entries, scorer.vocab, scorer.base))
+
+        # Accented forms: those of touched keys are looked up again in the overlay lexicon
+        forms = set(listed_forms(kept))
+        for length, codes in scorer.form_codes.items():
+            affected = np.isin(scorer.form_keys[length], dropped[length])
+            forms.update(_phrase(int(code), length, scorer.surface_tokens, scorer.surface_base)
+                         for code in codes[affected])
+        forms = {form: lexicon[form] for form in forms if form in lexicon}
+        keys = {form: _phrase_code(fold(form), scorer.vocab, scorer.base) for form in forms}
+        added = _code_tables(forms, scorer.surface_vocab, scorer.surface_base)
+        added_keys = _code_tables(keys, scorer.surface_vocab, scorer.surface_base, np.int64)
+        form_codes, form_scores = _merged(scorer.form_codes, scorer.form_scores, dropped, added, scorer.form_keys)
+        scorer.form_keys = _merged(scorer.form_codes, scorer.form_keys, dropped, added_keys, scorer.form_keys)[1]
+        scorer.form_codes, scorer.form_scores = form_codes, form_scores
+        return scorer
+
+    def _add_tokens(self, tokens, surface_tokens):
+        """Give new (folded / surface) tokens ids, re-encoding the code tables for the wider radix."""
+        tokens = sorted(set(tokens) - self.vocab.keys())
+        surface_tokens = sorted(set(surface_tokens) - self.surface_vocab.keys())
+        if tokens:
+            self.vocab = dict(self.vocab, **_vocab(tokens, start=len(self.vocab)))
+            base, self.base = self.base, len(self.vocab) + 2
+            self.codes = _rebased(self.codes, base, self.base)
+            self.form_keys = {length: _rebase(keys, length, base, self.base)
+                              for length, keys in self.form_keys.items()}
+        if surface_tokens:
+            self.surface_vocab = dict(self.surface_vocab, **_vocab(surface_tokens, start=len(self.surface_vocab)))
+            self.surface_tokens = self.surface_tokens + surface_tokens
+            base, self.surface_base = self.surface_base, len(self.surface_vocab) + 2
+            self.form_codes = _rebased(self.form_codes, base, self.surface_base)
+            grow = len(surface_tokens)
+            self.is_negation = np.concatenate([self.is_negation, np.zeros(grow, dtype=bool)])
+            self.intensifier = np.concatenate([self.intensifier, np.zeros(grow, dtype=np.float64)])
+            self.is_neutral_word = np.concatenate([self.is_neutral_word, np.zeros(grow, dtype=bool)])
+        _check_radix(self.base, self.surface_base)
+
+    def analyze(self, texts, chunk_size=4096):
+        """Score texts in chunks of chunk_size rows; returns a RuleBatch of arrays."""
+        parts = [self._analyze_chunk(texts[i:i + chunk_size]) for i in range(0, len(texts), chunk_size)]
+        if not parts:
+            empty = np.zeros(0, dtype=bool)
+            return RuleBatch(np.zeros(0, dtype=np.float64), empty, empty.copy(), empty.copy())
+        return RuleBatch(*(np.concatenate(col) for col in zip(*parts)))
+
+    @staticmethod
+    def _encode(lowered, vocab):
+        get = vocab.get
+        rows = [[get(w, OOV) for w in text.split()] for text in lowered]
+        lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        width = max(int(lengths.max()) if len(rows) else 0, 1)
+        ids = np.zeros((len(rows), width), dtype=np.int64)
+        ids[np.arange(width) < lengths[:, None]] = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=int(lengths.sum()))
+        return ids, lengths
+
+    def _match_tables(self, ids, surface_ids, accented, lengths):
+        """Longest match (length, score) per position for max lengths 5 and 4, plus any-sign flags.
+
+        accented flags the tokens that carry diacritics."""
+        n, width = ids.shape
+        best5_len = np.zeros((n, width), dtype=np.int64)
+        best5_score = np.zeros((n, width), dtype=np.float64)
+        best4_len = np.zeros((n, width), dtype=np.int64)
+        best4_score = np.zeros((n, width), dtype=np.float64)
+        has_pos = np.zeros(n, dtype=bool)
+        has_neg = np.zeros(n, dtype=bool)
+
+        code = surface_code = any_accent = None
+        for length in range(1, min(MAX_PHRASE, width) + 1):
+            span = width - length + 1
+            window = ids[:, length - 1:length - 1 + span]
+            code = window if code is None else code[:, :span] * self.base + window
+            window = surface_ids[:, length - 1:length - 1 + span]
+            surface_code = window if surface_code is None else surface_code[:, :span] * self.surface_base + window
+            window = accented[:, length - 1:length - 1 + span]
+            any_accent = window if any_accent is None else any_accent[:, :span] | window
+            valid = (np.arange(span) + length) <= lengths[:, None]
+            hit, score = _lookup(self.codes[length], self.scores[length], code, valid)
+            if not hit.any():
+                continue
+            listed, form_score = _lookup(self.form_codes[length], self.form_scores[length], surface_code, hit)
+            score = np.where(listed, form_score, score)
+            hit &= listed | ~any_accent
+
+            best5_len[:, :span][hit] = length
+            best5_score[:, :span][hit] = score[hit]
+            if length <= MAX_CLAUSE:
+                best4_len[:, :span][hit] = length
+                best4_score[:, :span][hit] = score[hit]
+                has_pos |= (hit & (score > 0)).any(axis=1)
+                has_neg |= (hit & (score < 0)).any(axis=1)
+        return best5_len, best5_score, best4_len, best4_score, has_pos, has_neg
+
+    @staticmethod
+    def _count_signs(best_len, best_score, lengths):
+        """Greedy longest-match scan (as in detect_mixed_sentiment), stepped for all rows."""
+        n = len(lengths)
+        pos = np.zeros(n, dtype=np.int64)
+        pos_count = np.zeros(n, dtype=np.int64)
+        neg_count = np.zeros(n, dtype=np.int64)
+        rows = np.arange(n)
+        active = pos < lengths
+        while active.any():
+            r = rows[active]
+            p = pos[r]
+            length = best_len[r, p]
+            score = best_score[r, p]
+            matched = length > 0
+            pos_count[r] += matched & (score > 0)
+            neg_count[r] += matched & (score < 0)
+            pos[r] = p + np.maximum(length, 1)
+            active = pos < lengths
+        return pos_count, neg_count
+
+    def _lexicon_scores(self, ids, best_len, best_score, lengths):
+        """Vectorized RuleBasedSentiment._lexicon_score (intensifiers + negation scope)."""
+        n = len(lengths)
+        pos = np.zeros(n, dtype=np.int64)
+        scope = np.zeros(n, dtype=np.int64)
+        score = np.zeros(n, dtype=np.float64)
+        rows = np.arange(n)
+        active = pos < lengths
+        while active.any():
+            r = rows[active]
+            p = pos[r]
+            ln = lengths[r]
+
+            # Check for intensifier
+            mult = self.intensifier[ids[r, p]]
+            boosted = (mult > 0) & (p + 1 < ln)
+            mult = np.where(boosted, mult, 1.0)
+            p = p + boosted
+
+            tok = ids[r, p]
+            length = best_len[r, p]
+            s = best_score[r, p]
+            matched = length > 0
+            sc = scope[r]
+
+            # Apply negation if in scope and phrase doesn't already include negation
+            negate = matched & (sc > 0) & ~((length > 1) & self.is_negation[tok])
+            s = np.where(negate, -s, s)
+            sc = np.where(negate, sc - length, np.where(matched, np.maximum(0, sc - length), sc))
+            # Unmatched negation words open a 3-word scope
+            sc = np.where(~matched & self.is_negation[tok], 3, sc)
+
+            score[r] = np.where(matched, score[r] + s * mult, score[r])
+            scope[r] = sc
+            pos[r] = p + np.maximum(length, 1)
+            active = pos < lengths
+        return score
+
+    def _analyze_chunk(self, texts):
+        engine = self.engine
+        lowered = [t.lower() for t in texts]
+        joined = "\n".join(lowered)
+        starts = np.cumsum([0] + [len(t) + 1 for t in lowered[:-1]]) if lowered else np.zeros(0, dtype=np.int64)
+        folded = [fold(t) for t in lowered]
+        ids, lengths = self._encode(folded, self.vocab)
+        surface_ids, _ = self._encode(lowered, self.surface_vocab)
+        accented = _accented(lowered, folded, ids.shape)
+        best5_len, best5_score, best4_len, best4_score, has_pos, has_neg = self._match_tables(
+            ids, surface_ids, accented, lengths)
+
+        # Mixed: "cũng" heuristic on the raw text, then conservative sign counts
+        pos_count, neg_count = self._count_signs(best4_len, best4_score, lengths)
+        both = (pos_count > 0) & (neg_count > 0)
+        mixed = both & ((np.abs(pos_count - neg_count) <= 1) | (pos_count >= 2) | (neg_count >= 2))
+        for i in np.flatnonzero(_rows_matching(self.cung_re, joined, starts) & ~mixed):
+            mixed[i] = engine._cung_clause_scores(lowered[i], matcher=self.matcher) is not None
+
+        # Neutral context
+        valid = np.arange(ids.shape[1]) < lengths[:, None]
+        neutral_count = (self.is_neutral_word[surface_ids] & valid).sum(axis=1)
+        phrase_present = _rows_matching(self.neutral_phrase_re, joined, starts)
+        neutral = ((neutral_count >= 2) | phrase_present | (lengths > 12)) & ~(has_pos | has_neg)
+
+        cue_rows = {HEDGE: [], QUESTION: [], SARCASM: []}
+        for cue in engine.cue_detector.find(joined):
+            if cue.kind in cue_rows:
+                cue_rows[cue.kind].append(cue.start)
+        hedged = _rows_at(cue_rows[HEDGE], starts)
+
+        # Score: lexicon scan, neutral damping and sarcasm reversal
+        scores = self._lexicon_scores(surface_ids, best5_len, best5_score, lengths)
+        absolute = np.abs(scores)
+        damping = np.where(absolute <= 2, 0.1, np.where(absolute <= 4, 0.3, 0.5))
+        scores = np.where(neutral, scores * damping, scores)
+        has_negation = (self.is_negation[surface_ids] & valid).any(axis=1)
+        sarcasm = has_negation & _rows_at(cue_rows[SARCASM], starts)
+        scores = np.where(sarcasm & (scores != 0), -scores, scores)
+
+        # Mixed rows use the post-contrast clause; questions are always 0.0
+        for i in np.flatnonzero(mixed):
+            post = engine._post_contrast_clause_score(lowered[i], matcher=self.matcher)
+            scores[i] = post if abs(post) >= 1.0 else 0.0
+        scores[_rows_at(cue_rows[QUESTION], starts)] = 0.0
+
+        return scores, mixed, neutral, hedged
+
+
+def _accented(lowered, folded, shape):
+    """Bool array: which tokens of each text carry diacritics."""
+    accented = np.zeros(shape, dtype=bool)
+    for row, (text, text_folded) in enumerate(zip(lowered, folded)):
+        if text != text_folded:
+            accented[row, :len(text.split())] = [w != f for w, f in zip(text.split(), text_folded.split())]
+    return accented
+
+
+def _vocab(tokens, start=0):
+    """Token -> id, leaving 0 and 1 for PAD and OOV (ids from start + 2)."""
+    return {tok: start + i + 2 for i, tok in enumerate(sorted(tokens))}
+
+
+def _check_radix(*bases):
+    for base in bases:
+        if base ** MAX_PHRASE >= 2 ** 63:
+            raise ValueError(f"Lexicon vocabulary too large for int64 phrase codes ({base - 2} tokens)")
+
+
+def _phrase_code(phrase, vocab, base):
+    """Mixed-radix code of a phrase, or None if one of its tokens is not in vocab."""
+    code = 0
+    for tok in phrase.split(' '):
+        if tok not in vocab:
+            return None
+        code = code * base + vocab[tok]
+    return code
+
+
+def _phrase(code, length, tokens, base):
+    """Inverse of _phrase_code, given the id -> token list."""
+    parts = []
+    for _ in range(length):
+        code, tok = divmod(code, base)
+        parts.append(tokens[tok])
+    return ' '.join(reversed(parts))
+
+
+def _code_tables(lexicon, vocab, base, dtype=np.float64):
+    """Per phrase length, sorted mixed-radix phrase codes and their scores."""
+    codes = {}
+    scores = {}
+    for length in range(1, MAX_PHRASE + 1):
+        items = sorted((_phrase_code(phrase, vocab, base), score) for phrase, score in lexicon.items()
+                       if phrase.count(' ') == length - 1)
+        codes[length] = np.array([c for c, _ in items], dtype=np.int64)
+        scores[length] = np.array([s for _, s in items], dtype=dtype)
+    return codes, scores
+
+
+def _codes_by_length(phrases, vocab, base):
+    """Per phrase length, the codes of phrases (those with a token outside vocab cannot match)."""
+    codes = {length: [] for length in range(1, MAX_PHRASE + 1)}
+    for phrase in phrases:
+        code = _phrase_code(phrase, vocab, base)
+        if code is not None and phrase.count(' ') < MAX_PHRASE:
+            codes[phrase.count(' ') + 1].append(code)
+    return {length: np.array(c, dtype=np.int64) for length, c in codes.items()}
+
+
+def _rebase(codes, length, old, new):
+    """Re-encode phrase codes of one length from radix old to radix new."""
+    rebased = np.zeros_like(codes)
+    for k in range(length - 1, -1, -1):
+        rebased = rebased * new + codes // old ** k % old
+    return rebased
+
+
+def _rebased(tables, old, new):
+    return {length: _rebase(codes, length, old, new) for length, codes in tables.items()}
+
+
+def _merged(codes, values, dropped, added, match=None):
+    """Per length: the rows of (codes, values) whose code (or match value) is not
+    in dropped, plus the added (codes, values) tables, sorted by code again."""
+    merged_codes = {}
+    merged_values = {}
+    for length in codes:
+        keep = ~np.isin((codes if match is None else match)[length], dropped[length])
+        c = np.concatenate([codes[length][keep], added[0][length]])
+        v = np.concatenate([values[length][keep], added[1][length]])
+        order = np.argsort(c, kind="stable")
+        merged_codes[length], merged_values[length] = c[order], v[order]
+    return merged_codes, merged_values
+
+
+def _lookup(keys, values, code, valid):
+    """(hit, value) arrays for code looked up in the sorted keys, restricted to valid windows."""
+    if not len(keys):
+        return np.zeros(code.shape, dtype=bool), np.zeros(code.shape, dtype=np.float64)
+    idx = np.minimum(np.searchsorted(keys, code), len(keys) - 1)
+    return (keys[idx] == code) & valid, values[idx]
+
+
+def _any_of(phrases):
+    """Compile a regex matching any of the literal phrases (never the empty string)."""
+    phrases = [p for p in phrases if p]
+    if not phrases:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)))
+
+
+def _rows_matching(pattern, joined, starts):
+    """Bool array: which rows of the newline-joined text contain a match of pattern."""
+    return _rows_at([m.start() for m in pattern.finditer(joined)], starts)
+
+
+def _rows_at(positions, starts):
+    """Bool array: which rows of the newline-joined text contain one of the offsets."""
+    hits = np.zeros(len(starts), dtype=bool)
+    if positions:
+        hits[np.searchsorted(starts, positions, side="right") - 1] = True
+    return hits
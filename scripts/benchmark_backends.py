@@ -0,0 +1,71 @@
+"""Accuracy and throughput of the sentiment backends on the repo's corpora.
+
+Compares the hashed-feature linear backend with PhoBERT (torch or onnx
+backend), on their own and fused with the rule engine as in the app.
+Accuracy is reported on the held-out split (hashed_linear.is_holdout) and
+on every prompt; the linear model should be trained without --all for the
+held-out numbers to mean anything. Throughput is texts/sec of analyze_batch.
+
+Usage: python scripts/benchmark_backends.py [--backends linear torch onnx]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fusion import ConditionalFusion
+from hashed_linear import HashedLinearBackend, is_holdout, load_labeled_prompts
+from preprocessing import VietnamesePreprocessor
+from rule_based import RuleBasedSentiment
+
+
+def make_backend(name):
+    if name == "linear":
+        return HashedLinearBackend()
+    from phobert_module import PhoBERTModule
+    return PhoBERTModule(backend=name)
+
+
+def accuracy(predicted, expected):
+    return sum(p == e for p, e in zip(predicted, expected)) / len(expected) if expected else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["linear", "torch"])
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    preprocessor = VietnamesePreprocessor()
+    prompts = load_labeled_prompts()
+    texts = [preprocessor.preprocess(t) for t, _ in prompts]
+    expected = [label for _, label in prompts]
+    holdout = [is_holdout(t) for t, _ in prompts]
+    rb = RuleBasedSentiment()
+    rules = [rb.analyze(t) for t in texts]
+    fusion = ConditionalFusion()
+
+    print(f"{len(texts)} prompts, {sum(holdout)} held out")
+    print(f"{'backend':>8} {'model acc':>10} {'held-out':>9} {'fused acc':>10} {'held-out':>9} {'texts/s':>10}")
+    for name in args.backends:
+        backend = make_backend(name)
+        backend.analyze_batch(texts[:8], args.batch_size)  # warm up
+        start = time.perf_counter()
+        outputs = backend.analyze_batch(texts, args.batch_size)
+        rate = len(texts) / (time.perf_counter() - start)
+        labels = [label for label, _ in outputs]
+        fused = [fusion.fuse(label, confidence, r.score, mixed_flag=r.mixed, neutral_flag=r.neutral,
+                             hedged_flag=r.hedged)[0] for (label, confidence), r in zip(outputs, rules)]
+        held = [i for i, h in enumerate(holdout) if h]
+        print(f"{name:>8} {accuracy(labels, expected):>10.2%} "
+              f"{accuracy([labels[i] for i in held], [expected[i] for i in held]):>9.2%} "
+              f"{accuracy(fused, expected):>10.2%} "
+              f"{accuracy([fused[i] for i in held], [expected[i] for i in held]):>9.2%} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
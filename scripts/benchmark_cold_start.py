@@ -0,0 +1,91 @@
+"""Cold start and memory of N processes loading the pipeline's models at once.
+
+Each child process loads PhoBERTModule (and the preprocessor), either from
+the Hugging Face hub cache or from the local model bundle, runs one
+prediction and reports its load time, RSS and PSS (proportional set size:
+pages shared with the other processes are split between them, so PSS shows
+how much the bundle's shared file pages save). The weights columns count only
+pages mapped from *.safetensors files: weights PSS well below weights RSS
+means the processes share one page-cache copy of the weights instead of
+each holding its own.
+
+Usage: python scripts/benchmark_cold_start.py [--processes 4] [--source bundle hub]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+CHILD = r"""
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from preprocessing import VietnamesePreprocessor
+from phobert_module import PhoBERTModule
+import model_bundle
+if {source!r} == "bundle":
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    phobert = PhoBERTModule.from_bundle()
+else:
+    phobert = PhoBERTModule()
+pre = VietnamesePreprocessor()
+phobert.analyze_sentiment(pre.preprocess("Sản phẩm rất tốt"))
+elapsed = time.perf_counter() - start
+print("ready", flush=True)
+sys.stdin.read()  # wait until every process has loaded, so shared pages are counted
+mem = {{"rss": 0.0, "pss": 0.0, "weights_rss": 0.0, "weights_pss": 0.0}}
+weights = False
+with open("/proc/self/smaps") as f:
+    for line in f:
+        parts = line.split()
+        if not parts[0].endswith(":"):  # a mapping's header line: address range, ..., path
+            weights = parts[-1].endswith(".safetensors")
+        elif parts[0] in ("Rss:", "Pss:"):
+            key = parts[0][:-1].lower()
+            mem[key] += int(parts[1]) / 1024
+            if weights:
+                mem["weights_" + key] += int(parts[1]) / 1024
+print(json.dumps(dict(mem, seconds=elapsed)))
+"""
+
+
+def run(source, processes):
+    code = CHILD.format(root=ROOT, source=source)
+    children = [subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                 text=True) for _ in range(processes)]
+    for child in children:
+        if not child.stdout.readline():
+            # The child's traceback is already on stderr
+            for other in children:
+                other.kill()
+            sys.exit(f"{source}: a child process failed to load the model (exit code {child.wait()})")
+    for child in children:
+        child.stdin.close()
+    return [json.loads(child.stdout.read()) for child in children]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--source", nargs="+", default=["bundle", "hub"])
+    args = parser.parse_args()
+
+    print(f"{'source':>8} {'procs':>6} {'load s p50':>11} {'RSS MB':>8} {'PSS MB':>8} {'total PSS MB':>13} "
+          f"{'weights RSS MB':>15} {'weights PSS MB':>15}")
+    for source in args.source:
+        stats = run(source, args.processes)
+        print(f"{source:>8} {args.processes:>6} {statistics.median(s['seconds'] for s in stats):>11.2f} "
+              f"{statistics.mean(s['rss'] for s in stats):>8.0f} {statistics.mean(s['pss'] for s in stats):>8.0f} "
+              f"{sum(s['pss'] for s in stats):>13.0f} {statistics.mean(s['weights_rss'] for s in stats):>15.0f} "
+              f"{statistics.mean(s['weights_pss'] for s in stats):>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cue detection cost on adversarial inputs: old substring/regex scans vs CueDetector.
+
+Each input is built to stress one weakness of the old checks (the unbounded
+"không .* quá" wildcard, long unbroken words, runs of punctuation, repeated
+cue prefixes). Inputs are timed at 500 characters and at 10x / 100x that
+length; for a linear-time detector the per-character cost stays flat.
+
+Usage: python scripts/benchmark_cue_detector.py [--lengths 500 5000 50000] [--repeat 20]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from lexicon_artifact import load_tables
+
+ADVERSARIAL = {
+    "không without quá": "không ",
+    "không ... quá (late)": "không tốt ",
+    "one long word": "a",
+    "punctuation": "?!",
+    "cue prefixes": "bạn nghĩ thế ",
+    "connectors": "mặc dù thế nhưng ",
+}
+
+
+def legacy_cues(tables, text_lower):
+    """The checks analyze() ran before the cue detector (substring scans + wildcards)."""
+    hedged = any(h in text_lower for h in tables.hedges) or bool(
+        re.search(r"không .* quá", text_lower) or re.search(r"không .* thôi", text_lower))
+    sarcasm = any(s in text_lower for s in tables.sarcasm_indicators)
+    question = "?" in text_lower or any(q in text_lower for q in tables.question_phrases)
+    connector = next((c for c in sorted(tables.contrastive_connectors, key=lambda x: -len(x)) if c in text_lower), None)
+    return hedged, sarcasm, question, connector
+
+
+def make_input(unit, length, suffix=""):
+    text = unit * (length // len(unit) + 1)
+    return text[:length - len(suffix)] + suffix
+
+
+def time_call(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tables = load_tables()
+    detector = tables.cue_detector()
+    detector.find("")  # compile the start-token regex outside the timings
+
+    print(f"{'input':<22} {'chars':>7} {'legacy us':>11} {'detector us':>12} {'detector ns/char':>17}")
+    for name, unit in ADVERSARIAL.items():
+        suffix = " quá" if "late" in name else ""
+        for length in args.lengths:
+            text = make_input(unit, length, suffix)
+            legacy = time_call(lambda t: legacy_cues(tables, t), text, args.repeat)
+            found = time_call(detector.find, text, args.repeat)
+            print(f"{name:<22} {length:>7} {legacy * 1e6:>11.0f} {found * 1e6:>12.0f} {found * 1e9 / length:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
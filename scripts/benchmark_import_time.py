@@ -0,0 +1,69 @@
+"""Import-time benchmark for the modules that must stay cheap to import.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and its
+cumulative import time taken as the median of --runs runs, then compared with
+the time recorded in BASELINE_MS. Wall-clock times depend on the host, so this
+is a separate benchmark step rather than a unit test; tests/test_import_time.py
+only checks that the rule-only modules never pull in the model stack.
+
+With --check the script exits non-zero when a module's median exceeds
+baseline * (1 + tolerance). The default --tolerance 2.0 allows 3x the
+baseline (rule_based up to 108 ms), which absorbs host-to-host and run-to-run
+noise while still catching a heavy import slipping in (torch alone takes
+seconds), so a CI benchmark job can run it without failing on noise.
+
+Usage: python scripts/benchmark_import_time.py [--runs 5] [--check] [--tolerance 2.0]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Highest median import times measured on a single-CPU Linux host (Python
+# 3.11) over repeated 11-run benchmarks, rounded up to whole ms: rule_based
+# 23.4-35.9 ms, validation 9.3-11.3 ms, fusion 0.3 ms
+BASELINE_MS = {
+    "rule_based": 36,
+    "validation": 12,
+    "fusion": 1,
+}
+
+
+def import_ms(module):
+    """Cumulative import time of module, in ms, in a fresh interpreter."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    for line in reversed(out.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="exit 1 when a module exceeds baseline * (1 + tolerance)")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed fraction above the baseline")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':>16} {'median ms':>10} {'baseline ms':>12} {'limit ms':>9}")
+    for module, baseline in BASELINE_MS.items():
+        ms = statistics.median(import_ms(module) for _ in range(args.runs))
+        limit = baseline * (1 + args.tolerance)
+        print(f"{module:>16} {ms:>10.1f} {baseline:>12} {limit:>9.1f}")
+        if ms > limit:
+            failures.append(f"{module} imports in {ms:.1f} ms (baseline {baseline} ms, limit {limit:.1f} ms)")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""PhoBERT throughput: one pipeline call per text vs length-bucketed batches.
+
+Runs on CPU without the on-disk cache, over prompts cycled from the repo's
+corpora, and reports samples/sec for analyze_sentiment in a loop and for
+analyze_batch at each batch size, plus how many labels differ. --workers
+adds PhoBERTPool runs (forked replicas, one intra-op thread each).
+
+Usage: python scripts/benchmark_phobert_batch.py [--samples 512] [--batch-sizes 8 32 64] [--workers 2 4]
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import cycle, islice
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from phobert_module import PhoBERTModule
+from phobert_pool import PhoBERTPool
+
+
+def load_corpus():
+    texts = []
+    for path in ["test_1000_random_prompts.txt", "test_100_mixed_prompts.txt"]:
+        with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+            texts.extend(line.split("\t")[0].strip() for line in f if line.strip())
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--workers", type=int, nargs="*", default=[])
+    args = parser.parse_args()
+
+    phobert = PhoBERTModule()  # CPU pipeline, no cache
+    texts = list(islice(cycle(load_corpus()), args.samples))
+    phobert.analyze_sentiment(texts[0])  # warm up
+
+    start = time.perf_counter()
+    single = [phobert.analyze_sentiment(t) for t in texts]
+    single_rate = len(texts) / (time.perf_counter() - start)
+    print(f"{'mode':>12} {'samples/s':>10} {'speedup':>8} {'label diffs':>12}")
+    print(f"{'single':>12} {single_rate:>10.1f} {1.0:>7.1f}x {0:>12}")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        batched = phobert.analyze_batch(texts, batch_size=batch_size)
+        rate = len(texts) / (time.perf_counter() - start)
+        diffs = sum(a[0] != b[0] for a, b in zip(single, batched))
+        print(f"{'batch ' + str(batch_size):>12} {rate:>10.1f} {rate / single_rate:>7.1f}x {diffs:>12}")
+
+    for workers in args.workers:
+        with PhoBERTPool(phobert, workers=workers) as pool:
+            pool.analyze_batch(texts[:workers])  # warm up every worker
+            start = time.perf_counter()
+            pooled = pool.analyze_batch(texts)
+            rate = len(texts) / (time.perf_counter() - start)
+        diffs = sum(a[0] != b[0] for a, b in zip(single, pooled))
+        print(f"{'pool ' + str(workers):>12} {rate:>10.1f} {rate / single_rate:>7.1f}x {diffs:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of RuleBasedSentiment.analyze vs analyze_batch.
+
+Builds corpora of 10k / 100k / 1M prompts by cycling the repo's prompt files
+and reports prompts/sec for the scalar loop and the NumPy batch path.
+
+Usage: python scripts/benchmark_rule_batch.py [--sizes 10000 100000 1000000] [--scalar-limit 100000]
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import cycle, islice
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from rule_based import RuleBasedSentiment
+
+
+def load_corpus():
+    texts = []
+    for path in ["test_1000_random_prompts.txt", os.path.join("test", "test_1000_prompts_refined.txt")]:
+        with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+            texts.extend(line.split("\t")[0].strip() for line in f if line.strip())
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--scalar-limit", type=int, default=100_000,
+                        help="skip the scalar loop above this size (it is extrapolated instead)")
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    rb = RuleBasedSentiment()
+    corpus = load_corpus()
+    rb.analyze_batch(corpus[:10])  # compile the batch scorer outside the timings
+
+    print(f"{'size':>10} {'scalar/s':>12} {'batch/s':>12} {'speedup':>8}")
+    scalar_rate = None
+    for size in args.sizes:
+        texts = list(islice(cycle(corpus), size))
+
+        if size <= args.scalar_limit or scalar_rate is None:
+            start = time.perf_counter()
+            for text in texts:
+                rb.analyze(text)
+            scalar_rate = size / (time.perf_counter() - start)
+            scalar_note = ""
+        else:
+            scalar_note = "*"
+
+        start = time.perf_counter()
+        rb.analyze_batch(texts, chunk_size=args.chunk_size)
+        batch_rate = size / (time.perf_counter() - start)
+
+        print(f"{size:>10} {scalar_rate:>11.0f}{scalar_note or ' '} {batch_rate:>12.0f} {batch_rate / scalar_rate:>7.1f}x")
+    print("* scalar rate carried over from the previous size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Per-worker memory of N processes running the rule engine at once.
+
+Each child process loads the lexicon tables (from the memory-mapped artifact
+or from lexicon_data.py), reports its RSS and PSS (proportional set size:
+shared pages are split between the processes), then builds the engine, whose
+PhraseMatcher trie is a per-process dict, scores one text and reports again.
+The difference between the two readings is what every worker pays privately
+on top of the shared mmap.
+
+Usage: python scripts/benchmark_rule_workers.py [--processes 4] [--source artifact source]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from lexicon_artifact import build_artifact
+
+CHILD = r"""
+import json, sys
+sys.path.insert(0, {root!r})
+
+def memory():
+    mem = {{}}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                mem[parts[0][:-1].lower()] = int(parts[1]) / 1024
+    return mem
+
+from lexicon_artifact import load_tables, source_tables
+from rule_based import RuleBasedSentiment
+tables = load_tables({artifact!r}) if {artifact!r} else source_tables()
+len(tables.lexicon)
+print("ready", flush=True)
+sys.stdin.readline()  # every process has loaded its tables
+loaded = memory()
+engine = RuleBasedSentiment(tables)
+engine.analyze("Sản phẩm rất tốt nhưng giao hàng chậm")
+print("ready", flush=True)
+sys.stdin.readline()  # every process has built its engine
+print(json.dumps({{"loaded": loaded, "engine": memory()}}))
+"""
+
+
+def run(artifact, processes):
+    code = CHILD.format(root=ROOT, artifact=artifact)
+    children = [subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                 text=True) for _ in range(processes)]
+    for _ in range(2):
+        for child in children:
+            child.stdout.readline()
+        for child in children:
+            child.stdin.write("\n")
+            child.stdin.flush()
+    return [json.loads(child.stdout.read()) for child in children]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--source", nargs="+", default=["artifact", "source"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_artifact(os.path.join(tmp, "lexicon.bin"))
+        print(f"{'source':>9} {'procs':>6} {'stage':>7} {'RSS MB':>8} {'PSS MB':>8} {'total PSS MB':>13}")
+        for source in args.source:
+            stats = run(path if source == "artifact" else None, args.processes)
+            for stage in ("loaded", "engine"):
+                print(f"{source:>9} {args.processes:>6} {stage:>7} "
+                      f"{statistics.mean(s[stage]['rss'] for s in stats):>8.1f} "
+                      f"{statistics.mean(s[stage]['pss'] for s in stats):>8.1f} "
+                      f"{sum(s[stage]['pss'] for s in stats):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Throughput of the trie slang normalizer vs the previous per-word lookup.
+
+Runs normalize_teencode over the no-diacritic corpus
+(test/test_1000_prompts_khong_dau.txt) as written and with teencode mixed in
+(slang words, phrases, capitals and punctuation), each also concatenated
+into review-length texts, raw and after remove_noise (as canonicalize
+calls it), and reports texts/sec for
+the old word-by-word slang_dict lookup and for SlangNormalizer, plus how
+many outputs differ (only phrases, case and punctuation should).
+
+Usage: python scripts/benchmark_slang.py [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from preprocessing import VietnamesePreprocessor
+
+CORPUS = os.path.join("test", "test_1000_prompts_khong_dau.txt")
+TEENCODE = ["ko bt", "Ko", "dc r", "mn oi,", "hihi", "OKE!", "k bt sao", "bt"]
+
+
+def legacy_normalize_teencode(slang_dict, text):
+    """normalize_teencode before the trie: single words, lowercased lookups"""
+    words = text.split()
+    normalized_words = []
+    for word in words:
+        lower_word = word.lower()
+        if lower_word in slang_dict:
+            normalized_words.append(slang_dict[lower_word])
+        else:
+            normalized_words.append(word)
+    return ' '.join(normalized_words)
+
+
+def load_corpus(path):
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        return [line.split("\t")[0].strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def rates(fns, texts, repeat, rounds=7):
+    """Best of rounds, texts/sec, for each fn; rounds are interleaved so CPU
+    frequency drift hits every fn alike"""
+    best = [float("inf")] * len(fns)
+    for _ in range(rounds):
+        for i, fn in enumerate(fns):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for text in texts:
+                    fn(text)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return [repeat * len(texts) / b for b in best]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pre = VietnamesePreprocessor()
+    slang_dict = dict(pre.slang_dict)
+    plain = load_corpus(CORPUS)
+    mixed = [f"{TEENCODE[i % len(TEENCODE)]} {t} {TEENCODE[(i * 3) % len(TEENCODE)]}" for i, t in enumerate(plain)]
+    # Review-length texts: 8 prompts each
+    reviews = [" ".join(plain[i:i + 8]) for i in range(0, len(plain), 2)]
+    mixed_reviews = [" ".join(mixed[i:i + 8]) for i in range(0, len(mixed), 2)]
+
+    print(f"{'corpus':<17} {'texts':>6} {'legacy/s':>10} {'trie/s':>10} {'speedup':>8} {'changed':>8}")
+    corpora = [("plain", plain), ("teencode", mixed), ("reviews", reviews), ("reviews+tc", mixed_reviews)]
+    # What canonicalize feeds it: the same texts after remove_noise
+    corpora += [(f"{name}/clean", [pre.remove_noise(t) for t in texts]) for name, texts in corpora]
+    for name, texts in corpora:
+        changed = sum(pre.normalize_teencode(t) != legacy_normalize_teencode(slang_dict, t) for t in texts)
+        legacy, trie = rates([lambda t: legacy_normalize_teencode(slang_dict, t), pre.normalize_teencode],
+                             texts, args.repeat)
+        print(f"{name:<17} {len(texts):>6} {legacy:>10.0f} {trie:>10.0f} {trie / legacy:>7.1f}x {changed:>8}")
+
+
+if __name__ == "__main__":
+    main()
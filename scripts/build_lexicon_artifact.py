@@ -0,0 +1,30 @@
+"""Compile lexicon_data.py into the memory-mapped lexicon artifact.
+
+Usage: python scripts/build_lexicon_artifact.py [output_path]
+
+Without an argument the artifact is written to lexicon_artifact.DEFAULT_ARTIFACT
+(lexicon.bin in the repo root, or $VSL_LEXICON_ARTIFACT), which
+RuleBasedSentiment picks up automatically while it matches lexicon_data.py.
+
+Lexicon keys are stored diacritic-folded; every folded key whose accent
+variants carry different scores is listed so collisions are reviewed, not
+silently resolved.
+"""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import lexicon_data
+from diacritics import fold_lexicon
+from lexicon_artifact import DEFAULT_ARTIFACT, LexiconArtifact, build_artifact
+
+path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ARTIFACT
+build_artifact(path)
+artifact = LexiconArtifact(path)
+_, overrides, collisions = fold_lexicon(lexicon_data.SENTIMENT_LEXICON)
+for folded, forms in sorted(collisions.items()):
+    print(f"Fold collision '{folded}': " + ", ".join(f"{form}={score:g}" for form, score in forms))
+print(f"Wrote {path}: {len(artifact.lexicon)} folded lexicon entries ({len(overrides)} per-form overrides), version {artifact.version}, {os.path.getsize(path)} bytes")
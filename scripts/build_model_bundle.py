@@ -0,0 +1,26 @@
+"""Export the checkpoint the pipeline needs into one offline model bundle.
+
+Usage: python scripts/build_model_bundle.py [bundle_dir] [--revision REV]
+
+Without a directory the bundle is written to model_bundle.DEFAULT_BUNDLE_DIR
+(model_bundle/ in the repo root, or $VSL_MODEL_BUNDLE), which app.py then
+loads from automatically, offline and with memory-mapped safetensors weights.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from model_bundle import DEFAULT_BUNDLE_DIR, export_bundle
+
+parser = argparse.ArgumentParser()
+parser.add_argument("bundle_dir", nargs="?", default=DEFAULT_BUNDLE_DIR)
+parser.add_argument("--revision", default=None, help="sentiment model revision to pin")
+args = parser.parse_args()
+
+manifest = export_bundle(args.bundle_dir, revision=args.revision)
+size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(args.bundle_dir) for f in files)
+print(f"Wrote {args.bundle_dir}: {manifest['model_name']}@{manifest['revision'] or 'default'}, {size / 2**20:.0f} MB")
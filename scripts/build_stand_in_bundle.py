@@ -0,0 +1,87 @@
+"""Write a randomly initialised, PhoBERT-base-shaped model bundle for benchmarks.
+
+Usage: python scripts/build_stand_in_bundle.py bundle_dir [--seed 0]
+
+For hosts that cannot reach the Hugging Face Hub: the bundle has the same
+layout as model_bundle.export_bundle (bundle.json + sentiment/) and the same
+architecture as wonrax/phobert-base-vietnamese-sentiment (RoBERTa base, 64001
+token vocabulary, 258 positions, POS / NEG / NEU head), with random weights
+and a word-level tokenizer built from the repo's prompt corpora.
+
+Latency, throughput and memory measured on it carry over to the real
+checkpoint; label agreement and probability drift do not (random weights give
+near-uniform probabilities), so never report those as the model's parity.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import model_bundle
+
+CORPORA = ["test_1000_random_prompts.txt", "test_100_mixed_prompts.txt",
+           "test/test_1000_prompts_refined.txt", "test/test_1000_prompts_khong_dau.txt"]
+SPECIALS = ["<s>", "<pad>", "</s>", "<unk>"]  # PhoBERT's ids 0-3
+
+
+def corpus_words():
+    words = {}
+    for path in CORPORA:
+        path = os.path.join(ROOT, path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    for word in line.split("\t")[0].lower().split():
+                        words[word] = None
+    return list(words)
+
+
+def build_tokenizer(max_length):
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+
+    vocab = {token: i for i, token in enumerate(SPECIALS + corpus_words())}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>", pair="<s> $A </s> </s> $B </s>", special_tokens=[("<s>", 0), ("</s>", 2)])
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>",
+                                   pad_token="<pad>", unk_token="<unk>", model_max_length=max_length)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bundle_dir")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import torch
+    from transformers import RobertaConfig, RobertaForSequenceClassification
+
+    torch.manual_seed(args.seed)
+    config = RobertaConfig(vocab_size=64001, max_position_embeddings=258, type_vocab_size=1, pad_token_id=1,
+                           bos_token_id=0, eos_token_id=2, layer_norm_eps=1e-5, num_labels=3,
+                           id2label={0: "NEG", 1: "POS", 2: "NEU"}, label2id={"NEG": 0, "POS": 1, "NEU": 2})
+    path = model_bundle.sentiment_path(args.bundle_dir)
+    RobertaForSequenceClassification(config).save_pretrained(path, safe_serialization=True)
+    build_tokenizer(config.max_position_embeddings - 2).save_pretrained(path)
+    manifest = {
+        "format_version": model_bundle.FORMAT_VERSION,
+        "model_name": "stand-in/phobert-base-random",
+        "revision": f"seed-{args.seed}",
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(args.bundle_dir, model_bundle.MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(args.bundle_dir) for f in files)
+    print(f"Wrote {args.bundle_dir}: {manifest['model_name']}@{manifest['revision']}, {size / 2**20:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,9 +19,10 @@ for ln in lines[:60]:
     parts = ln.split('\t')
     text = parts[0]
     gt = parts[1] if len(parts) > 1 else "GT:UNKNOWN"
-    score = rb.analyze_sentiment(text)
+    rule_result = rb.analyze(text)
+    score = rule_result.score
     label = rb.get_label(score)
-    mixed = rb.detect_mixed_sentiment(text)
+    mixed = rule_result.mixed
     post = rb._post_contrast_clause_score(text)
     print(f"TEXT: {text}")
     print(f"  GT: {gt} | rule_score={score:.2f} | rule_label={label} | mixed={mixed} | post_contrast_score={post:.2f}")
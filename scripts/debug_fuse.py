@@ -24,9 +24,10 @@ cases = [
 ]
 
 for text in cases:
-    s_rule = rb.analyze_sentiment(text)
-    mixed = rb.detect_mixed_sentiment(text)
-    neutral = rb.is_neutral_context(text)
+    rule_result = rb.analyze(text)
+    s_rule = rule_result.score
+    mixed = rule_result.mixed
+    neutral = rule_result.neutral
     # Simulate phobert result favoring POSITIVE with high conf to check fusion behavior
     l_phobert, c_phobert = "POSITIVE", 0.9
     fused = fu.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed, neutral_flag=neutral)
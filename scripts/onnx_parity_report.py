@@ -0,0 +1,147 @@
+"""Parity report: int8 ONNX Runtime backend vs the fp32 PyTorch pipeline.
+
+Exports the quantized model if needed, runs both backends over the repo's
+prompt corpora (no cache, CPU) and writes a Markdown report with per-corpus
+label agreement and confidence drift, single-text latency (p50/p95), batched
+throughput, model size and the RSS of a fresh worker process holding each
+backend. The ONNX worker runs with torch blocked, as on the CPU-only hosts the
+backend is meant for: transformers (imported for the tokenizer) otherwise
+pulls in torch whenever it is installed.
+
+--bundle runs both backends from a local model bundle (see model_bundle, or
+scripts/build_stand_in_bundle.py on hosts without Hub access) instead of the
+Hub checkpoint.
+
+Usage: python scripts/onnx_parity_report.py [--out reports/onnx_parity.md] [--threads 1] [--bundle DIR]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from phobert_module import PhoBERTModule
+import phobert_onnx
+
+CORPORA = [
+    "test_1000_random_prompts.txt",
+    "test_100_mixed_prompts.txt",
+    "test/test_1000_prompts_refined.txt",
+    "test/test_1000_prompts_khong_dau.txt",
+]
+
+
+def load_corpus(path):
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        return [line.split("\t")[0].strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def dir_size_mb(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files) / 2**20
+
+
+# A worker: load one backend, score one text, print its RSS in MB
+WORKER = r"""
+import os, sys
+sys.path.insert(0, {root!r})
+if {backend!r} == "onnx":
+    sys.modules["torch"] = None  # the int8 backend must run without torch
+sys.argv = ["onnx_parity_report"]
+from onnx_parity_report import load
+load({backend!r}, {threads!r}, {bundle!r})
+with open("/proc/self/statm") as f:
+    print(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20)
+"""
+
+
+def worker_rss_mb(backend, threads, bundle=None):
+    code = WORKER.format(root=ROOT, backend=backend, threads=threads, bundle=bundle)
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    return float(out.split()[-1])
+
+
+def load(backend, threads, bundle=None):
+    if bundle:
+        model = PhoBERTModule.from_bundle(bundle, backend=backend, preload=False)
+    else:
+        model = PhoBERTModule(backend=backend, preload=False)
+    if backend == "onnx":
+        model_dir = phobert_onnx.model_dir_for(model.model_name, model.revision)
+        if not os.path.exists(os.path.join(model_dir, phobert_onnx.MODEL_FILE)):
+            source = (model.model_path, None) if model.model_path else (model.model_name, model.revision)
+            phobert_onnx.export_quantized(*source, model_dir)
+    if backend == "onnx":
+        model._onnx = phobert_onnx.OnnxPhoBERT(model_dir, threads=threads)
+    else:
+        import torch
+        torch.set_num_threads(threads)
+        model.load()
+    model.analyze_sentiment("xin chào")  # warm up
+    return model
+
+
+def time_backend(model, texts, batch_size):
+    latencies = []
+    for text in texts[:200]:
+        start = time.perf_counter()
+        model.analyze_sentiment(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    model.analyze_batch(texts, batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    return statistics.median(latencies), p95, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=os.path.join(ROOT, "reports", "onnx_parity.md"))
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--bundle", default=None, help="load both backends from this model bundle")
+    args = parser.parse_args()
+
+    onnx_model = load("onnx", args.threads, args.bundle)  # exports first if needed
+    torch_model = load("torch", args.threads, args.bundle)
+    corpora = {path: load_corpus(path) for path in CORPORA if os.path.exists(os.path.join(ROOT, path))}
+
+    lines = ["# PhoBERT ONNX int8 parity report", "",
+             f"Model: `{torch_model.model_key}`, {args.threads} thread(s), batch size {args.batch_size}.", "",
+             "| Corpus | Texts | Label agreement | Mean abs confidence diff | Max abs probability diff |",
+             "|---|---|---|---|---|"]
+    all_texts = []
+    for path, texts in corpora.items():
+        expected = torch_model.predict_proba_batch(texts, args.batch_size)
+        got = onnx_model.predict_proba_batch(texts, args.batch_size)
+        labels = [(torch_model._sentiment(a), onnx_model._sentiment(b)) for a, b in zip(expected, got)]
+        agree = sum(a[0] == b[0] for a, b in labels) / len(texts)
+        drift = sum(abs(a[1] - b[1]) for a, b in labels) / len(texts)
+        worst = max(abs(a[k] - b[k]) for a, b in zip(expected, got) for k in a)
+        lines.append(f"| {path} | {len(texts)} | {agree:.2%} | {drift:.4f} | {worst:.4f} |")
+        all_texts.extend(texts)
+
+    lines += ["", "| Backend | p50 ms | p95 ms | Batch texts/s | Worker RSS MB | Model MB |",
+              "|---|---|---|---|---|---|"]
+    onnx_size = dir_size_mb(onnx_model._onnx.model_dir)
+    for name, backend, model, size in [("torch fp32", "torch", torch_model, None),
+                                       ("onnx int8", "onnx", onnx_model, onnx_size)]:
+        p50, p95, throughput = time_backend(model, all_texts, args.batch_size)
+        rss = worker_rss_mb(backend, args.threads, args.bundle)
+        size_text = f"{size:.0f}" if size is not None else "-"
+        lines.append(f"| {name} | {p50:.1f} | {p95:.1f} | {throughput:.1f} | {rss:.0f} | {size_text} |")
+
+    report = "\n".join(lines) + "\n"
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""How much batch deduplication saves on the repo's prompt corpora.
+
+Counts, per corpus and for all corpora as one job: texts, distinct texts,
+distinct canonical texts (VietnamesePreprocessor.canonicalize: noise removal
+and teencode normalization, what SentimentPipeline.analyze_batch dedups on),
+and how many of those still need the model under rule_first. No model is
+loaded.
+
+Usage: python scripts/report_dedup.py
+"""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fusion import ConditionalFusion
+from preprocessing import VietnamesePreprocessor
+from rule_based import RuleBasedSentiment
+
+CORPORA = [
+    "test_1000_random_prompts.txt",
+    "test_100_mixed_prompts.txt",
+    os.path.join("test", "test_1000_prompts_refined.txt"),
+    os.path.join("test", "test_1000_prompts_khong_dau.txt"),
+]
+
+
+def load_corpus(path):
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        return [line.split("\t")[0].strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+preprocessor = VietnamesePreprocessor()
+rb = RuleBasedSentiment()
+fusion = ConditionalFusion()
+
+
+def report(name, texts):
+    canonical = {preprocessor.canonicalize(t) for t in texts}
+    rules = [rb.analyze(preprocessor.word_segmentation(c)) for c in canonical]
+    model = sum(fusion.needs_model(r.score, mixed_flag=r.mixed) for r in rules)
+    saving = f"{len(texts) / model:.1f}x" if model else "all"
+    print(f"{name:>40} {len(texts):>6} {len(set(texts)):>6} {len(canonical):>9} {len(texts) / len(canonical):>6.2f}x "
+          f"{model:>6} {saving:>8}")
+
+
+print(f"{'corpus':>40} {'texts':>6} {'exact':>6} {'canonical':>9} {'dedup':>7} {'model':>6} {'saving':>8}")
+everything = []
+for path in CORPORA:
+    texts = load_corpus(path)
+    everything.extend(texts)
+    report(path, texts)
+report("all (one job)", everything)
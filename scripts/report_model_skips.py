@@ -0,0 +1,46 @@
+"""Fraction of requests the rule-first pipeline answers without PhoBERT.
+
+Runs only the preprocessor and rule engine over the repo's prompt corpora
+and counts the texts for which ConditionalFusion.needs_model is False, i.e.
+where SentimentPipeline(rule_first=True) never calls the model. No model is
+loaded, so this runs anywhere.
+
+Usage: python scripts/report_model_skips.py
+"""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fusion import ConditionalFusion
+from preprocessing import VietnamesePreprocessor
+from rule_based import RuleBasedSentiment
+
+CORPORA = [
+    "test_1000_random_prompts.txt",
+    "test_100_mixed_prompts.txt",
+    os.path.join("test", "test_1000_prompts_refined.txt"),
+    os.path.join("test", "test_1000_prompts_khong_dau.txt"),
+]
+
+
+def load_corpus(path):
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        return [line.split("\t")[0].strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+preprocessor = VietnamesePreprocessor()
+rb = RuleBasedSentiment()
+fusion = ConditionalFusion()
+total = skipped_total = 0
+print(f"{'corpus':>40} {'texts':>6} {'skipped':>8} {'rate':>7}")
+for path in CORPORA:
+    texts = load_corpus(path)
+    rules = [rb.analyze(preprocessor.preprocess(t)) for t in texts]
+    skipped = sum(not fusion.needs_model(r.score, mixed_flag=r.mixed) for r in rules)
+    total += len(texts)
+    skipped_total += skipped
+    print(f"{path:>40} {len(texts):>6} {skipped:>8} {skipped / len(texts):>7.1%}")
+print(f"{'all':>40} {total:>6} {skipped_total:>8} {skipped_total / total:>7.1%}")
@@ -26,12 +26,13 @@ print("Processed:", processed)
 l_phobert, c_phobert = ph.analyze_sentiment(processed)
 print(f"PhoBERT -> Label: {l_phobert}, Confidence: {c_phobert:.4f}")
 
-s_rule = rb.analyze_sentiment(processed)
+rule_result = rb.analyze(processed)
+s_rule = rule_result.score
 print(f"Rule score: {s_rule:.4f}, Rule label: {rb.get_label(s_rule)}")
 
-mixed = rb.detect_mixed_sentiment(processed)
-neutral = rb.is_neutral_context(processed)
-hedged = rb.is_hedged(processed)
+mixed = rule_result.mixed
+neutral = rule_result.neutral
+hedged = rule_result.hedged
 print(f"Flags -> mixed: {mixed}, neutral: {neutral}, hedged: {hedged}")
 
 final_label, final_conf = fus.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed, neutral_flag=neutral, hedged_flag=hedged)
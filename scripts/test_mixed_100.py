@@ -4,6 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from rule_based import RuleBasedSentiment
 from fusion import ConditionalFusion
 from phobert_module import PhoBERTModule
+from phobert_cache import PhoBERTCache
 
 
 def load_test_prompts(filename=None):
@@ -25,20 +26,27 @@ def load_test_prompts(filename=None):
 def test_mixed_prompts():
     rb = RuleBasedSentiment()
     fu = ConditionalFusion()
-    phobert = PhoBERTModule()
+    phobert = PhoBERTModule(cache=PhoBERTCache(), preload=False)
 
     prompts = load_test_prompts()
     correct = 0
     total = len(prompts)
 
     failed_cases = []
+    skipped = 0
 
     for i, (text, expected) in enumerate(prompts):
-        l_phobert, c_phobert = phobert.analyze_sentiment(text)
-        s_rule = rb.analyze_sentiment(text)
-        mixed_flag = rb.detect_mixed_sentiment(text)
-        neutral_flag = rb.is_neutral_context(text)
-        hedged_flag = rb.is_hedged(text)
+        # Rules first; PhoBERT only when fusion can use its output
+        rule_result = rb.analyze(text)
+        s_rule = rule_result.score
+        mixed_flag = rule_result.mixed
+        neutral_flag = rule_result.neutral
+        hedged_flag = rule_result.hedged
+        if fu.needs_model(s_rule, mixed_flag=mixed_flag):
+            l_phobert, c_phobert = phobert.analyze_sentiment(text)
+        else:
+            l_phobert, c_phobert = "SKIPPED", 0.0
+            skipped += 1
         l_fusion, conf = fu.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed_flag, neutral_flag=neutral_flag, hedged_flag=hedged_flag)
 
         if l_fusion == expected:
@@ -55,6 +63,7 @@ def test_mixed_prompts():
 
     acc = correct / total * 100 if total > 0 else 0.0
     print(f"\nTested {total} prompts. Accuracy: {acc:.2f}% ({correct}/{total})")
+    print(f"PhoBERT skipped (rules decided): {skipped}/{total}")
     print(f"Saved {len(failed_cases)} failed cases to failed_mixed_100.txt")
 
 if __name__ == '__main__':
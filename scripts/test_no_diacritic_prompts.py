@@ -30,9 +30,10 @@ def test_no_diacritic_prompts():
     for text, expected in test_prompts:
         # Get predictions
         l_phobert, c_phobert = phobert.analyze_sentiment(text)
-        s_rule = rb.analyze_sentiment(text)
-        mixed_flag = rb.detect_mixed_sentiment(text)
-        neutral_flag = rb.is_neutral_context(text)
+        rule_result = rb.analyze(text)
+        s_rule = rule_result.score
+        mixed_flag = rule_result.mixed
+        neutral_flag = rule_result.neutral
         l_fusion, _ = fu.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed_flag, neutral_flag=neutral_flag)
 
         # Check if fusion matches expected
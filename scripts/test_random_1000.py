@@ -4,6 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from rule_based import RuleBasedSentiment
 from fusion import ConditionalFusion
 from phobert_module import PhoBERTModule
+from phobert_cache import PhoBERTCache
 
 def load_test_prompts(filename="test_1000_random_prompts.txt"):
     prompts = []
@@ -16,7 +17,7 @@ def load_test_prompts(filename="test_1000_random_prompts.txt"):
 def test_random_1000_prompts():
     rb = RuleBasedSentiment()
     fu = ConditionalFusion()
-    phobert = PhoBERTModule()
+    phobert = PhoBERTModule(cache=PhoBERTCache(), preload=False)
 
     prompts = load_test_prompts()
     correct = 0
@@ -29,14 +30,20 @@ def test_random_1000_prompts():
     print(f"Testing on {total} random prompts:")
 
     failed_cases = []
+    skipped = 0
 
     for i, (text, expected) in enumerate(prompts):
-        # Get predictions
-        l_phobert, c_phobert = phobert.analyze_sentiment(text)
-        s_rule = rb.analyze_sentiment(text)
-        mixed_flag = rb.detect_mixed_sentiment(text)
-        neutral_flag = rb.is_neutral_context(text)
-        hedged_flag = rb.is_hedged(text)
+        # Rules first; PhoBERT only when fusion can use its output
+        rule_result = rb.analyze(text)
+        s_rule = rule_result.score
+        mixed_flag = rule_result.mixed
+        neutral_flag = rule_result.neutral
+        hedged_flag = rule_result.hedged
+        if fu.needs_model(s_rule, mixed_flag=mixed_flag):
+            l_phobert, c_phobert = phobert.analyze_sentiment(text)
+        else:
+            l_phobert, c_phobert = "SKIPPED", 0.0
+            skipped += 1
         l_fusion, _ = fu.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed_flag, neutral_flag=neutral_flag, hedged_flag=hedged_flag)
 
         category_stats[expected]["total"] += 1
@@ -57,6 +64,7 @@ def test_random_1000_prompts():
 
     accuracy = correct / total * 100
     print(f"\nOverall Accuracy on 1000 random prompts: {accuracy:.2f}%")
+    print(f"PhoBERT skipped (rules decided): {skipped}/{total} ({skipped / total:.1%})")
 
     print("\nCategory-wise Accuracy:")
     for cat, stats in category_stats.items():
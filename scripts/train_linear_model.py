@@ -0,0 +1,39 @@
+"""Train the hashed-feature linear backend from the repo's labeled prompts.
+
+Usage: python scripts/train_linear_model.py [output_path] [--all] [--epochs 300]
+
+Texts go through VietnamesePreprocessor.preprocess first, as in the app. By
+default the hashed_linear.is_holdout split (20%) is left out so
+benchmark_backends.py can report held-out accuracy; --all trains on every
+prompt. Without an output path the model is written to
+hashed_linear.DEFAULT_MODEL_PATH (linear_model.npz in the repo root, or
+$VSL_LINEAR_MODEL).
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from hashed_linear import DEFAULT_MODEL_PATH, HashedLinearModel, is_holdout, load_labeled_prompts
+from preprocessing import VietnamesePreprocessor
+
+parser = argparse.ArgumentParser()
+parser.add_argument("output", nargs="?", default=DEFAULT_MODEL_PATH)
+parser.add_argument("--all", action="store_true", help="also train on the held-out split")
+parser.add_argument("--epochs", type=int, default=300)
+parser.add_argument("--n-features", type=int, default=2 ** 16)
+args = parser.parse_args()
+
+preprocessor = VietnamesePreprocessor()
+prompts = [(preprocessor.preprocess(text), label) for text, label in load_labeled_prompts()
+           if args.all or not is_holdout(text)]
+start = time.perf_counter()
+model = HashedLinearModel.train([t for t, _ in prompts], [l for _, l in prompts],
+                                n_features=args.n_features, epochs=args.epochs)
+elapsed = time.perf_counter() - start
+model.save(args.output)
+print(f"Trained on {len(prompts)} prompts in {elapsed:.1f}s; wrote {args.output} ({os.path.getsize(args.output)} bytes)")
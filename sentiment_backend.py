@@ -0,0 +1,49 @@
+"""Interface shared by the sentiment model backends.
+
+A backend turns a processed text into a {label: probability} vector over
+the POS / NEG / NEU labels; everything downstream (SentimentPipeline,
+ConditionalFusion, MicroBatcher, PhoBERTPool) only uses the methods below,
+so PhoBERTModule and HashedLinearBackend are interchangeable.
+
+Subclasses implement predict_proba and model_key; predict_proba_batch and
+load can be overridden when the backend batches or loads lazily.
+"""
+
+
+class SentimentBackend:
+    @property
+    def model_key(self):
+        """Identifies the model (and version) producing the outputs, to key caches."""
+        raise NotImplementedError
+
+    def load(self):
+        """Load the model now rather than on first use."""
+
+    def predict_proba(self, text):
+        """Full {label: probability} vector for text"""
+        raise NotImplementedError
+
+    def predict_proba_batch(self, texts, batch_size=32):
+        """predict_proba for many texts, in input order."""
+        return [self.predict_proba(t) for t in texts]
+
+    def analyze_sentiment(self, text):
+        """(label, confidence) with label POSITIVE, NEGATIVE or NEUTRAL"""
+        return self._sentiment(self.predict_proba(text))
+
+    def analyze_batch(self, texts, batch_size=32):
+        """analyze_sentiment for many texts: [(label, confidence), ...] in input order."""
+        return [self._sentiment(p) for p in self.predict_proba_batch(texts, batch_size)]
+
+    @staticmethod
+    def _sentiment(probabilities):
+        label = max(probabilities, key=probabilities.get)
+        confidence = probabilities[label]
+        # Map labels to POSITIVE, NEUTRAL, NEGATIVE
+        if label == 'POS':
+            sentiment = 'POSITIVE'
+        elif label == 'NEG':
+            sentiment = 'NEGATIVE'
+        else:
+            sentiment = 'NEUTRAL'
+        return sentiment, confidence
@@ -0,0 +1,238 @@
+"""Teencode / slang normalization over a token trie.
+
+``SlangNormalizer`` is a dict of {slang phrase: replacement} (what
+``VietnamesePreprocessor.slang_dict`` used to be, so existing lookups and
+edits keep working) that compiles itself into a trie keyed by lowercased
+tokens on first use and again after any edit. ``normalize`` makes one
+left-to-right pass over the whitespace tokens:
+
+- phrases: the longest entry starting at a token wins ("ko bt" before "ko");
+- case: replacements follow the input ("Ko" -> "Không", "KO" -> "KHÔNG");
+- punctuation: leading / trailing punctuation of a token is kept around the
+  replacement ("ko," -> "không,"); a phrase never spans punctuation.
+
+Most text has no slang at all: it is lowercased and split once, checked
+against the set of first tokens and returned as is. Punctuation is only
+looked at when the text has some, and phrase walks only start at tokens
+that begin a longer entry.
+
+The default dictionary is loaded from slang.tsv (slang<TAB>replacement).
+"""
+import os
+import string
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SLANG_PATH = os.environ.get("VSL_SLANG_PATH", os.path.join(ROOT, "slang.tsv"))
+
+# Sentinel key for the replacement on terminal trie nodes (tokens are strings)
+_VALUE = None
+# Punctuation a slang token may be wrapped in ("ko," "(ko)" "“ok”")
+_EDGE_PUNCTUATION = string.punctuation + "“”‘’…–—«»"
+
+
+def load_slang(path=DEFAULT_SLANG_PATH):
+    """{slang: replacement} from a tab-separated file; # starts a comment line."""
+    entries = {}
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) != 2 or not fields[0].strip():
+                raise ValueError(f"{path}:{lineno}: expected slang<TAB>replacement, got {line!r}")
+            entries[fields[0].strip()] = fields[1].strip()
+    return entries
+
+
+def _recase(surface, replacement):
+    """replacement in the case of surface: lower, Title or UPPER."""
+    if surface.islower() or not replacement:
+        return replacement
+    if len(surface) > 1 and surface.isupper():
+        return replacement.upper()
+    if surface[0].isupper():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+
+class SlangNormalizer(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trie = None
+        self._heads = None  # first tokens of all entries, compiled with the trie
+
+    @classmethod
+    def load(cls, path=DEFAULT_SLANG_PATH):
+        return cls(load_slang(path))
+
+    # Every edit drops the compiled trie
+    def _edited(method):
+        def edit(self, *args, **kwargs):
+            self._trie = self._heads = None
+            return method(self, *args, **kwargs)
+        edit.__name__ = method.__name__
+        return edit
+
+    __setitem__ = _edited(dict.__setitem__)
+    __delitem__ = _edited(dict.__delitem__)
+    __ior__ = _edited(dict.__ior__)
+    update = _edited(dict.update)
+    setdefault = _edited(dict.setdefault)
+    pop = _edited(dict.pop)
+    popitem = _edited(dict.popitem)
+    clear = _edited(dict.clear)
+    del _edited
+
+    @property
+    def trie(self):
+        """{token: child node}, the replacement under the None key of terminal nodes"""
+        if self._trie is None:
+            self._compile()
+        return self._trie
+
+    def _compile(self):
+        root = {}
+        for slang, replacement in self.items():
+            tokens = slang.lower().split()
+            if not tokens:
+                continue
+            node = root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_VALUE] = replacement
+        self._trie = root
+        # Single-word entries: replaced by lookup alone
+        self._single = {key: node[_VALUE] for key, node in root.items() if _VALUE in node}
+        # First tokens of longer entries: the only tokens the trie is walked from
+        self._phrase_heads = frozenset(key for key, node in root.items() if len(node) > (_VALUE in node))
+        # Their first two tokens: a text without one of these pairs has no phrase
+        self._phrase_starts = frozenset((key, token) for key in self._phrase_heads
+                                        for token in root[key] if token is not _VALUE)
+        self._heads = frozenset(root)
+        return self._heads
+
+    def normalize(self, text):
+        """text with every slang phrase replaced, tokens re-joined by single
+        spaces; text itself when none of its tokens is slang."""
+        heads = self._heads
+        if heads is None:
+            heads = self._compile()
+        lowered = text.lower()
+        keys = lowered.split()
+        if text.replace(' ', '').isalnum():
+            # No punctuation (nor anything else but letters, digits and spaces)
+            if heads.isdisjoint(keys):
+                return text
+            words = keys if lowered == text else text.split()
+            if self._has_phrase(keys):
+                return self._replace(words, keys)
+            # Only single-word entries: one lookup per token
+            single = self._single
+            if words is keys:
+                return ' '.join([single.get(key, key) for key in keys])
+            return ' '.join([_recase(word, single[key]) if key in single else word
+                             for key, word in zip(keys, words)])
+        # Tokens without their edge punctuation ("ok!!" -> "ok"); only the few
+        # tokens that are not alphanumeric need stripping
+        cores = [key if key.isalnum() or key in heads else key.strip(_EDGE_PUNCTUATION) for key in keys]
+        if heads.isdisjoint(cores):
+            return text
+        return self._replace_punctuated(text.split(), keys, cores) or text
+
+    def _has_phrase(self, keys):
+        """Whether two adjacent keys start a phrase. Most slang is single words,
+        so the trie is only walked when this holds."""
+        return not self._phrase_heads.isdisjoint(keys) and not self._phrase_starts.isdisjoint(zip(keys, keys[1:]))
+
+    def _replace(self, words, keys):
+        """words with the longest entry at each slang token replaced, space-joined
+        (keys are the lowercased words, with no punctuation)."""
+        root = self._trie
+        single = self._single
+        heads = self._heads
+        phrase_heads = self._phrase_heads
+        n = len(keys)
+        out = []
+        done = 0  # words[:done] are in out
+        for i in [i for i, key in enumerate(keys) if key in heads]:
+            if i < done:
+                continue
+            key = keys[i]
+            replacement = single.get(key)
+            end = i + 1
+            if key in phrase_heads:
+                node = root[key]
+                j = end
+                while j < n:
+                    node = node.get(keys[j])
+                    if node is None:
+                        break
+                    j += 1
+                    if _VALUE in node:
+                        end, replacement = j, node[_VALUE]
+                if replacement is None:
+                    continue
+            if words is not keys:
+                replacement = _recase(words[i] if end == i + 1 else ' '.join(words[i:end]), replacement)
+            out.extend(words[done:i])
+            out.append(replacement)
+            done = end
+        out.extend(words[done:])
+        return ' '.join(out)
+
+    def _replace_punctuated(self, words, keys, cores):
+        """_replace for tokens that may carry edge punctuation (cores are the
+        keys without it), kept around the replacement; a phrase never spans
+        punctuation. None if nothing matched."""
+        single = self._single
+        matches = [i for i, core in enumerate(cores) if core in single]
+        out = list(words)
+        for i in matches:
+            word = words[i]
+            replacement = single[cores[i]]
+            if cores[i] == keys[i]:
+                out[i] = _recase(word, replacement)
+            else:
+                lead = len(word) - len(word.lstrip(_EDGE_PUNCTUATION))
+                trail = len(word.rstrip(_EDGE_PUNCTUATION))
+                out[i] = word[:lead] + _recase(word[lead:trail], replacement) + word[trail:]
+        if self._has_phrase(cores) and self._replace_phrases(out, words, keys, cores):
+            return ' '.join(out)
+        return ' '.join(out) if matches else None
+
+    def _replace_phrases(self, out, words, keys, cores):
+        """Replace, in out, the longest entry of two or more tokens starting at
+        each phrase head; a phrase never spans punctuation. The number of
+        phrases replaced."""
+        root = self._trie
+        phrase_heads = self._phrase_heads
+        n = len(cores)
+        spans = []
+        done = 0  # tokens before done are inside a phrase already
+        for i in [i for i, core in enumerate(cores) if core in phrase_heads]:
+            if i < done:
+                continue
+            node = root[cores[i]]
+            end = None
+            j = i + 1
+            while j < n:
+                # Token j - 1 must have no trailing and token j no leading punctuation
+                if not (keys[j - 1].endswith(cores[j - 1]) and keys[j].startswith(cores[j])):
+                    break
+                node = node.get(cores[j])
+                if node is None:
+                    break
+                j += 1
+                if _VALUE in node:
+                    end, replacement = j, node[_VALUE]
+            if end is not None:
+                spans.append((i, end, replacement))
+                done = end
+        # Right to left, so the indices of the spans still to go hold
+        for i, end, replacement in reversed(spans):
+            surface = ' '.join(words[i:end])
+            lead = len(surface) - len(surface.lstrip(_EDGE_PUNCTUATION)) if cores[i] != keys[i] else 0
+            trail = len(surface.rstrip(_EDGE_PUNCTUATION)) if cores[end - 1] != keys[end - 1] else len(surface)
+            out[i:end] = [surface[:lead] + _recase(surface[lead:trail], replacement) + surface[trail:]]
+        return len(spans)
@@ -3,6 +3,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from validation import validate_input
 from phobert_module import PhoBERTModule
+from phobert_cache import PhoBERTCache
 from rule_based import RuleBasedSentiment
 from fusion import ConditionalFusion
 
@@ -67,7 +68,7 @@ def test_prompts(prompts, labels):
     return correct, total
 
 def test_hybrid(prompts, labels):
-    phobert = PhoBERTModule()
+    phobert = PhoBERTModule(cache=PhoBERTCache(), preload=False)
     rule = RuleBasedSentiment()
     fusion = ConditionalFusion()
     correct_phobert = {'POSITIVE': 0, 'NEGATIVE': 0, 'NEUTRAL': 0}
@@ -79,9 +80,10 @@ def test_hybrid(prompts, labels):
         if not is_valid:
             continue
         l_phobert, c_phobert = phobert.analyze_sentiment(text)
-        s_rule = rule.analyze_sentiment(text)
-        mixed_flag = rule.detect_mixed_sentiment(text)
-        neutral_flag = rule.is_neutral_context(text)
+        rule_result = rule.analyze(text)
+        s_rule = rule_result.score
+        mixed_flag = rule_result.mixed
+        neutral_flag = rule_result.neutral
         l_rule = rule.get_label(s_rule)
         l_fusion, _ = fusion.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed_flag, neutral_flag=neutral_flag)
         if l_phobert == label:
@@ -98,7 +100,7 @@ def main():
     correct_phobert, correct_rule, correct_fusion, total = test_hybrid(prompts, labels)
     print('--- Hybrid Model Accuracy (Combined) ---')
     failed_patterns = []
-    phobert = PhoBERTModule()
+    phobert = PhoBERTModule(cache=PhoBERTCache(), preload=False)
     rule = RuleBasedSentiment()
     fusion = ConditionalFusion()
     for text, label in zip(prompts, labels):
@@ -106,9 +108,10 @@ def main():
         if not is_valid:
             continue
         l_phobert, c_phobert = phobert.analyze_sentiment(text)
-        s_rule = rule.analyze_sentiment(text)
-        mixed_flag = rule.detect_mixed_sentiment(text)
-        neutral_flag = rule.is_neutral_context(text)
+        rule_result = rule.analyze(text)
+        s_rule = rule_result.score
+        mixed_flag = rule_result.mixed
+        neutral_flag = rule_result.neutral
         l_fusion, _ = fusion.fuse(l_phobert, c_phobert, s_rule, mixed_flag=mixed_flag, neutral_flag=neutral_flag)
         if l_fusion != label:
             failed_patterns.append((text, label, l_fusion, l_phobert, rule.get_label(s_rule)))
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Outputs of the rule engine recorded before the lexicon was compiled into a
+# trie, for every unique prompt in test_1000_random_prompts.txt,
+# test/test_1000_prompts_refined.txt, test_100_mixed_prompts.txt and
+# test/test_1000_prompts_khong_dau.txt. Columns: text, analyze_sentiment,
+# detect_mixed_sentiment, is_neutral_context, is_hedged,
+# _post_contrast_clause_score, _clause_score. Rows whose cues only matched
+# inside other words ("tuy" in "tuyệt", "mà" in "mày") were re-recorded when
+# cue matching switched to whole words.
+BASELINE = os.path.join(os.path.dirname(__file__), "data", "rule_based_baseline.tsv")
+
+
+def load_baseline():
+    rows = []
+    with open(BASELINE, encoding="utf-8") as f:
+        for line in f:
+            text, score, mixed, neutral, hedged, post, clause = line.rstrip("\n").split("\t")
+            rows.append((text, float(score), mixed == "1", neutral == "1", hedged == "1", float(post), float(clause)))
+    return rows
+
+
+@pytest.fixture(scope="session")
+def baseline():
+    return load_baseline()
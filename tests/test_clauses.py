@@ -0,0 +1,53 @@
+from clauses import ADDITIVE
+from cue_detector import CONTRAST
+from rule_based import RuleBasedSentiment
+
+rb = RuleBasedSentiment()
+
+
+def clauses_of(text):
+    return [(text[c.start:c.end], c.connector and c.connector.kind) for c in rb._segment(text)]
+
+
+def test_plain_text_has_no_clauses():
+    assert rb._segment("sản phẩm tốt") == ()
+
+
+def test_splits_at_connectors_and_cung():
+    assert clauses_of("đồ ăn ngon nhưng phục vụ tệ, giá cũng cao") == [
+        ("đồ ăn ngon", None),
+        ("phục vụ tệ, giá", CONTRAST),
+        ("cao", ADDITIVE),
+    ]
+
+
+def test_overlapping_connectors_take_the_longest():
+    clauses = rb._segment("mặc dù thế tôi vẫn thích")
+    assert [(c.connector.start, c.connector.end) for c in clauses[1:]] == [(0, 10)]
+    assert clauses[0].start == clauses[0].end == 0
+
+
+def test_post_contrast_score_keeps_phrases_across_cung_whole():
+    # "cũng được" (0) spans the "cũng" boundary; its clause "được" alone scores 0.5
+    text = "tệ nhưng cũng được"
+    assert rb._clause_score("được") != rb._clause_score("cũng được")
+    assert rb._post_contrast_clause_score(text) == rb._clause_score("cũng được")
+    result = rb.analyze(text)
+    assert result.post_contrast_score == rb._clause_score("cũng được")
+    assert float(rb.analyze_batch([text]).scores[0]) == result.score
+
+
+def test_analyze_scores_the_text_after_the_connector():
+    result = rb.analyze("Tôi thích nó lắm tuy nhiên khủng khiếp")
+    assert result.mixed
+    assert result.post_contrast_score == rb._clause_score("khủng khiếp") < 0
+
+
+def test_equal_length_connectors_follow_list_order():
+    # "mà" and "dù" (like "tuy nhiên" and "thế nhưng") are equally long: the one
+    # listed first in contrastive_connectors wins, wherever it occurs
+    assert rb.contrastive_connectors.index("mà") < rb.contrastive_connectors.index("dù")
+    text = "tệ dù khủng khiếp mà hài lòng"
+    assert rb._post_contrast_clause_score(text) == rb._clause_score("hài lòng") > 0
+    assert rb.analyze(text).score == float(rb.analyze_batch([text]).scores[0]) > 0
+    assert rb._post_contrast_clause_score("thế nhưng tệ tuy nhiên hài lòng") == rb._clause_score("hài lòng")
@@ -0,0 +1,47 @@
+from cue_detector import CONTRAST, HEDGE, QUESTION, SARCASM, CueDetector
+from lexicon_artifact import load_tables
+
+
+def detector():
+    return load_tables().cue_detector()
+
+
+def found(text):
+    return [(c.kind, text[c.start:c.end]) for c in detector().find(text)]
+
+
+def test_reports_every_class_with_positions():
+    text = "có lẽ tốt lắm nhưng bạn nghĩ sao?"
+    assert found(text) == [
+        (HEDGE, "có lẽ"), (SARCASM, "tốt lắm"), (CONTRAST, "nhưng"), (QUESTION, "bạn nghĩ"), (QUESTION, "?"),
+    ]
+
+
+def test_overlapping_cues_are_all_reported():
+    assert found("mặc dù thế") == [(CONTRAST, "mặc dù"), (CONTRAST, "mặc dù thế"), (CONTRAST, "dù")]
+
+
+def test_cues_match_whole_words_only():
+    assert found("tuyệt vời, dùng màu này") == [(SARCASM, "tuyệt vời")]
+    assert found("mẹ mày") == []
+
+
+def test_khong_gap_hedges():
+    assert found("không ngon quá") == [(HEDGE, "không ngon quá")]
+    assert found("không quá") == []
+    assert found("không đẹp\nlắm thôi") == []
+    assert (HEDGE, "không hẳn là tệ thôi") in found("không hẳn là tệ thôi")
+
+
+def test_added_cues_are_picked_up():
+    d = CueDetector([], [], [], [])
+    assert d.find("thế vậy à") == []
+    d.add("vậy à", QUESTION)
+    assert [(c.kind, c.start, c.end) for c in d.find("thế vậy à")] == [(QUESTION, 4, 9)]
+
+
+def test_adversarial_input_is_linear():
+    # 200k characters of "không " without a closing "quá" made the old wildcard regex quadratic
+    text = "không " * 40000
+    cues = detector().find(text)
+    assert all(c.kind != HEDGE for c in cues)
@@ -0,0 +1,92 @@
+from document import DocumentAnalyzer, iter_chunks
+from fusion import ConditionalFusion
+from pipeline import SentimentPipeline
+from preprocessing import VietnamesePreprocessor
+from result_cache import ResultCache
+from rule_based import RuleBasedSentiment
+from sentiment_backend import SentimentBackend
+
+
+class Preprocessor:
+    """Noise removal without word segmentation, so results do not depend on underthesea."""
+
+    def canonicalize(self, text):
+        return VietnamesePreprocessor().remove_noise(text).lower()
+
+    def word_segmentation(self, text):
+        return text
+
+
+class FakeModel(SentimentBackend):
+    model_key = "fake@default"
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_proba(self, text):
+        return {"POS": 0.2, "NEG": 0.2, "NEU": 0.6}
+
+    def predict_proba_batch(self, texts, batch_size=32):
+        self.batches.append(len(texts))
+        return super().predict_proba_batch(texts, batch_size)
+
+
+def make_analyzer(window=64, rule_first=True, cache=None):
+    pipe = SentimentPipeline(Preprocessor(), FakeModel(), RuleBasedSentiment(), ConditionalFusion(),
+                             cache=cache, rule_first=rule_first)
+    return DocumentAnalyzer(pipe, window=window, max_chunk_chars=40)
+
+
+def test_chunking_sentences_clauses_and_words():
+    text = "Giao hàng nhanh. Đóng gói cẩn thận!\nNhưng mà, " + "rất " * 20 + "tệ"
+    chunks = list(iter_chunks(text, max_chars=40))
+    assert chunks[:3] == ["Giao hàng nhanh.", "Đóng gói cẩn thận!", "Nhưng mà,"]
+    assert all(len(c) <= 40 for c in chunks)
+    assert " ".join(chunks[3:]).split() == ("rất " * 20 + "tệ").split()
+    # Lines from a file give the same chunks as the joined text
+    assert list(iter_chunks(text.splitlines(True), 40)) == chunks
+
+
+def test_document_label_and_breakdown():
+    analyzer = make_analyzer()
+    doc = analyzer.analyze("Giao hàng nhanh, đóng gói đẹp. Tôi rất hài lòng. Sản phẩm bình thường.")
+    assert doc.label == "POSITIVE" and not doc.mixed
+    assert doc.chunk_count == len(doc.chunks) == 3
+    assert [c.index for c in doc.chunks] == [0, 1, 2]
+
+    mixed = analyzer.analyze("Tôi rất hài lòng. Giao hàng quá tệ.")
+    assert mixed.label == "NEUTRAL" and mixed.mixed
+
+
+def test_long_document_is_batched_per_window_and_bounded():
+    analyzer = make_analyzer(window=16, rule_first=False)
+    sentences = [f"Sản phẩm số {i} bình thường." for i in range(100)]
+    doc = analyzer.analyze(iter(sentences), keep_chunks=False)
+    assert doc.chunk_count == 100 and doc.chunks is None
+    assert analyzer.pipeline.phobert.batches == [16] * 6 + [4]
+    assert analyzer.pipeline.model_calls == 100
+
+
+def test_repeated_chunks_are_computed_once_and_cached_across_windows():
+    analyzer = make_analyzer(window=4, rule_first=False, cache=ResultCache())
+    doc = analyzer.analyze(["Sản phẩm bình thường.", "Giao hàng chậm!", "Sản phẩm   bình thường."] * 4)
+    assert doc.chunk_count == 12
+    # First window: two distinct chunks; later windows are served from the cache
+    assert analyzer.pipeline.phobert.batches == [2]
+    assert analyzer.pipeline.model_calls == 2
+    assert len({(c.label, c.confidence) for c in doc.chunks[::3]}) == 1
+
+
+def test_rule_first_only_sends_needed_chunks_to_the_model():
+    analyzer = make_analyzer()
+    doc = analyzer.analyze("Tôi rất hài lòng. Sản phẩm bình thường.")
+    assert [c.model_skipped for c in doc.chunks] == [True, False]
+    assert analyzer.pipeline.phobert.batches == [1]
+
+
+def test_validation_length_cap_is_optional_for_documents():
+    from validation import validate_input
+
+    review = "Tôi rất hài lòng với sản phẩm này. " * 30
+    assert not validate_input(review)[0]
+    assert validate_input(review, max_length=None)[0]
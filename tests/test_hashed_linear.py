@@ -0,0 +1,48 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fusion import ConditionalFusion
+from hashed_linear import HashedLinearBackend, HashedLinearModel, features, is_holdout, load_labeled_prompts
+from sentiment_backend import SentimentBackend
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    prompts = [p for p in load_labeled_prompts() if not is_holdout(p[0])]
+    model = HashedLinearModel.train([t for t, _ in prompts], [l for _, l in prompts], n_features=2 ** 14, epochs=150)
+    path = str(tmp_path_factory.mktemp("linear") / "model.npz")
+    model.save(path)
+    return path
+
+
+def test_features_fold_diacritics():
+    accented, _ = features("Sản phẩm rất tốt", 2 ** 16)
+    plain, _ = features("san pham rat tot", 2 ** 16)
+    # Folded unigrams and bigrams are shared by both spellings
+    assert len(set(accented) & set(plain)) == 7
+
+
+def test_backend_interface_and_held_out_accuracy(model_path):
+    backend = HashedLinearBackend(model_path)
+    assert isinstance(backend, SentimentBackend)
+    held_out = [p for p in load_labeled_prompts() if is_holdout(p[0])]
+    outputs = backend.analyze_batch([t for t, _ in held_out])
+    accuracy = sum(label == expected for (label, _), (_, expected) in zip(outputs, held_out)) / len(held_out)
+    assert accuracy > 0.85
+    assert backend.analyze_sentiment(held_out[0][0]) == outputs[0]
+    assert set(backend.predict_proba("tốt")) == {"NEG", "NEU", "POS"}
+
+
+def test_save_load_roundtrip_and_fusion(model_path):
+    backend = HashedLinearBackend(model_path)
+    label, confidence = backend.analyze_sentiment("Sản phẩm này rất tuyệt vời")
+    assert label == "POSITIVE" and 0 < confidence <= 1
+    assert ConditionalFusion().fuse(label, confidence, 0.0)[0] in ("POSITIVE", "NEUTRAL", "NEGATIVE")
+    assert backend.model_key.startswith("hashed-linear@")
+    assert HashedLinearBackend(model_path, preload=False).model_key == backend.model_key
+
+
+def test_empty_text():
+    model = HashedLinearModel(np.zeros((16, 3)), np.array([0.0, 1.0, 0.0]))
+    assert model.predict_proba_matrix(["", "!!!"]).argmax(axis=1).tolist() == [1, 1]
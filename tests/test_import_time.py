@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rule-only modules must import without the model stack: app.py, scripts and
+# tests import them without loading a model. Import *time* is benchmarked
+# separately (scripts/benchmark_import_time.py), not asserted here.
+LIGHT_MODULES = ["rule_based", "validation", "fusion", "pipeline", "preprocessing", "phobert_module"]
+HEAVY = ("torch", "transformers", "underthesea", "onnxruntime")
+
+# Runs in a fresh interpreter. The heavy packages resolve to a loader that
+# records the import and raises ImportError, so an attempt is caught whether
+# or not the package is installed, even when the module swallows the
+# ImportError. Availability probes (importlib.util.find_spec) are not imports
+# and pass.
+BLOCKED_IMPORT = """
+import importlib.abc, importlib.machinery, sys
+
+attempted = []
+
+class Blocker(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in {heavy!r}:
+            return importlib.machinery.ModuleSpec(name, self)
+        return None
+
+    def create_module(self, spec):
+        attempted.append(spec.name)
+        raise ImportError(spec.name + " is blocked")
+
+    def exec_module(self, module):
+        pass
+
+sys.meta_path.insert(0, Blocker())
+import {module}
+print(" ".join(attempted))
+"""
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_module_does_not_import_model_stack(module):
+    code = BLOCKED_IMPORT.format(heavy=HEAVY, module=module)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == []
@@ -0,0 +1,133 @@
+import pytest
+
+import lexicon_artifact
+from lexicon_artifact import FoldedLexicon, LexiconArtifact, build_artifact, load_tables, source_tables
+from rule_based import RuleBasedSentiment
+
+
+@pytest.fixture(scope="module")
+def artifact_path(tmp_path_factory):
+    return str(build_artifact(str(tmp_path_factory.mktemp("lexicon") / "lexicon.bin")))
+
+
+def test_artifact_round_trips_source_tables(artifact_path):
+    source = source_tables()
+    artifact = LexiconArtifact(artifact_path)
+    assert artifact.version == source.version
+    assert dict(artifact.lexicon.entries.items()) == source.lexicon.entries
+    assert artifact.lexicon.overrides == source.lexicon.overrides
+    assert artifact.lexicon.forms == source.lexicon.forms
+    assert artifact.lexicon["tuyệt vời"] == artifact.lexicon["tuyet voi"] == 5
+    assert artifact.lexicon["chó"] != artifact.lexicon["cho"]
+    assert "không có trong từ điển" not in artifact.lexicon
+    assert "yeu" in artifact.lexicon and "yếu" not in artifact.lexicon
+    for name in ("negations", "intensifiers", "neutral_indicators", "positive_words", "negative_words",
+                 "contrastive_connectors", "sarcasm_indicators", "hedges", "question_phrases", "overlays"):
+        assert getattr(artifact, name) == getattr(source, name), name
+
+
+def test_engine_on_artifact_matches_baseline(artifact_path, baseline):
+    rb = RuleBasedSentiment(artifact=artifact_path)
+    assert isinstance(rb.tables, LexiconArtifact)
+    for text, score, mixed, neutral, hedged, _, _ in baseline:
+        result = rb.analyze(text)
+        assert (result.score, result.mixed, result.neutral, result.hedged) == (score, mixed, neutral, hedged), text
+
+
+def test_engines_share_loaded_tables(artifact_path):
+    assert RuleBasedSentiment(artifact=artifact_path).matcher is RuleBasedSentiment(artifact=artifact_path).matcher
+
+
+def test_stale_default_artifact_is_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "lexicon.bin")
+    build_artifact(path)
+    monkeypatch.setattr(lexicon_artifact, "DEFAULT_ARTIFACT", path)
+    monkeypatch.setattr(lexicon_artifact, "_loaded", {})
+    assert isinstance(load_tables(), LexiconArtifact)
+    monkeypatch.setattr(lexicon_artifact, "source_version", lambda: "0" * 12)
+    assert not isinstance(load_tables(), LexiconArtifact)
+
+
+def test_rebuilt_artifact_is_picked_up(tmp_path):
+    path = str(tmp_path / "lexicon.bin")
+    build_artifact(path)
+    rb = RuleBasedSentiment(artifact=path)
+    assert rb.refreshed() is rb
+
+    tables = source_tables()
+    tables.version = "tuned000001"
+    tables.lexicon = FoldedLexicon(dict(tables.lexicon.entries, **{"giao hang nhanh": 4}), tables.lexicon.overrides,
+                                   tables.lexicon.forms | {"giao hàng nhanh"})
+    build_artifact(path, tables)
+
+    fresh = rb.refreshed()
+    assert fresh is not rb and fresh.lexicon_version == "tuned000001"
+    assert fresh.analyze("giao hàng nhanh").score == 4
+    # The old engine keeps its own tables (and mmap) until it is dropped
+    assert rb.lexicon_version != fresh.lexicon_version
+    assert rb.analyze("tuyệt vời").score == fresh.analyze("tuyệt vời").score
+
+
+def test_build_rejects_scores_not_exact_in_float32(tmp_path):
+    tables = source_tables()
+    tables.lexicon = {"tốt": 0.1}
+    with pytest.raises(ValueError):
+        build_artifact(str(tmp_path / "bad.bin"), tables)
+
+
+def test_overlays_are_picked_per_request(artifact_path, baseline):
+    tables = LexiconArtifact(artifact_path).with_overlay(
+        "delivery", {"giao hàng chậm": -4, "giao hàng": 1, "dịch vụ": None})
+    rb = RuleBasedSentiment(artifact=tables)
+
+    assert rb.analyze("giao hàng chậm").score == -2
+    assert rb.analyze("giao hàng chậm", overlay="delivery").score == -4
+    assert rb.analyze("giao hang", overlay="delivery").matches == (("giao hang", 1.0),)
+    assert rb.analyze("giao hang").matches == (("giao hang", 0.0),)
+    with pytest.raises(ValueError):
+        rb.analyze("giao hàng", overlay="unknown")
+
+    lexicon = tables.lexicon_for("delivery")
+    assert lexicon["giao hàng"] == 1 and "dịch vụ" not in lexicon
+    assert lexicon["chó"] == tables.lexicon["chó"]
+    assert len(lexicon) == len(tables.lexicon) - 1  # "dịch vụ" removed, nothing new
+
+    texts = [row[0] for row in baseline[:300]] + ["giao hàng nhanh nhưng dịch vụ kém", "giao hang cham cung duoc"]
+    batch = rb.analyze_batch(texts, overlay="delivery")
+    assert [float(s) for s in batch.scores] == [rb.analyze(t, overlay="delivery").score for t in texts]
+
+
+def test_with_overlay_leaves_shared_tables_untouched(artifact_path):
+    tables = LexiconArtifact(artifact_path)
+    first = tables.with_overlay("delivery", {"giao hàng chậm": -4})
+    second = first.with_overlay("delivery", {"giao hàng chậm": -1})
+
+    assert "delivery" not in tables.overlays and tables.version == source_tables().version
+    assert len({tables.version, first.version, second.version}) == 3
+    assert second.version.startswith(tables.version + "+delivery.")
+    assert first.with_overlay("delivery", {"giao hàng chậm": -4}).version == first.version
+    assert first.matcher() is second.matcher() is tables.matcher()
+
+    rb_first, rb_second = RuleBasedSentiment(artifact=first), RuleBasedSentiment(artifact=second)
+    for rb, expected in ((rb_first, -4), (rb_second, -1)):
+        assert rb.analyze("giao hàng chậm", overlay="delivery").score == expected
+        assert float(rb.analyze_batch(["giao hàng chậm"], overlay="delivery").scores[0]) == expected
+    assert rb_first.lexicon_version != rb_second.lexicon_version
+
+
+def test_overlay_batch_scorer_is_derived_from_the_base_scorer(artifact_path, baseline):
+    overlay = {"giao hàng chậm": -4, "dịch vụ": None, "dich vu": 2, "chó": 3, "tuyệt vời": None,
+               "shipper siêu tốc": 4, "đóng gói cẩn thận": 3, "hàng lỗi": -5}
+    rb = RuleBasedSentiment(artifact=LexiconArtifact(artifact_path).with_overlay("delivery", overlay))
+    base = rb._batch_scorer()
+    scorer = rb._batch_scorer("delivery")
+    assert scorer is not base and base.base < scorer.base  # new tokens widened the radix
+
+    texts = [row[0] for row in baseline[:300]] + [
+        "shipper siêu tốc", "shipper sieu toc nhưng hàng lỗi", "dịch vụ tốt", "dich vu", "con chó",
+        "tuyệt vời", "tuyet voi", "đóng gói cẩn thận", "giao hàng chậm cũng được"]
+    batch = rb.analyze_batch(texts, overlay="delivery")
+    assert [float(s) for s in batch.scores] == [rb.analyze(t, overlay="delivery").score for t in texts]
+    # The base scorer is unchanged by deriving the overlay one
+    batch = rb.analyze_batch(texts)
+    assert [float(s) for s in batch.scores] == [rb.analyze(t).score for t in texts]
@@ -0,0 +1,84 @@
+from diacritics import fold, fold_lexicon
+from lexicon_matcher import PhraseMatcher
+
+
+def keys(text):
+    return fold(text).split()
+
+
+def test_longest_match_prefers_longer_phrase():
+    m = PhraseMatcher({"bất ổn": -3, "ổn": 0.5, "không": 0, "không tốt": -2})
+    assert m.longest_match(keys("không tốt lắm"), 0, 4) == (2, -2)
+    assert m.longest_match(keys("không tốt lắm"), 0, 1) == (1, 0)
+    assert m.longest_match(keys("rất ổn"), 0, 4) is None
+
+
+def test_scan_consumes_matched_tokens():
+    m = PhraseMatcher({"bất ổn": -3, "ổn": 0.5})
+    assert list(m.scan(keys("hôm nay bất ổn"), 4)) == [(2, 2, -3)]
+
+
+def test_matches_at_reports_every_prefix():
+    m = PhraseMatcher({"tuyệt": 5, "tuyệt vời": 5, "tuyệt vời quá": 4})
+    assert list(m.matches_at(keys("tuyệt vời quá"), 0, 2)) == [(1, 5), (2, 5)]
+
+
+def test_listed_and_unaccented_forms_resolve_to_folded_entry():
+    m = PhraseMatcher({"tuyệt vời": 5})
+    for text in ("tuyệt vời", "tuyet voi"):
+        assert m.longest_match(keys(text), 0, 4, text.split()) == (2, 5)
+    # An accented spelling the lexicon does not list is another word
+    assert m.longest_match(keys("tuyêt vơi"), 0, 4, "tuyêt vơi".split()) is None
+
+
+def test_unlisted_accented_form_does_not_borrow_a_score():
+    m = PhraseMatcher({"yêu": 4, "mua": 3, "buồn": -3, "tệ": -4})
+    for word in ("yếu", "múa", "buôn", "tê"):
+        assert m.longest_match(keys(word), 0, 1, [word]) is None, word
+    for word in ("yêu", "yeu", "buồn", "buon"):
+        assert m.longest_match(keys(word), 0, 1, [word]) is not None, word
+
+
+def test_surface_overrides_where_forms_differ():
+    lexicon = {"lồn": -5, "lon": 0, "lớn": 0, "chó": -4, "cho": 0}
+    entries, overrides, collisions = fold_lexicon(lexicon)
+    assert entries == {"lon": 0, "cho": 0}
+    assert overrides == {"lồn": -5, "chó": -4}
+    assert set(collisions) == {"lon", "cho"}
+
+    m = PhraseMatcher(lexicon)
+    assert m.longest_match(keys("chó"), 0, 1, ["chó"]) == (1, -4)
+    assert m.longest_match(keys("cho"), 0, 1, ["cho"]) == (1, 0)
+    assert m.longest_match(keys("lớn"), 0, 1, ["lớn"]) == (1, 0)
+
+
+def test_add_keeps_overrides_per_form():
+    m = PhraseMatcher({"cho": 0})
+    m.add("chó", -4)
+    assert m.longest_match(["cho"], 0, 1, ["chó"]) == (1, -4)
+    assert m.longest_match(["cho"], 0, 1, ["cho"]) == (1, 0)
+    assert m.longest_match(["cho"], 0, 1, ["chờ"]) is None
+
+
+def test_overlay_copies_only_touched_paths():
+    base = PhraseMatcher({"giao hàng": 0, "giao hàng nhanh": 2, "tốt": 3, "chó": -4, "cho": 0})
+    domain = base.overlay({"giao hàng": 1, "giao hàng chậm": -3, "tốt": None})
+
+    assert domain.longest_match(keys("giao hàng chậm"), 0, 4) == (3, -3)
+    assert domain.longest_match(keys("giao hàng"), 0, 4) == (2, 1)
+    assert domain.longest_match(keys("tốt"), 0, 4) is None
+    assert domain.longest_match(keys("chó"), 0, 1, ["chó"]) == (1, -4)
+    # The base is untouched and untouched subtrees are shared
+    assert base.longest_match(keys("giao hàng chậm"), 0, 4) == (2, 0)
+    assert base.longest_match(keys("tốt"), 0, 4) == (1, 3)
+    assert domain.root["cho"] is base.root["cho"]
+    assert domain.root["giao"] is not base.root["giao"]
+
+
+def test_overlay_of_overlay_leaves_parent_intact():
+    base = PhraseMatcher({"hàng": 0})
+    first = base.overlay({"hàng": 1})
+    second = first.overlay({"hàng": 2})
+    second.add("hàng xịn", 4)
+    assert [m.longest_match(["hang"], 0, 1) for m in (base, first, second)] == [(1, 0), (1, 1), (1, 2)]
+    assert first.longest_match(keys("hàng xịn"), 0, 2) == (1, 1)
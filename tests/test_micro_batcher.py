@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+class FakeModel:
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def analyze_batch(self, texts, batch_size=32):
+        if self.gate is not None:
+            self.gate.wait()
+        self.calls.append(list(texts))
+        if "boom" in texts:
+            raise RuntimeError("model down")
+        return [("POSITIVE", len(t) / 100) for t in texts]
+
+
+def test_concurrent_requests_share_batches_and_keep_their_results():
+    model = FakeModel()
+
+    async def main():
+        async with MicroBatcher(model, max_batch_size=4, max_wait=0.05) as batcher:
+            texts = ["x" * n for n in range(1, 11)]
+            results = await asyncio.gather(*(batcher.analyze(t) for t in texts))
+            return texts, results, batcher.stats()
+
+    texts, results, stats = asyncio.run(main())
+    assert results == [("POSITIVE", len(t) / 100) for t in texts]
+    assert [len(c) for c in model.calls] == [4, 4, 2]
+    assert stats["batches"] == 3 and stats["requests"] == 10
+    assert stats["batch_sizes"] == {4: 2, 2: 1}
+    assert stats["max_queue_depth"] >= 4
+
+
+def test_window_flushes_partial_batch():
+    model = FakeModel()
+
+    async def main():
+        async with MicroBatcher(model, max_batch_size=64, max_wait=0.001) as batcher:
+            return await batcher.analyze("một")
+
+    assert asyncio.run(main()) == ("POSITIVE", 0.03)
+    assert model.calls == [["một"]]
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    model = FakeModel()
+
+    async def main():
+        async with MicroBatcher(model, max_batch_size=2, max_wait=0.05) as batcher:
+            results = await asyncio.gather(batcher.analyze("ok"), batcher.analyze("boom"),
+                                           return_exceptions=True)
+            # The worker keeps serving after a failed batch
+            return results, await batcher.analyze("ok")
+
+    results, after = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert after == ("POSITIVE", 0.02)
+
+
+def test_full_queue_rejects_nowait_callers():
+    gate = threading.Event()
+    model = FakeModel(gate)
+
+    async def main():
+        async with MicroBatcher(model, max_batch_size=1, max_wait=0, max_queue=2) as batcher:
+            first = asyncio.ensure_future(batcher.analyze("a"))
+            await asyncio.sleep(0.01)  # worker is now blocked inside the model
+            queued = [asyncio.ensure_future(batcher.analyze_nowait(t)) for t in "bc"]
+            await asyncio.sleep(0)
+            with pytest.raises(asyncio.QueueFull):
+                await batcher.analyze_nowait("d")
+            gate.set()
+            await asyncio.gather(first, *queued)
+            return batcher.stats()
+
+    stats = asyncio.run(main())
+    assert stats["rejected"] == 1 and stats["requests"] == 3 and stats["queue_depth"] == 0
@@ -0,0 +1,18 @@
+import json
+
+import model_bundle
+
+
+def test_missing_or_stale_manifest_is_not_a_bundle(tmp_path):
+    assert model_bundle.load_manifest(str(tmp_path)) is None
+    (tmp_path / model_bundle.MANIFEST).write_text(json.dumps({"format_version": 0}))
+    assert model_bundle.load_manifest(str(tmp_path)) is None
+    (tmp_path / model_bundle.MANIFEST).write_text("{")
+    assert model_bundle.load_manifest(str(tmp_path)) is None
+
+
+def test_manifest_and_paths(tmp_path):
+    manifest = {"format_version": model_bundle.FORMAT_VERSION, "model_name": "m", "revision": "abc"}
+    (tmp_path / model_bundle.MANIFEST).write_text(json.dumps(manifest))
+    assert model_bundle.load_manifest(str(tmp_path)) == manifest
+    assert model_bundle.sentiment_path(str(tmp_path)) == str(tmp_path / "sentiment")
@@ -0,0 +1,50 @@
+import threading
+
+from model_runner import DeadlineRunner
+
+
+class SlowModel:
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+
+    def analyze_sentiment(self, text):
+        self.started.append(text)
+        if text.startswith("slow"):
+            self.release.wait(5)
+        return "POSITIVE", 0.9
+
+
+def test_answers_within_deadline():
+    runner = DeadlineRunner(SlowModel())
+    assert runner.analyze("fast", 1.0) == ("POSITIVE", 0.9)
+    assert runner.stats()["deadline_misses"] == 0
+
+
+def test_missed_deadline_cancels_queued_work():
+    model = SlowModel()
+    runner = DeadlineRunner(model, max_workers=1, max_pending=4)
+    assert runner.analyze("slow", 0.01) is None      # running: left to finish in the background
+    assert runner.analyze("queued", 0.01) is None    # queued behind it: cancelled, never runs
+    model.release.set()
+    runner.shutdown()
+    stats = runner.stats()
+    assert (stats["deadline_misses"], stats["cancelled"]) == (2, 1)
+    assert model.started == ["slow"]
+
+
+def test_overload_is_shed_without_queueing():
+    model = SlowModel()
+    runner = DeadlineRunner(model, max_workers=1, max_pending=1)
+    assert runner.analyze("slow", 0.01) is None
+    assert runner.analyze("fast", 1.0) is None       # the late call still occupies the only slot
+    assert runner.stats()["shed"] == 1
+    model.release.set()
+    runner.shutdown()
+
+
+def test_no_time_left_is_shed_without_submitting():
+    model = SlowModel()
+    runner = DeadlineRunner(model)
+    assert runner.analyze("fast", 0) is None
+    assert runner.stats()["shed"] == 1 and model.started == []
@@ -0,0 +1,131 @@
+import pytest
+
+from phobert_cache import PhoBERTCache
+
+PROBS = {"POS": 0.7, "NEU": 0.2, "NEG": 0.1}
+
+
+def test_round_trip_and_persistence(tmp_path):
+    path = str(tmp_path / "phobert.db")
+    cache = PhoBERTCache(path)
+    assert cache.get("model@a", "tốt quá") is None
+    cache.put("model@a", "tốt quá", PROBS)
+    assert cache.get("model@a", "tốt quá") == PROBS
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A new instance (another process or a restart) sees the same entries
+    reopened = PhoBERTCache(path)
+    assert reopened.get("model@a", "tốt quá") == PROBS
+    assert len(reopened) == 1
+
+
+def test_keyed_by_model_revision_and_text(tmp_path):
+    cache = PhoBERTCache(str(tmp_path / "phobert.db"))
+    cache.put_many("model@a", [("a", PROBS), ("b", {"NEG": 1.0})])
+    assert cache.get_many("model@a", ["b", "c", "a"]) == [{"NEG": 1.0}, None, PROBS]
+    assert cache.get("model@b", "a") is None
+
+
+def test_module_skips_the_model_on_cache_hits(tmp_path):
+    pytest.importorskip("transformers")
+    from phobert_module import PhoBERTModule
+
+    cache = PhoBERTCache(str(tmp_path / "phobert.db"))
+    phobert = PhoBERTModule(revision="abc123", cache=cache, preload=False)
+    cache.put(phobert.model_key, "tốt quá", PROBS)
+    assert phobert.analyze_sentiment("tốt quá") == ("POSITIVE", 0.7)
+    assert phobert._pipe is None
+
+
+def test_batch_runs_length_buckets_in_input_order(tmp_path):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from phobert_module import PhoBERTModule
+
+    class Tokenizer:
+        def __call__(self, texts, truncation=True):
+            return {"input_ids": [[0] * len(t.split()) for t in texts]}
+
+        def pad(self, encoded, return_tensors="pt"):
+            ids = encoded["input_ids"]
+            width = max(len(i) for i in ids)
+            mask = [[1] * len(i) + [0] * (width - len(i)) for i in ids]
+            return {"input_ids": torch.zeros(len(ids), width, dtype=torch.long), "attention_mask": torch.tensor(mask)}
+
+    class Model:
+        device = torch.device("cpu")
+        config = type("Config", (), {"id2label": {0: "NEG", 1: "NEU", 2: "POS"}})()
+        widths = []
+
+        def __call__(self, input_ids, attention_mask):
+            self.widths.append(input_ids.shape[1])
+            lengths = attention_mask.sum(1).float()
+            # Longer texts lean positive so the order can be checked
+            logits = torch.stack([-lengths, torch.zeros_like(lengths), lengths], 1)
+            return type("Output", (), {"logits": logits})()
+
+    phobert = PhoBERTModule(revision="abc123", cache=PhoBERTCache(str(tmp_path / "phobert.db")), preload=False)
+    phobert._pipe = type("Pipe", (), {"tokenizer": Tokenizer(), "model": Model()})()
+    texts = ["a b c d", "a", "a b c d e f", "a b"]
+    results = phobert.analyze_batch(texts, batch_size=2)
+    assert Model.widths == [2, 6]
+    assert [label for label, _ in results] == ["POSITIVE"] * 4
+    assert results[2][1] > results[0][1] > results[3][1] > results[1][1]
+    # Second call is served from the cache
+    assert phobert.analyze_batch(texts, batch_size=2) == results and Model.widths == [2, 6]
+
+
+def test_onnx_backend_has_its_own_cache_key():
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from phobert_module import PhoBERTModule
+
+    torch_key = PhoBERTModule(preload=False).model_key
+    onnx_key = PhoBERTModule(preload=False, backend="onnx").model_key
+    assert onnx_key == torch_key + "+onnx-int8"
+    with pytest.raises(ValueError):
+        PhoBERTModule(preload=False, backend="tflite")
+
+
+def test_bundle_keeps_source_model_cache_key(tmp_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    import json
+    import model_bundle
+    from phobert_module import PhoBERTModule
+
+    manifest = {"format_version": model_bundle.FORMAT_VERSION, "model_name": "wonrax/phobert-base-vietnamese-sentiment",
+                "revision": None}
+    (tmp_path / model_bundle.MANIFEST).write_text(json.dumps(manifest))
+    phobert = PhoBERTModule.from_bundle(str(tmp_path), preload=False)
+    assert phobert.model_key == PhoBERTModule(preload=False).model_key
+    assert phobert.model_path == model_bundle.sentiment_path(str(tmp_path))
+
+
+def test_tokenized_input_skips_the_tokenizer(tmp_path):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from phobert_module import PhoBERTModule
+
+    class Tokenizer:
+        def __call__(self, texts, truncation=True):
+            raise AssertionError("already tokenized")
+
+        def pad(self, encoded, return_tensors="pt"):
+            ids = encoded["input_ids"]
+            width = max(len(i) for i in ids)
+            return {"input_ids": torch.tensor([i + [1] * (width - len(i)) for i in ids]),
+                    "attention_mask": torch.tensor([[1] * len(i) + [0] * (width - len(i)) for i in ids])}
+
+    class Model:
+        device = torch.device("cpu")
+        config = type("Config", (), {"id2label": {0: "NEG", 1: "POS"}})()
+
+        def __call__(self, input_ids, attention_mask):
+            first = input_ids[:, 0].float()
+            return type("Output", (), {"logits": torch.stack([-first, first], 1)})()
+
+    phobert = PhoBERTModule(preload=False)
+    phobert._pipe = type("Pipe", (), {"tokenizer": Tokenizer(), "model": Model()})()
+    labels = [label for label, _ in phobert.analyze_tokens([[5, 6, 7], [-3], [2, 2]], batch_size=2)]
+    assert labels == ["POSITIVE", "NEGATIVE", "POSITIVE"]
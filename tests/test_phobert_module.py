@@ -0,0 +1,87 @@
+import pytest
+
+from phobert_module import PhoBERTModule
+from sentiment_backend import SentimentBackend
+
+PROBS = {"POS": [0.7, 0.2, 0.1], "NEG": [0.1, 0.2, 0.7], "NEU": [0.2, 0.6, 0.2]}
+
+
+class StubbedPhoBERT(PhoBERTModule):
+    """The real class with the model calls replaced (no torch needed)."""
+
+    def __init__(self):
+        super().__init__(preload=False)
+        self.forwarded = []
+
+    @staticmethod
+    def _probs(text):
+        return dict(zip(("POS", "NEU", "NEG"), PROBS[text.split()[0]]))
+
+    def predict_proba(self, text):
+        return self._probs(text)
+
+    def _forward(self, texts, batch_size):
+        self.forwarded.append(list(texts))
+        return [self._probs(t) for t in texts]
+
+    def predict_proba_tokens(self, input_ids, batch_size=32):
+        return [self._probs(ids) for ids in input_ids]
+
+
+def test_is_a_sentiment_backend():
+    phobert = StubbedPhoBERT()
+    assert isinstance(phobert, SentimentBackend)
+    assert phobert._pipe is None
+
+
+def test_analyze_sentiment():
+    assert StubbedPhoBERT().analyze_sentiment("POS tốt") == ("POSITIVE", 0.7)
+    assert StubbedPhoBERT().analyze_sentiment("NEG tệ") == ("NEGATIVE", 0.7)
+
+
+def test_analyze_batch_dedups_and_keeps_order():
+    phobert = StubbedPhoBERT()
+    out = phobert.analyze_batch(["NEU bình thường", "POS tốt", "NEU bình thường"])
+    assert out == [("NEUTRAL", 0.6), ("POSITIVE", 0.7), ("NEUTRAL", 0.6)]
+    assert phobert.forwarded == [["NEU bình thường", "POS tốt"]]
+
+
+def test_analyze_tokens():
+    assert StubbedPhoBERT().analyze_tokens(["NEG", "POS"]) == [("NEGATIVE", 0.7), ("POSITIVE", 0.7)]
+
+
+def test_persistent_cache_is_keyed_by_a_resolved_commit(tmp_path, monkeypatch):
+    import phobert_module
+    from phobert_cache import PhoBERTCache
+
+    resolved = []
+    monkeypatch.setattr(phobert_module, "resolve_revision", lambda name: resolved.append(name) or "0123abcd")
+    cache = PhoBERTCache(str(tmp_path / "phobert.db"))
+
+    assert PhoBERTModule(preload=False).model_key.endswith("@default") and not resolved
+    assert PhoBERTModule(revision="v1", cache=cache, preload=False).model_key.endswith("@v1") and not resolved
+    phobert = PhoBERTModule(cache=cache, preload=False)
+    assert phobert.model_key == "wonrax/phobert-base-vietnamese-sentiment@0123abcd"
+    # Resolved once; the model is then loaded at that commit
+    assert phobert.model_key and phobert.revision == "0123abcd" and len(resolved) == 1
+
+    bundled = PhoBERTModule(cache=cache, preload=False, model_path=str(tmp_path))
+    with pytest.raises(ValueError):
+        bundled.model_key
+
+
+def test_preloaded_model_is_fetched_at_the_resolved_commit(tmp_path, monkeypatch):
+    import sys
+    import types
+
+    import phobert_module
+    from phobert_cache import PhoBERTCache
+
+    fetched = []
+    monkeypatch.setattr(phobert_module, "resolve_revision", lambda name: "0123abcd")
+    monkeypatch.setitem(sys.modules, "transformers",
+                        types.SimpleNamespace(pipeline=lambda *args, **kwargs: fetched.append(kwargs["revision"])))
+
+    phobert = PhoBERTModule(cache=PhoBERTCache(str(tmp_path / "phobert.db")))
+    assert fetched == ["0123abcd"]
+    assert phobert.model_key == "wonrax/phobert-base-vietnamese-sentiment@0123abcd"
@@ -0,0 +1,31 @@
+import os
+
+from phobert_pool import PhoBERTPool
+
+
+class FakeModel:
+    def __init__(self):
+        self.loaded = False
+        self.loaded_in = None
+
+    def load(self):
+        self.loaded = True
+        self.loaded_in = os.getpid()
+
+    def analyze_batch(self, texts, batch_size=32):
+        assert self.loaded
+        return [(t.upper(), os.getpid(), self.loaded_in) for t in texts]
+
+
+def test_results_keep_input_order_across_workers():
+    texts = [f"text {i}" for i in range(200)]
+    with PhoBERTPool(FakeModel(), workers=3, chunk_size=7) as pool:
+        results = pool.analyze_batch(texts)
+    assert [r[0] for r in results] == [t.upper() for t in texts]
+    # Work ran in the children on the model the parent loaded before forking
+    assert all(pid != os.getpid() and loaded_in == os.getpid() for _, pid, loaded_in in results)
+
+
+def test_empty_input():
+    with PhoBERTPool(FakeModel(), workers=1) as pool:
+        assert pool.analyze_batch([]) == []
@@ -0,0 +1,187 @@
+import threading
+import time
+
+from fusion import ConditionalFusion
+from pipeline import SentimentPipeline
+from result_cache import ResultCache
+from rule_based import RuleBasedSentiment
+
+
+class Preprocessor:
+    def canonicalize(self, text):
+        return " ".join(text.split()).lower()
+
+    def word_segmentation(self, text):
+        return text
+
+    def preprocess(self, text):
+        return self.word_segmentation(self.canonicalize(text))
+
+
+class FakePhoBERT:
+    model_key = "fake-phobert@default"
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_sentiment(self, text):
+        self.calls += 1
+        return "NEUTRAL", 0.6
+
+
+def make_pipeline(cache=None):
+    return SentimentPipeline(Preprocessor(), FakePhoBERT(), RuleBasedSentiment(), ConditionalFusion(), cache=cache)
+
+
+def test_pipeline_matches_manual_steps():
+    pipe = make_pipeline()
+    result = pipe.analyze("Sản phẩm tuyệt vời")
+    rule = RuleBasedSentiment().analyze("sản phẩm tuyệt vời")
+    assert result.rule == rule
+    assert (result.label, result.confidence) == ConditionalFusion().fuse(
+        "NEUTRAL", 0.6, rule.score, mixed_flag=rule.mixed, neutral_flag=rule.neutral, hedged_flag=rule.hedged)
+
+
+def test_repeats_are_served_from_cache():
+    cache = ResultCache()
+    pipe = make_pipeline(cache)
+    first = pipe.analyze("Sản phẩm  tuyệt vời ")
+    assert pipe.analyze("Sản phẩm tuyệt vời") is first
+    assert pipe.phobert.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_key_tracks_lexicon_and_fusion_versions():
+    cache = ResultCache()
+    pipe = make_pipeline(cache)
+    pipe.analyze("tốt")
+    pipe.fusion = ConditionalFusion(theta_rule=0.5)
+    pipe.analyze("tốt")
+    assert pipe.phobert.calls == 2
+    assert pipe.cache_key("tốt")[2] == pipe.rule_engine.lexicon_version
+
+
+class VaryingPhoBERT(FakePhoBERT):
+    """Deterministic but text-dependent outputs covering every fusion branch."""
+
+    def analyze_sentiment(self, text):
+        self.calls += 1
+        h = sum(map(ord, text))
+        return ["POSITIVE", "NEGATIVE", "NEUTRAL"][h % 3], (h % 100) / 100
+
+
+def test_rule_first_gives_identical_results_and_skips_the_model(baseline):
+    texts = [row[0] for row in baseline]
+    full = SentimentPipeline(Preprocessor(), VaryingPhoBERT(), RuleBasedSentiment(), ConditionalFusion())
+    rule_first = SentimentPipeline(Preprocessor(), VaryingPhoBERT(), RuleBasedSentiment(), ConditionalFusion(),
+                                   rule_first=True)
+    for text in texts:
+        expected, got = full.analyze(text), rule_first.analyze(text)
+        assert (got.label, got.confidence) == (expected.label, expected.confidence)
+        assert got.model_skipped == (got.phobert_label is None)
+    assert rule_first.phobert.calls + rule_first.model_skips == len(texts)
+    assert 0 < rule_first.skip_rate < 1 and full.skip_rate == 0.0
+
+
+class StuckPhoBERT(FakePhoBERT):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def analyze_sentiment(self, text):
+        self.release.wait(5)
+        return super().analyze_sentiment(text)
+
+
+def test_deadline_miss_degrades_to_rules_and_is_not_cached():
+    cache = ResultCache()
+    phobert = StuckPhoBERT()
+    pipe = SentimentPipeline(Preprocessor(), phobert, RuleBasedSentiment(), ConditionalFusion(), cache=cache,
+                             deadline=0.02)
+    text = "Sản phẩm bình thường"
+    rule = RuleBasedSentiment().analyze(text.lower())
+    assert ConditionalFusion().needs_model(rule.score, rule.mixed)
+    result = pipe.analyze(text)
+    assert result.degraded and result.phobert_label is None
+    assert (result.label, result.confidence) == ConditionalFusion().fuse_without_model(
+        rule.score, mixed_flag=rule.mixed, neutral_flag=rule.neutral, hedged_flag=rule.hedged)
+    assert len(cache) == 0 and pipe.degraded == 1
+    assert pipe.runner.stats()["deadline_misses"] == 1
+
+    phobert.release.set()
+    result = pipe.analyze(text, deadline=5)
+    assert not result.degraded and result.phobert_label == "NEUTRAL"
+    assert len(cache) == 1
+    pipe.runner.shutdown()
+
+
+def test_coalesced_request_waits_no_longer_than_its_own_deadline():
+    phobert = StuckPhoBERT()
+    pipe = SentimentPipeline(Preprocessor(), phobert, RuleBasedSentiment(), ConditionalFusion(), cache=ResultCache())
+    text = "Sản phẩm bình thường"
+    leader = threading.Thread(target=lambda: pipe.analyze(text, deadline=5))
+    leader.start()
+    while pipe.runner is None or pipe.runner.stats()["pending"] == 0:
+        time.sleep(0.001)
+    begin = time.monotonic()
+    result = pipe.analyze(text, deadline=0.05)
+    assert time.monotonic() - begin < 1
+    assert result.degraded and result.phobert_label is None
+    assert pipe.cache.stats()["coalesced"] == 1
+    phobert.release.set()
+    leader.join()
+    assert not pipe.analyze(text).degraded  # the leader's result was cached
+    pipe.runner.shutdown()
+
+
+def test_concurrent_first_deadline_requests_share_one_runner():
+    pipe = make_pipeline()
+    barrier = threading.Barrier(8)
+    runners = []
+
+    def first_request():
+        barrier.wait()
+        runners.append(pipe._deadline_runner())
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(r) for r in runners}) == 1 and runners[0] is pipe.runner
+    pipe.runner.shutdown()
+
+
+class BatchPhoBERT(VaryingPhoBERT):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def analyze_batch(self, texts, batch_size=32):
+        self.batches.append(list(texts))
+        return [self.analyze_sentiment(t) for t in texts]
+
+
+def test_batch_dedups_within_and_across_batches(baseline):
+    texts = [row[0] for row in baseline][:200]
+    # Exact repeats plus spacing variants of the same texts
+    batch = texts + texts[:100] + [f"  {t}  " for t in texts[:50]]
+    cache = ResultCache()
+    pipe = SentimentPipeline(Preprocessor(), BatchPhoBERT(), RuleBasedSentiment(), ConditionalFusion(), cache=cache,
+                             rule_first=True)
+    results = pipe.analyze_batch(batch)
+    single = SentimentPipeline(Preprocessor(), VaryingPhoBERT(), RuleBasedSentiment(), ConditionalFusion(),
+                               rule_first=True)
+    for text, result in zip(batch, results):
+        expected = single.analyze(text)
+        assert (result.label, result.confidence, result.phobert_label) == (
+            expected.label, expected.confidence, expected.phobert_label)
+    unique = len({pipe.preprocessor.canonicalize(t) for t in batch})
+    assert len(pipe.phobert.batches) == 1
+    assert pipe.model_calls + pipe.model_skips == unique
+    assert unique <= 200 and pipe.stats()["dedup_ratio"] == len(batch) / unique
+
+    # A second batch is served from the cache: no model call at all
+    assert pipe.analyze_batch(texts[:10]) == results[:10]
+    assert len(pipe.phobert.batches) == 1
+    assert pipe.analyze(texts[0]) == results[0]
@@ -0,0 +1,69 @@
+import re
+
+from preprocessing import VietnamesePreprocessor
+
+
+def test_preprocessor_uses_the_backend_tokenizer():
+    calls = []
+
+    def tokenizer(text, truncation=True):
+        calls.append(text)
+        return {"input_ids": [0] + [len(w) for w in text.split()] + [2]}
+
+    preprocessor = VietnamesePreprocessor(tokenizer=tokenizer)
+    encoded = preprocessor.preprocess_for_phobert("Sản phẩm @shop ngonnn quá!!!")
+    assert calls == [preprocessor.preprocess("Sản phẩm @shop ngonnn quá!!!")]
+    assert encoded["input_ids"][0] == 0 and encoded["input_ids"][-1] == 2
+
+
+def test_tokenize_can_still_return_padded_tensors():
+    calls = []
+
+    def tokenizer(text, **kwargs):
+        calls.append(kwargs)
+        return {"input_ids": [0, 2]}
+
+    preprocessor = VietnamesePreprocessor(tokenizer=tokenizer)
+    preprocessor.tokenize("tốt lắm")
+    preprocessor.preprocess_for_phobert("tốt lắm", return_tensors="pt")
+    assert calls == [{"truncation": True}, {"return_tensors": "pt", "padding": True, "truncation": True}]
+
+
+def test_no_tokenizer_is_loaded_by_default():
+    preprocessor = VietnamesePreprocessor()
+    assert preprocessor.tokenizer is None
+    assert preprocessor.tokenize("tốt lắm")["input_ids"] == "tốt lắm"
+
+
+def legacy_remove_noise(text):
+    """remove_noise as it was before the patterns were precompiled"""
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'(.)\1{2,}', r'\1', text)
+    text = re.sub(r'[^\w\sàáảãạâầấẩẫậăằắẳẵặèéẻẽẹêềếểễệđìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵÀÁẢÃẠÂẦẤẨẪẬĂẰẮẲẴẶÈÉẺẼẸÊỀẾỂỄỆĐÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴ]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+NOISY = [
+    "",
+    "   ",
+    "Sản phẩm @shop_01 ngonnnn quá!!! 😍😍😍",
+    "xem www.shop.vn/p?id=1 và https://tiki.vn/x nhé...",
+    "@http://a.b hàng 1000đ, giao 24/7 :)))",
+    "dòng một\ndòng hai\n\n\ntrống\r\n\tcuối",
+    "___ ... --- ?!?! aaa  bbb",
+]
+
+
+def test_remove_noise_matches_legacy_on_corpus(baseline):
+    preprocessor = VietnamesePreprocessor()
+    texts = [row[0] for row in baseline] + NOISY
+    mismatches = [t for t in texts if preprocessor.remove_noise(t) != legacy_remove_noise(t)]
+    assert mismatches == []
+
+
+def test_remove_noise_batch_matches_remove_noise(baseline):
+    preprocessor = VietnamesePreprocessor()
+    texts = NOISY + [row[0] for row in baseline[:200]] + NOISY
+    assert preprocessor.remove_noise_batch(texts) == [preprocessor.remove_noise(t) for t in texts]
+    assert preprocessor.remove_noise_batch([]) == []
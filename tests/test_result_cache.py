@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from result_cache import FlightTimeout, ResultCache
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.get_or_compute("b", lambda: 2) == 2
+    assert cache.get_or_compute("a", lambda: 0) == 1   # hit refreshes "a"
+    cache.get_or_compute("c", lambda: 3)               # evicts "b"
+    assert cache.get_or_compute("b", lambda: 20) == 20
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 4, 2, 2)
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = ResultCache(ttl=10, clock=lambda: now[0])
+    cache.get_or_compute("a", lambda: 1)
+    now[0] = 9.9
+    assert cache.get_or_compute("a", lambda: 2) == 1
+    now[0] = 10.0
+    assert cache.get_or_compute("a", lambda: 2) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_errors_are_propagated_and_not_cached():
+    cache = ResultCache()
+
+    def fail():
+        raise RuntimeError("model down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("a", fail)
+    assert cache.get_or_compute("a", lambda: 1) == 1
+
+
+def test_concurrent_identical_requests_share_one_computation():
+    cache = ResultCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+    assert results == ["result"] * 8
+    assert cache.stats()["misses"] == 1
+
+
+def test_waiting_caller_gives_up_after_wait():
+    cache = ResultCache()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    leader = threading.Thread(target=lambda: cache.get_or_compute("k", slow))
+    leader.start()
+    started.wait(5)
+    begin = time.monotonic()
+    with pytest.raises(FlightTimeout):
+        cache.get_or_compute("k", lambda: "never", wait=0.05)
+    assert time.monotonic() - begin < 1
+    release.set()
+    leader.join()
+    # The leader's computation was not disturbed
+    assert cache.get("k") == "done"
@@ -0,0 +1,36 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from rule_based import RuleBasedSentiment
+
+
+@pytest.fixture(scope="module")
+def rb():
+    return RuleBasedSentiment()
+
+
+def test_batch_matches_scalar(rb, baseline):
+    texts = [row[0] for row in baseline]
+    texts += ["", "rất", "không", "rất rất tốt", "không rất tệ lắm", "KHÔNG hài lòng chút nào"]
+    batch = rb.analyze_batch(texts, chunk_size=257)
+    mismatches = []
+    for i, text in enumerate(texts):
+        expected = rb.analyze(text)
+        got = (float(batch.scores[i]), bool(batch.mixed[i]), bool(batch.neutral[i]), bool(batch.hedged[i]))
+        if got != (expected.score, expected.mixed, expected.neutral, expected.hedged):
+            mismatches.append((text, expected[:4], got))
+    assert mismatches == []
+
+
+def test_unlisted_accented_words_score_zero(rb):
+    # Each folds onto another word's key (yêu, hay, buồn, tệ)
+    texts = ["sức khỏe yếu", "hãy mua đi", "buôn bán", "tê chân"]
+    assert [rb.analyze_sentiment(t) for t in texts] == [0.0] * 4
+    assert list(rb.analyze_batch(texts).scores) == [0.0] * 4
+    assert rb.analyze_sentiment("suc khoe yeu") != 0.0
+
+
+def test_batch_empty_input(rb):
+    batch = rb.analyze_batch([])
+    assert len(batch.scores) == 0
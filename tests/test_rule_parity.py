@@ -0,0 +1,52 @@
+import pytest
+
+from rule_based import RuleBasedSentiment
+
+
+@pytest.fixture(scope="module")
+def rb():
+    return RuleBasedSentiment()
+
+
+def test_baseline_covers_corpora(baseline):
+    assert len(baseline) > 1500
+
+
+def test_analyze_sentiment_parity(rb, baseline):
+    mismatches = [(t, s, rb.analyze_sentiment(t)) for t, s, *_ in baseline if rb.analyze_sentiment(t) != s]
+    assert mismatches == []
+
+
+def test_flag_parity(rb, baseline):
+    mismatches = []
+    for text, _, mixed, neutral, hedged, _, _ in baseline:
+        got = (rb.detect_mixed_sentiment(text), rb.is_neutral_context(text), rb.is_hedged(text))
+        if got != (mixed, neutral, hedged):
+            mismatches.append((text, (mixed, neutral, hedged), got))
+    assert mismatches == []
+
+
+def test_clause_score_parity(rb, baseline):
+    mismatches = []
+    for text, _, _, _, _, post, clause in baseline:
+        got = (rb._post_contrast_clause_score(text), rb._clause_score(text))
+        if got != (post, clause):
+            mismatches.append((text, (post, clause), got))
+    assert mismatches == []
+
+
+def test_analyze_matches_individual_methods(rb, baseline):
+    mismatches = []
+    for text, score, mixed, neutral, hedged, _, _ in baseline:
+        result = rb.analyze(text)
+        if (result.score, result.mixed, result.neutral, result.hedged) != (score, mixed, neutral, hedged):
+            mismatches.append((text, (score, mixed, neutral, hedged), result[:4]))
+    assert mismatches == []
+
+
+def test_analyze_result_is_immutable(rb):
+    result = rb.analyze("Tôi thích nó lắm tuy nhiên khủng khiếp")
+    assert result.mixed is True
+    assert result.post_contrast_score < 0
+    with pytest.raises(AttributeError):
+        result.score = 1.0
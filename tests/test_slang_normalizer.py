@@ -0,0 +1,93 @@
+import pytest
+
+from preprocessing import VietnamesePreprocessor
+from slang_normalizer import SlangNormalizer, load_slang
+
+
+def legacy_normalize_teencode(slang_dict, text):
+    """normalize_teencode before the trie: single words, lowercased lookups"""
+    return ' '.join(slang_dict.get(word.lower(), word) for word in text.split())
+
+
+def test_single_words_match_the_old_lookup(baseline):
+    preprocessor = VietnamesePreprocessor()
+    single = {k: v for k, v in preprocessor.slang_dict.items() if ' ' not in k}
+    normalizer = SlangNormalizer(single)
+    texts = [preprocessor.remove_noise(row[0]).lower() for row in baseline]
+    texts += ["ko dc r", "mn  ơi\tok", "hihi haha hehe", ""]
+    mismatches = [t for t in texts if normalizer.normalize(t) != legacy_normalize_teencode(single, t)]
+    assert mismatches == []
+
+
+def test_longest_phrase_wins():
+    normalizer = SlangNormalizer.load()
+    assert normalizer.normalize("ko bt gì") == "không biết gì"
+    assert normalizer.normalize("hàng bt") == "hàng bình thường"
+    assert normalizer.normalize("ko bt r") == "không biết rồi"
+    # Already-standard phrase is consumed whole instead of expanding "tuyệt"
+    assert normalizer.normalize("dịch vụ tuyệt vời") == "dịch vụ tuyệt vời"
+    assert normalizer.normalize("tuyệt quá") == "tuyệt vời quá"
+
+
+def test_replacement_follows_input_case():
+    normalizer = SlangNormalizer.load()
+    assert normalizer.normalize("Ko thích") == "Không thích"
+    assert normalizer.normalize("KO BT") == "KHÔNG BIẾT"
+    assert normalizer.normalize("K") == "Không"
+    assert normalizer.normalize("VIP") == "VIP"
+
+
+def test_punctuation_adjacent_tokens():
+    normalizer = SlangNormalizer.load()
+    assert normalizer.normalize("hàng ok!!") == "hàng được!!"
+    assert normalizer.normalize("(ko) đẹp, “Oke”") == "(không) đẹp, “Ok”"
+    assert normalizer.normalize("ko bt, nhé") == "không biết, nhé"
+    # A phrase never spans punctuation
+    assert normalizer.normalize("ko, bt") == "không, bình thường"
+    assert normalizer.normalize("!!! ...") == "!!! ..."
+
+
+def test_single_word_fast_path_matches_the_trie_walk():
+    normalizer = SlangNormalizer.load()
+    # Phrase heads with no phrase after them take the lookup-only path
+    assert normalizer.normalize("bt, hàng Ko bt!") == "bình thường, hàng Không biết!"
+    assert normalizer.normalize("OKE! hàng bt") == "OK! hàng bình thường"
+    assert normalizer.normalize("k. bt") == "không. bình thường"
+    # An entry that is all punctuation is matched whole
+    assert SlangNormalizer({"^^": "vui"}).normalize("đẹp ^^") == "đẹp vui"
+
+
+def test_edits_recompile_the_trie():
+    normalizer = SlangNormalizer({"ship": "giao"})
+    assert normalizer.normalize("ship nhanh") == "giao nhanh"
+    normalizer["ship nhanh"] = "giao hàng nhanh"
+    assert normalizer.normalize("ship nhanh") == "giao hàng nhanh"
+    del normalizer["ship nhanh"]
+    normalizer.update({"nhanh": "lẹ"})
+    assert normalizer.normalize("ship nhanh") == "giao lẹ"
+    normalizer.clear()
+    assert normalizer.normalize("ship nhanh") == "ship nhanh"
+
+
+def test_preprocessor_loads_slang_file(tmp_path):
+    path = tmp_path / "slang.tsv"
+    path.write_text("# comment\nsp\tsản phẩm\nsp xịn\tsản phẩm tốt\n", encoding="utf-8")
+    assert load_slang(str(path)) == {"sp": "sản phẩm", "sp xịn": "sản phẩm tốt"}
+    preprocessor = VietnamesePreprocessor(slang_path=str(path))
+    assert preprocessor.normalize_teencode("sp xịn quá") == "sản phẩm tốt quá"
+    # slang_dict is still a plain mapping callers can replace
+    preprocessor.slang_dict = {"quá": "lắm"}
+    assert preprocessor.normalize_teencode("sp xịn quá") == "sp xịn lắm"
+
+
+def test_malformed_slang_line_names_file_and_line(tmp_path):
+    path = tmp_path / "slang.tsv"
+    path.write_text("# comment\nsp\tsản phẩm\nsp xịn sản phẩm tốt\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=rf"slang\.tsv:3: expected slang<TAB>replacement"):
+        load_slang(str(path))
+
+
+def test_text_without_slang_is_returned_as_is():
+    normalizer = SlangNormalizer.load()
+    for text in ("sản phẩm tốt", "Giao hàng nhanh, đóng gói kỹ!", "a.ko x", ""):
+        assert normalizer.normalize(text) is text
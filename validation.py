@@ -1,8 +1,9 @@
 import re
 
-def validate_input(text):
+def validate_input(text, max_length=500):
     """
     Validate input text for Vietnamese sentiment analysis.
+    max_length caps the length (None: no cap, for document mode).
     Returns (is_valid, error_message)
     """
     if not text or text.strip() == "":
@@ -15,8 +16,8 @@ def validate_input(text):
         return False, "❌ Văn bản quá ngắn! Vui lòng nhập ít nhất 3 ký tự."
 
     # Check maximum length
-    if len(text) > 500:
-        return False, "❌ Văn bản quá dài! Vui lòng nhập dưới 500 ký tự."
+    if max_length is not None and len(text) > max_length:
+        return False, f"❌ Văn bản quá dài! Vui lòng nhập dưới {max_length} ký tự."
 
     # Calculate meaningful characters ratio
     total_chars = len(text)